@@ -0,0 +1,85 @@
+"""
+The MIT License (MIT)
+
+Copyright (c) 2025 Ethan Kenneth Davies
+
+Permission is hereby granted, free of charge, to any person obtaining a
+copy of this software and associated documentation files (the "Software"),
+to deal in the Software without restriction, including without limitation
+the rights to use, copy, modify, merge, publish, distribute, sublicense,
+and/or sell copies of the Software, and to permit persons to whom the
+Software is furnished to do so, subject to the following conditions:
+
+The above copyright notice and this permission notice shall be included in
+all copies or substantial portions of the Software.
+
+THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS
+OR IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING
+FROM, OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER
+DEALINGS IN THE SOFTWARE.
+"""
+
+"""Checks that ``import bot_code`` stays cheap: it has to finish within a time budget, measured with
+``python -X importtime`` in a fresh interpreter, and must not pull in any heavy dependency (see ``_EXPORTS`` in
+``bot_code/__init__.py``). Exits with ``1`` if either check fails, so it can gate a deploy.
+
+Run from the repository root::
+
+    python -m benchmarks.import_time [budget_ms] [runs]
+"""
+
+import re
+import subprocess
+import sys
+
+# Dependencies that must only be imported once a name that needs them is used.
+HEAVY_MODULES = ("discord", "aiohttp", "aiosqlite", "unidecode", "requests")
+
+IMPORTTIME_LINE = re.compile(r"^import time:\s+\d+ \|\s+(\d+) \|(\s*)(\S+)$")
+
+
+def measure() -> tuple:
+    """Imports ``bot_code`` in a fresh interpreter.
+
+    :return: The cumulative import time of ``bot_code`` in microseconds, and the heavy modules it imported.
+    """
+    script = f"import sys, bot_code; print(*[name for name in {HEAVY_MODULES!r} if name in sys.modules])"
+
+    result = subprocess.run([sys.executable, "-X", "importtime", "-c", script],
+                            capture_output=True, text=True, check=True)
+
+    cumulative = 0
+
+    for line in result.stderr.splitlines():
+        match = IMPORTTIME_LINE.match(line)
+
+        # Only the top-level entry, its cumulative time includes every submodule and dependency.
+        if match and match.group(3) == "bot_code" and match.group(2) == " ":
+            cumulative = int(match.group(1))
+
+    return cumulative, result.stdout.split()
+
+
+def main():
+    budget_ms = float(sys.argv[1]) if len(sys.argv) > 1 else 50.0
+    runs = int(sys.argv[2]) if len(sys.argv) > 2 else 5
+
+    # The fastest run is the least disturbed by whatever else the machine is doing.
+    samples = [measure() for _ in range(runs)]
+    best_ms = min(cumulative for cumulative, _ in samples) / 1000
+    heavy = sorted({name for _, imported in samples for name in imported})
+
+    print(f"import bot_code: {best_ms:.1f}ms (best of {runs}), budget {budget_ms:g}ms")
+
+    if heavy:
+        print(f"imported eagerly: {', '.join(heavy)}")
+
+    if best_ms > budget_ms or heavy:
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,128 @@
+"""
+The MIT License (MIT)
+
+Copyright (c) 2025 Ethan Kenneth Davies
+
+Permission is hereby granted, free of charge, to any person obtaining a
+copy of this software and associated documentation files (the "Software"),
+to deal in the Software without restriction, including without limitation
+the rights to use, copy, modify, merge, publish, distribute, sublicense,
+and/or sell copies of the Software, and to permit persons to whom the
+Software is furnished to do so, subject to the following conditions:
+
+The above copyright notice and this permission notice shall be included in
+all copies or substantial portions of the Software.
+
+THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS
+OR IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING
+FROM, OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER
+DEALINGS IN THE SOFTWARE.
+"""
+"""Measures ``PermissionResolver.check()``, the per-invocation cost of a role-gated command, for a member let
+through by the admin role, a member turned away, and the guild owner. Exits with ``1`` if any of them takes longer
+than the budget, so it can gate a deploy.
+
+A member with a handful of roles is checked with a set intersection, one with more by binary searching their role IDs
+for the few roles a policy allows, so the cost stops growing with the role count past a dozen or so. The budget applies
+to members with a handful of roles and to members with a few dozen, like a large server's staff, alike.
+
+Run from the repository root::
+
+    python -m benchmarks.permissions [budget_ns] [checks]
+"""
+
+import asyncio
+import os
+import sys
+import tempfile
+from timeit import Timer
+
+from discord.utils import SnowflakeList
+
+import bot_code as bc
+
+ADMIN_ROLE_ID = 1_100_000_000_000_000_000
+OWNER_ID = 1
+
+
+class Guild:
+    """Stands in for ``discord.Guild``, the resolver only reads ``id`` and ``owner_id``."""
+
+    def __init__(self, guild_id: int):
+        self.id = guild_id
+        self.name = f"Guild {guild_id}"
+        self.owner_id = OWNER_ID
+
+
+class Member:
+    """Stands in for ``discord.Member``, with its role IDs in the same ``SnowflakeList`` discord.py uses."""
+
+    def __init__(self, member_id: int, guild: Guild, role_ids):
+        self.id = member_id
+        self.guild = guild
+        self._roles = SnowflakeList(role_ids)
+
+
+class Role:
+    def __init__(self, role_id: int):
+        self.id = role_id
+
+
+async def build_resolver(directory: str, guild: Guild) -> bc.PermissionResolver:
+    database = bc.Database(database_path=os.path.join(directory, "benchmark.sqlite3"), reader_pool_size=0)
+
+    await database.connect()
+    await database.create_db()
+    await database.add_guild(guild)
+    await database.add_admin_role(Role(ADMIN_ROLE_ID), guild)
+
+    resolver = bc.PermissionResolver(database_instance=database, command_policies={"gated": "admin"})
+    await resolver.load(guild.id)
+
+    await database.close()
+
+    return resolver
+
+
+def main():
+    budget_ns = float(sys.argv[1]) if len(sys.argv) > 1 else 1500.0
+    checks = int(sys.argv[2]) if len(sys.argv) > 2 else 1_000_000
+
+    guild = Guild(1_000_000_000_000_000_000)
+
+    with tempfile.TemporaryDirectory() as directory:
+        resolver = asyncio.run(build_resolver(directory, guild))
+
+    # A member typically has a handful of roles, a large server's staff a few dozen.
+    few_roles = range(1_200_000_000_000_000_000, 1_200_000_000_000_000_004)
+    many_roles = range(1_200_000_000_000_000_000, 1_200_000_000_000_000_030)
+    members = {
+        "admin role": Member(2, guild, [*few_roles, ADMIN_ROLE_ID]),
+        "no admin role": Member(3, guild, few_roles),
+        "guild owner": Member(OWNER_ID, guild, few_roles),
+        "admin role, 31 roles": Member(4, guild, [*many_roles, ADMIN_ROLE_ID]),
+        "no admin role, 30 roles": Member(5, guild, many_roles),
+    }
+
+    over_budget = False
+
+    for name, member in members.items():
+        check = resolver.check
+
+        # The best of several repeats is the least disturbed by whatever else the machine is doing.
+        seconds = min(Timer(lambda: check(member, "gated")).repeat(repeat=5, number=checks))
+        nanoseconds = seconds / checks * 1e9
+
+        print(f"{name}: {nanoseconds:.0f}ns per check ({check(member, 'gated')}), budget {budget_ns:g}ns")
+
+        over_budget |= nanoseconds > budget_ns
+
+    if over_budget:
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,78 @@
+"""
+The MIT License (MIT)
+
+Copyright (c) 2025 Ethan Kenneth Davies
+
+Permission is hereby granted, free of charge, to any person obtaining a
+copy of this software and associated documentation files (the "Software"),
+to deal in the Software without restriction, including without limitation
+the rights to use, copy, modify, merge, publish, distribute, sublicense,
+and/or sell copies of the Software, and to permit persons to whom the
+Software is furnished to do so, subject to the following conditions:
+
+The above copyright notice and this permission notice shall be included in
+all copies or substantial portions of the Software.
+
+THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS
+OR IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING
+FROM, OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER
+DEALINGS IN THE SOFTWARE.
+"""
+
+"""Checks that ``RateLimiter`` lets exactly ``uses`` uses through in a burst for every common limit, and exactly
+``uses`` again once ``per`` seconds have passed, long after boot (when ``time.monotonic_ns()`` is large). Exits with
+``1`` if any limit lets through one use too many or too few, so it can gate a deploy.
+
+Run from the repository root::
+
+    python -m benchmarks.ratelimit
+"""
+
+import sys
+
+import bot_code as bc
+
+USES = range(1, 31)
+PERIODS = (0.5, 1.0, 2.0, 3.0, 5.0, 7.0, 10.0, 15.0, 30.0, 60.0, 300.0, 3600.0)
+
+# About a year of uptime, in nanoseconds.
+START = 31_536_000 * 1_000_000_000
+
+
+def bursts(uses: int, per: float) -> tuple:
+    """:return: How many of ``uses + 1`` uses at once ``RateLimiter`` lets through, then how many of ``uses + 1`` more
+        one period later.
+    """
+    limiter = bc.RateLimiter({"command": {"user": (uses, per)}})
+    later = START + round(per * 1_000_000_000)
+
+    first = sum(not limiter.hit("command", 1, 1, now=START) for _ in range(uses + 1))
+    second = sum(not limiter.hit("command", 1, 1, now=later) for _ in range(uses + 1))
+
+    return first, second
+
+
+def main():
+    failures = []
+
+    for per in PERIODS:
+        for uses in USES:
+            allowed = bursts(uses, per)
+
+            if allowed != (uses, uses):
+                failures.append(f"{uses} per {per:g}s: {allowed[0]} then {allowed[1]} allowed")
+
+    print(f"{len(USES) * len(PERIODS) - len(failures)} of {len(USES) * len(PERIODS)} limits exact")
+
+    for failure in failures:
+        print(failure)
+
+    if failures:
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
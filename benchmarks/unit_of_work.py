@@ -0,0 +1,110 @@
+"""
+The MIT License (MIT)
+
+Copyright (c) 2025 Ethan Kenneth Davies
+
+Permission is hereby granted, free of charge, to any person obtaining a
+copy of this software and associated documentation files (the "Software"),
+to deal in the Software without restriction, including without limitation
+the rights to use, copy, modify, merge, publish, distribute, sublicense,
+and/or sell copies of the Software, and to permit persons to whom the
+Software is furnished to do so, subject to the following conditions:
+
+The above copyright notice and this permission notice shall be included in
+all copies or substantial portions of the Software.
+
+THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS
+OR IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING
+FROM, OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER
+DEALINGS IN THE SOFTWARE.
+"""
+
+"""Compares event loop wakeups and wall time per ``add_guild()`` between awaiting each statement separately (how
+``Database`` used to work) and a single ``Database.unit_of_work()`` hop.
+
+Run from the repository root::
+
+    python -m benchmarks.unit_of_work [operations]
+"""
+
+import asyncio
+import os
+import sys
+import tempfile
+from time import perf_counter
+
+import bot_code as bc
+
+
+class Guild:
+    """Stands in for ``discord.Guild``, ``add_guild()`` only reads ``id`` and ``name``."""
+
+    def __init__(self, guild_id: int):
+        self.id = guild_id
+        self.name = f"Guild {guild_id}"
+
+
+async def add_guild_per_statement(database: bc.Database, guild: Guild):
+    async with database.lock:
+        await database.db_instance.execute("BEGIN TRANSACTION")
+        await database.db_instance.execute(
+            'INSERT INTO "Statistics" ("Server Name", "Server ID", "Join Date") VALUES (?, ?, ?)',
+            (guild.name, guild.id, "2025-01-01")
+        )
+        await database.db_instance.execute(
+            'INSERT INTO "General Configuration" ("Server ID") VALUES (?)',
+            (guild.id,)
+        )
+        await database.db_instance.commit()
+
+
+async def run(operations: int, loop_iterations: list):
+    with tempfile.TemporaryDirectory() as directory:
+        database = bc.Database(database_path=os.path.join(directory, "benchmark.sqlite3"), reader_pool_size=0)
+
+        await database.connect()
+        await database.create_db()
+
+        for name, add_guild, first_id in (("per statement", add_guild_per_statement, 0),
+                                          ("unit of work", bc.Database.add_guild, operations)):
+            loop_iterations[0] = 0
+            started = perf_counter()
+
+            for guild_id in range(first_id, first_id + operations):
+                await add_guild(database, Guild(guild_id))
+
+            elapsed = perf_counter() - started
+
+            print(f"{name:>14}: {loop_iterations[0] / operations:5.1f} loop wakeups/op, "
+                  f"{elapsed / operations * 1_000_000:7.1f} us/op")
+
+        await database.close()
+
+
+def main():
+    operations = int(sys.argv[1]) if len(sys.argv) > 1 else 2000
+
+    loop = asyncio.new_event_loop()
+    loop_iterations = [0]
+
+    # Every pass through the loop is one wakeup: count them by wrapping the loop's private iteration method.
+    run_once = loop._run_once
+
+    def counting_run_once():
+        loop_iterations[0] += 1
+        run_once()
+
+    loop._run_once = counting_run_once
+
+    try:
+        loop.run_until_complete(run(operations, loop_iterations))
+
+    finally:
+        loop.close()
+
+
+if __name__ == "__main__":
+    main()
@@ -37,13 +37,98 @@ __ARCHON_ASCII__ = [
     r'(___/    \___)|__|  \___) \_______) \__|  |__/  \"_____/    \___|\____\) ',
 ]
 
-from .commands import *
-from .config import *
-from .database import *
-from .embeds import *
-from .events import *
-from .exceptions import *
+# Every public name and the submodule it lives in. Submodules (and discord.py, aiosqlite and unidecode with them) are
+# only imported the first time one of their names is used (PEP 562), so ``import bot_code`` stays cheap. Keep in sync
+# with each submodule's ``__all__``.
+_EXPORTS = {
+    'BackupManager': 'backup',
+    'GuildConfigCache': 'cache',
+    'CommandSync': 'command_sync',
+    'PrefixCommands': 'commands',
+    'SlashCommands': 'commands',
+    'VALUES': 'config',
+    'TOKEN_VALIDATION_CACHE_PATH': 'config',
+    'validate_token': 'config',
+    'token_recently_validated': 'config',
+    'remember_token_validation': 'config',
+    'SESSIONS_DIRECTORY': 'config',
+    'validate_command_prefix': 'config',
+    'Database': 'database',
+    'DeletionScheduler': 'deletions',
+    'Embeds': 'embeds',
+    'Events': 'events',
+    'BotError': 'exceptions',
+    'ConfigError': 'exceptions',
+    'DatabaseError': 'exceptions',
+    'GuildPrefixes': 'guild_prefixes',
+    'ClusterServer': 'ipc',
+    'ClusterClient': 'ipc',
+    'MaintenanceScheduler': 'maintenance',
+    'METRICS': 'metrics',
+    'Metrics': 'metrics',
+    'MetricsServer': 'metrics',
+    'Histogram': 'metrics',
+    'Counter': 'metrics',
+    'Gauge': 'metrics',
+    'RollingWindow': 'metrics',
+    'SeriesCache': 'metrics',
+    'MIGRATIONS': 'migrations',
+    'LATEST_SCHEMA_VERSION': 'migrations',
+    'PartitionedDatabase': 'partitions',
+    'partition_index': 'partitions',
+    'partition_path': 'partitions',
+    'repartition': 'partitions',
+    'PermissionResolver': 'permissions',
+    'GATED_COMMANDS': 'permissions',
+    'ReaderPool': 'pool',
+    'TrackedLock': 'pool',
+    'QSTN_LOG': 'prefixes',
+    'INFO_LOG': 'prefixes',
+    'WARN_LOG': 'prefixes',
+    'EROR_LOG': 'prefixes',
+    'CRIT_LOG': 'prefixes',
+    'QueryProfiler': 'profiler',
+    'ProfiledConnection': 'profiler',
+    'percentile': 'profiler',
+    'RateLimiter': 'ratelimit',
+    'apply_settings': 'reload',
+    'reload_config': 'reload',
+    'ResumableBot': 'sessions',
+    'start_bot': 'start',
+    'default_bot': 'start',
+    'build_database': 'start',
+    'build_metrics_server': 'start',
+    'stop_bot': 'stop',
+    'TIMELINE': 'timeline',
+    'StartupTimeline': 'timeline',
+    'LoopWatchdog': 'watchdog',
+    'WriteBehindQueue': 'write_behind',
+}
+
+# Cheap, so imported right away. set_logging also has to be: the function shares its name with its submodule, and
+# importing the submodule later would replace the function with the module on the package.
 from .prefixes import *
 from .set_logging import *
-from .start import *
-from .stop import *
+
+__all__ = (*_EXPORTS, 'set_logging')
+
+
+def __getattr__(name: str):
+    try:
+        module_name = _EXPORTS[name]
+
+    except KeyError:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}") from None
+
+    from importlib import import_module
+
+    value = getattr(import_module(f".{module_name}", __name__), name)
+
+    # Cached, so __getattr__ only runs once per name.
+    globals()[name] = value
+
+    return value
+
+
+def __dir__():
+    return sorted(set(globals()) | set(_EXPORTS))
@@ -0,0 +1,202 @@
+"""
+The MIT License (MIT)
+
+Copyright (c) 2025 Ethan Kenneth Davies
+
+Permission is hereby granted, free of charge, to any person obtaining a
+copy of this software and associated documentation files (the "Software"),
+to deal in the Software without restriction, including without limitation
+the rights to use, copy, modify, merge, publish, distribute, sublicense,
+and/or sell copies of the Software, and to permit persons to whom the
+Software is furnished to do so, subject to the following conditions:
+
+The above copyright notice and this permission notice shall be included in
+all copies or substantial portions of the Software.
+
+THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS
+OR IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING
+FROM, OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER
+DEALINGS IN THE SOFTWARE.
+"""
+
+import asyncio
+import glob
+import os
+import sqlite3
+from contextlib import closing
+from datetime import datetime
+from time import monotonic, sleep
+from typing import List, Optional
+from urllib.parse import quote
+
+from .database import *
+from .exceptions import *
+from .prefixes import *
+
+__all__ = (
+    'BackupManager',
+)
+
+
+class BackupManager:
+    def __init__(self, database_instance: Database, backup_directory: str = "/opt/archon/var/backups", keep: int = 7,
+                 interval_hours: Optional[float] = None, pages_per_step: int = 256, step_sleep: float = 0.005,
+                 max_restarts: int = 3):
+        """Takes consistent snapshots of the live database with SQLite's online backup API, without stopping the bot.
+
+        The backup runs on its own read-only connection in a worker thread, copying ``pages_per_step`` pages at a time
+        and sleeping ``step_sleep`` seconds in between (with the GIL released), so neither the event loop nor the
+        writer connection is held for the duration. SQLite restarts a backup when another connection writes to the source; after
+        ``max_restarts`` restarts the rest is copied in one step so a busy database can't starve the backup.
+
+        Snapshots are written to ``backup_directory`` as ``<name>.<YYYYmmdd-HHMMSS>.sqlite3`` and only the newest
+        ``keep`` of each database file are kept.
+
+        :param database_instance: The ``Database`` (or ``PartitionedDatabase``) to back up.
+        :param backup_directory: Directory the snapshots are written to. Created if it doesn't exist.
+        :param keep: Number of snapshots kept per database file.
+        :param interval_hours: Hours between scheduled backups, or ``None`` to only back up on demand.
+        :param pages_per_step: Database pages copied per backup step.
+        :param step_sleep: Seconds slept between backup steps.
+        :param max_restarts: Restarts tolerated before the remaining pages are copied in one step.
+        """
+        self.database = database_instance
+        self.backup_directory = backup_directory
+        self.keep = keep
+        self.interval_hours = interval_hours
+        self.pages_per_step = pages_per_step
+        self.step_sleep = step_sleep
+        self.max_restarts = max_restarts
+
+        # Only one backup at a time, scheduled or not.
+        self.lock = asyncio.Lock()
+        self.scheduler: Optional[asyncio.Task] = None
+
+    def start(self):
+        """Starts the scheduled backups if ``interval_hours`` is set. Must be called from a running event loop.
+
+        :return: ``None``
+        """
+        if self.interval_hours and self.scheduler is None:
+            self.scheduler = asyncio.create_task(self.run())
+
+    async def run(self):
+        """Backs up the database every ``interval_hours``, logging the result of each backup.
+
+        :return: ``None``
+        """
+        while True:
+            await asyncio.sleep(self.interval_hours * 3600)
+
+            try:
+                await self.backup()
+
+            except DatabaseError as error:
+                print(f"{EROR_LOG} Scheduled backup failed: {error.message}")
+
+    async def backup(self) -> List[dict]:
+        """Snapshots every database file behind ``database_instance`` and rotates out old snapshots.
+
+        :return: One ``{"source", "path", "bytes", "seconds"}`` dictionary per database file.
+
+        :raises DatabaseError: If a backup fails. Snapshots of the other files are kept.
+        """
+        async with self.lock:
+            results = []
+
+            for database in self.database.databases:
+                result = await asyncio.to_thread(self.backup_file, database.db_path)
+
+                print(f"{INFO_LOG} Backed up '{result['source']}' to '{result['path']}' "
+                      f"({result['bytes']} bytes in {result['seconds']:.2f}s)")
+
+                results.append(result)
+
+            return results
+
+    def backup_file(self, database_path: str) -> dict:
+        """Snapshots one database file and rotates out its old snapshots. Blocking, runs in a worker thread.
+
+        :param database_path:
+
+        :return: ``{"source", "path", "bytes", "seconds"}``
+
+        :raises DatabaseError: If the backup fails.
+        """
+        name = os.path.splitext(os.path.basename(database_path))[0]
+        timestamp = datetime.now().strftime("%Y%m%d-%H%M%S")
+
+        backup_path = os.path.join(self.backup_directory, f"{name}.{timestamp}.sqlite3")
+        partial_path = f"{backup_path}.partial"
+
+        started = monotonic()
+        restarts = 0
+        last_remaining = None
+
+        def progress(status: int, remaining: int, total: int):
+            nonlocal restarts, last_remaining
+
+            # The remaining page count only goes up when SQLite restarted the backup.
+            if last_remaining is not None and remaining > last_remaining:
+                restarts += 1
+
+            last_remaining = remaining
+
+            if restarts > self.max_restarts:
+                raise InterruptedError
+
+            # sqlite3 only sleeps between steps when the source is busy, this pause applies after every step.
+            sleep(self.step_sleep)
+
+        try:
+            os.makedirs(self.backup_directory, exist_ok=True)
+
+            # Both are closed whichever step fails, including opening the target after the source.
+            with closing(sqlite3.connect(f"file:{quote(database_path)}?mode=ro", uri=True)) as source, \
+                    closing(sqlite3.connect(partial_path)) as target:
+                try:
+                    source.backup(target, pages=self.pages_per_step, progress=progress)
+
+                except InterruptedError:
+                    print(f"{WARN_LOG} Backup of '{database_path}' restarted {restarts} times, copying the rest in one step")
+
+                    source.backup(target, pages=-1)
+
+            os.replace(partial_path, backup_path)
+
+        except (OSError, sqlite3.Error) as error:
+            if os.path.exists(partial_path):
+                os.remove(partial_path)
+
+            raise DatabaseError(f"An error occurred when backing up '{database_path}': {error}")
+
+        self.rotate(name)
+
+        return {
+            "source": database_path,
+            "path": backup_path,
+            "bytes": os.path.getsize(backup_path),
+            "seconds": monotonic() - started,
+        }
+
+    def rotate(self, name: str):
+        """Deletes all but the newest ``keep`` snapshots of a database file.
+
+        :param name: File name of the database without its extension, e.g. ``database``.
+
+        :return: ``None``
+        """
+        # Matches only this file's snapshots (not e.g. partition "database.0" for "database"), and the timestamp format
+        # sorts chronologically as text.
+        pattern = f"{glob.escape(name)}.{'[0-9]' * 8}-{'[0-9]' * 6}.sqlite3"
+        snapshots = sorted(glob.glob(os.path.join(glob.escape(self.backup_directory), pattern)))
+
+        for snapshot in snapshots[:-self.keep]:
+            try:
+                os.remove(snapshot)
+
+            except OSError as error:
+                print(f"{WARN_LOG} Could not delete old backup '{snapshot}': {error}")
@@ -0,0 +1,190 @@
+"""
+The MIT License (MIT)
+
+Copyright (c) 2025 Ethan Kenneth Davies
+
+Permission is hereby granted, free of charge, to any person obtaining a
+copy of this software and associated documentation files (the "Software"),
+to deal in the Software without restriction, including without limitation
+the rights to use, copy, modify, merge, publish, distribute, sublicense,
+and/or sell copies of the Software, and to permit persons to whom the
+Software is furnished to do so, subject to the following conditions:
+
+The above copyright notice and this permission notice shall be included in
+all copies or substantial portions of the Software.
+
+THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS
+OR IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING
+FROM, OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER
+DEALINGS IN THE SOFTWARE.
+"""
+
+from collections import OrderedDict
+from typing import Iterable, Optional, Tuple
+
+__all__ = (
+    'GuildConfigCache',
+)
+
+
+class GuildConfigCache:
+    def __init__(self, max_size: Optional[int] = None):
+        """In-memory copy of the ``"General Configuration"`` rows, keyed by ``"Server ID"``.
+
+        Rows are plain ``dict`` objects mapping column names to values (without ``"Server ID"``). They are shared with
+        every caller, so treat them as read-only and go through ``Database`` to change them.
+
+        Without ``max_size`` every row is kept and, once ``load()`` has run, a guild that isn't cached is known not to
+        exist, so lookups never have to go to the database. With ``max_size`` the least recently used rows are evicted
+        and misses are read through by ``Database.get_guild_config()``.
+
+        :param max_size: Maximum number of cached rows, or ``None`` for no limit.
+        """
+        self.max_size = max_size
+        self.rows: OrderedDict[int, Optional[dict]] = OrderedDict()
+
+        # Column names of the table, minus "Server ID". Used to build the row of a newly added guild.
+        self.columns: Tuple[str, ...] = ()
+
+        # True once every row of the table is cached (only possible without ``max_size``).
+        self.complete = False
+
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+        # Bumped by every change to the cached rows, so a read-through fill can tell whether a write landed while its
+        # row was being read (see ``fill()``).
+        self.version = 0
+
+    def __len__(self) -> int:
+        return len(self.rows)
+
+    @property
+    def hit_rate(self) -> float:
+        lookups = self.hits + self.misses
+
+        return self.hits / lookups if lookups else 0.0
+
+    def load(self, columns: Iterable[str], rows: Iterable[tuple]):
+        """Replaces the cache contents with the result of a bulk ``SELECT *`` on the table.
+
+        :param columns: Column names, in the order of each row's values. The first column must be ``"Server ID"``.
+        :param rows: Rows returned by the query.
+
+        :return: ``None``
+        """
+        columns = tuple(columns)[1:]
+
+        self.version += 1
+        self.columns = columns
+        self.rows.clear()
+
+        for row in rows:
+            self.put(row[0], dict(zip(columns, row[1:])))
+
+        self.complete = self.max_size is None
+
+    def get(self, guild_id: int) -> Optional[dict]:
+        """Returns the cached row of a guild, or ``None`` if the guild is known to have no row.
+
+        :param guild_id:
+
+        :return: The row, or ``None``.
+
+        :raises KeyError: If the guild isn't cached and has to be read from the database.
+        """
+        try:
+            row = self.rows[guild_id]
+
+        except KeyError:
+            if self.complete:
+                self.hits += 1
+
+                return None
+
+            self.misses += 1
+
+            raise
+
+        self.hits += 1
+
+        if self.max_size is not None:
+            self.rows.move_to_end(guild_id)
+
+        return row
+
+    def put(self, guild_id: int, row: Optional[dict]):
+        """Caches the row of a guild (``None`` caches that the guild has no row), evicting the least recently used
+        row if the cache is full.
+
+        :param guild_id:
+        :param row:
+
+        :return: ``None``
+        """
+        if row is None and self.complete:
+            self.rows.pop(guild_id, None)
+
+            return
+
+        self.rows[guild_id] = row
+        self.rows.move_to_end(guild_id)
+
+        if self.max_size is not None and len(self.rows) > self.max_size:
+            self.rows.popitem(last=False)
+
+            self.evictions += 1
+
+    def fill(self, guild_id: int, row: Optional[dict], version: int):
+        """Caches a row read from the database after a miss, unless the cache changed since ``version`` was taken
+        (before the read). The row may then predate a write, e.g. a prefix set or the guild deleted meanwhile, and is
+        left to be read again instead.
+
+        :param guild_id:
+        :param row:
+        :param version: ``version`` from before the row was read.
+
+        :return: ``None``
+        """
+        if version == self.version:
+            self.put(guild_id, row)
+
+    def add(self, guild_id: int):
+        """Caches the default row of a newly added guild.
+
+        :param guild_id:
+
+        :return: ``None``
+        """
+        self.version += 1
+        self.put(guild_id, dict.fromkeys(self.columns))
+
+    def update(self, guild_id: int, column: str, value):
+        """Updates one column of a cached row. Rows that aren't cached are left to be read through later.
+
+        :param guild_id:
+        :param column:
+        :param value:
+
+        :return: ``None``
+        """
+        self.version += 1
+        row = self.rows.get(guild_id)
+
+        if row is not None:
+            # Replace rather than mutate, callers may still hold the old row.
+            self.rows[guild_id] = {**row, column: value}
+
+    def delete(self, guild_id: int):
+        """Marks a guild as having no row.
+
+        :param guild_id:
+
+        :return: ``None``
+        """
+        self.version += 1
+        self.put(guild_id, None)
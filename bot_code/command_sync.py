@@ -0,0 +1,121 @@
+"""
+The MIT License (MIT)
+
+Copyright (c) 2025 Ethan Kenneth Davies
+
+Permission is hereby granted, free of charge, to any person obtaining a
+copy of this software and associated documentation files (the "Software"),
+to deal in the Software without restriction, including without limitation
+the rights to use, copy, modify, merge, publish, distribute, sublicense,
+and/or sell copies of the Software, and to permit persons to whom the
+Software is furnished to do so, subject to the following conditions:
+
+The above copyright notice and this permission notice shall be included in
+all copies or substantial portions of the Software.
+
+THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS
+OR IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING
+FROM, OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER
+DEALINGS IN THE SOFTWARE.
+"""
+
+import hashlib
+import json
+from typing import List, Optional
+
+import discord
+from discord.ext import commands
+
+from .database import *
+from .exceptions import *
+from .prefixes import *
+
+__all__ = (
+    'CommandSync',
+)
+
+# Scope of the global commands in ``"Command Sync"``; every other scope is a guild ID.
+GLOBAL_SCOPE = 0
+
+
+class CommandSync:
+    def __init__(self, bot_instance: commands.Bot, database_instance: Database):
+        """Syncs the application command tree to Discord only when it changed.
+
+        ``tree.sync()`` bulk-overwrites every command of a scope, on one of Discord's most tightly rate limited
+        routes, and ``on_ready`` runs again after reconnects. Instead, the payload ``tree.sync()`` would send is hashed
+        per scope (the global commands and each guild with guild-scoped commands) and compared with the hash stored
+        in ``"Command Sync"`` after the last successful sync of that scope; only scopes whose hash differs are synced.
+
+        :param bot_instance:
+        :param database_instance: The ``Database`` (or ``PartitionedDatabase``) the hashes are stored in.
+        """
+        self.bot = bot_instance
+        self.database = database_instance
+
+    async def payload_hash(self, guild_id: Optional[int] = None) -> str:
+        """Hashes exactly what ``tree.sync()`` sends for a scope, along with the application it is sent for.
+
+        :param guild_id: ``None`` for the global commands.
+
+        :return: Hex SHA-256 digest.
+        """
+        tree = self.bot.tree
+        guild = discord.Object(id=guild_id) if guild_id is not None else None
+
+        # Built the same way as in ``CommandTree.sync()``.
+        command_list = tree._get_all_commands(guild=guild)
+
+        if tree.translator:
+            payload = [await command.get_translated_payload(tree, tree.translator) for command in command_list]
+
+        else:
+            payload = [command.to_dict(tree) for command in command_list]
+
+        # Sorted so that registration order doesn't change the hash; Discord doesn't care about it either.
+        payload.sort(key=lambda command: (command.get("type", 1), command["name"]))
+
+        serialized = json.dumps([self.bot.application_id, payload], sort_keys=True, separators=(",", ":"),
+                                default=str)
+
+        return hashlib.sha256(serialized.encode()).hexdigest()
+
+    async def sync(self, force: bool = False) -> List[str]:
+        """Syncs every scope whose commands changed since its last sync, or every scope if ``force`` is set. Guilds
+        that no longer have guild-scoped commands are synced once more, with none, to remove them from Discord.
+
+        :param force: Sync even if the hashes match, e.g. after the commands were changed outside this bot.
+
+        :return: The synced scopes, as ``"global"`` or ``"guild <id>"``.
+
+        :raises DatabaseError: If reading or storing the hashes fails.
+        :raises discord.HTTPException: If a sync fails. Scopes synced before it keep their new hash.
+        """
+        stored = await self.database.get_command_hashes()
+
+        # ``tree.get_commands(guild=...)`` needs a guild to ask about; the tree keeps guild commands by guild ID.
+        guild_ids = {guild_id for guild_id, guild_commands in self.bot.tree._guild_commands.items() if guild_commands}
+        guild_ids |= {scope for scope in stored if scope != GLOBAL_SCOPE}
+
+        synced = []
+
+        for guild_id in (None, *sorted(guild_ids)):
+            scope = GLOBAL_SCOPE if guild_id is None else guild_id
+            payload_hash = await self.payload_hash(guild_id)
+
+            if not force and stored.get(scope) == payload_hash:
+                continue
+
+            await self.bot.tree.sync(guild=discord.Object(id=guild_id) if guild_id is not None else None)
+
+            # A guild left without commands has nothing to compare against next time.
+            has_commands = guild_id is None or bool(self.bot.tree._guild_commands.get(guild_id))
+
+            await self.database.set_command_hash(scope, payload_hash if has_commands else None)
+
+            synced.append("global" if guild_id is None else f"guild {guild_id}")
+
+        return synced
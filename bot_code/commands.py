@@ -23,15 +23,28 @@ DEALINGS IN THE SOFTWARE.
 """
 
 import asyncio
-from time import monotonic
+import io
+import json
+from time import monotonic, perf_counter
+from typing import Awaitable, Callable, Optional
 
 import discord
 from discord.ext import commands
 
+from .backup import *
+from .command_sync import *
+from .config import *
 from .prefixes import *
+from .ratelimit import *
 from .database import *
+from .deletions import *
 from .embeds import *
 from .exceptions import *
+from .ipc import *
+from .maintenance import *
+from .metrics import *
+from .permissions import *
+from .reload import *
 from .stop import *
 
 __all__ = (
@@ -54,7 +67,11 @@ async def delete_message(ctx: Context, embed_instance: Embeds):
 
 
 class PrefixCommands:
-    def __init__(self, bot_instance: commands.AutoShardedBot, embed_instance: Embeds, database_instance: Database):
+    def __init__(self, bot_instance: commands.AutoShardedBot, embed_instance: Embeds, database_instance: Database,
+                 backup_instance: BackupManager, maintenance_instance: MaintenanceScheduler,
+                 deletion_instance: DeletionScheduler, rate_limiter_instance: RateLimiter,
+                 command_sync_instance: CommandSync, permission_instance: PermissionResolver,
+                 cluster_instance: Optional[ClusterClient] = None):
         """Prefix commands are commands initiated by using a prefix preceding the name of the command (no whitespace),
         i.e., ``?help``, ``!ping``, ``$shutdown``.
 
@@ -63,25 +80,127 @@ class PrefixCommands:
         :param bot_instance:
         :param embed_instance:
         :param database_instance:
+        :param backup_instance:
+        :param maintenance_instance:
+        :param deletion_instance: Deletes the replies of ``?help`` and ``?ping`` after a delay.
+        :param rate_limiter_instance: Throttles the commands that have rate limits in the configuration.
+        :param command_sync_instance: Syncs the application commands for ``?sync``.
+        :param permission_instance: Decides who may run role-gated commands.
+        :param cluster_instance: The IPC channel to the cluster launcher when running as one of several worker
+            processes (see ``cluster.py``), otherwise ``None``.
 
         :return: None
         """
         self.bot = bot_instance
         self.embeds = embed_instance
         self.database = database_instance
+        self.backups = backup_instance
+        self.maintenance = maintenance_instance
+        self.deletions = deletion_instance
+        self.rate_limits = rate_limiter_instance
+        self.command_sync = command_sync_instance
+        self.permissions = permission_instance
+        self.cluster = cluster_instance
+
+        # Series of ``METRICS`` by command name, see ``run()``.
+        self.durations = SeriesCache(METRICS.commands, "prefix")
+        self.throttled = SeriesCache(METRICS.throttled)
 
         # Register each method as a command
         @self.bot.command()
         async def help(ctx: Context):
-            await self.help(ctx)
+            await self.run(ctx, self.help)
 
         @self.bot.command()
-        async def ping(ctx: Context):
-            await self.ping(ctx)
+        async def ping(ctx: Context, mode: Optional[str] = None):
+            await self.run(ctx, self.ping, mode)
 
         @self.bot.command()
         async def shutdown(ctx: Context):
-            await self.shutdown(ctx)
+            await self.run(ctx, self.shutdown)
+
+        @self.bot.command()
+        async def backup(ctx: Context):
+            await self.run(ctx, self.backup)
+
+        @self.bot.command()
+        async def maintenance(ctx: Context):
+            await self.run(ctx, self.maintenance_)
+
+        @self.bot.command()
+        async def profile(ctx: Context):
+            await self.run(ctx, self.profile)
+
+        @self.bot.command()
+        async def reload(ctx: Context):
+            await self.run(ctx, self.reload)
+
+        @self.bot.command()
+        async def sync(ctx: Context):
+            await self.run(ctx, self.sync)
+
+    async def run(self, ctx: Context, command: Callable[..., Awaitable[None]], *args):
+        """Runs a command if the rate limits of the invoking user, channel and guild allow it, and records how long it
+        took in ``METRICS``.
+
+        The rate limits are checked before the command itself, so a throttled command costs no REST call or database
+        query; it is dropped without a reply, since a reply would be one more REST call per flooded message. Role-gated
+        commands (see ``PermissionResolver``) are checked next.
+
+        :param ctx: The context of the command invocation.
+        :type ctx: Context
+        :param command: The method implementing the command.
+        :param args: The command's arguments.
+
+        :return: None
+        """
+        name = ctx.command.name
+
+        if self.rate_limits.hit(name, ctx.author.id, ctx.channel.id, ctx.guild.id if ctx.guild else None):
+            self.throttled[name].inc()
+
+            return
+
+        if self.permissions.gated(name):
+            try:
+                allowed = await self.permissions.allowed(ctx.author, name)
+
+            except DatabaseError as error:
+                print(f"{EROR_LOG} {error}")
+
+                allowed = False
+
+            if not allowed:
+                await ctx.send(embed=self.embeds.error_client_forbidden())
+
+                return
+
+        started = perf_counter()
+
+        try:
+            await command(ctx, *args)
+
+        finally:
+            self.durations[name].observe(perf_counter() - started)
+
+    async def check_owner(self, ctx: Context) -> bool:
+        """Checks if the invoking user ID matches one of the user ID's in the ``bot.owner_ids`` list (dictated by the
+        ``owner_ids`` value in the configuration). If it doesn't, send an appropriate error message back to the
+        invoking user.
+
+        :param ctx: The context of the command invocation.
+        :type ctx: Context
+
+        :return: ``True`` if the invoking user is an owner.
+        """
+        if ctx.author.id in self.bot.owner_ids:
+            return True
+
+        await ctx.send(embed=self.embeds.error_client_forbidden())
+
+        print(f"{WARN_LOG} {ctx.command.name.capitalize()} command called by unauthorized user: {ctx.author}")
+
+        return False
 
     async def help(self, ctx: Context):
         """This command sends the help embed to the invoking user before deleting it after a delay.
@@ -94,13 +213,14 @@ class PrefixCommands:
         """
         await delete_message(ctx=ctx, embed_instance=self.embeds)
 
-        msg = await ctx.send(embed=self.embeds.help_embed())
+        msg = await ctx.send(embed=self.embeds.help_embed(prefix=ctx.prefix))
 
-        await asyncio.sleep(120)
-        await msg.delete()
+        await self.deletions.schedule(msg, delay=120)
 
-    async def ping(self, ctx: Context):
-        """This command sends the API and WebSocket latencies to the user, then deletes it after a delay.
+    async def ping(self, ctx: Context, mode: Optional[str] = None):
+        """This command sends the API and WebSocket latencies to the user, then deletes it after a delay. ``?ping full``
+        and ``?ping json`` are owner-only and send the diagnostics of ``latency_report()`` instead, as an embed or as
+        JSON. Any other argument is ignored.
 
         The API latency is calculated by recording a high-resolution timestamp before sending a placeholder embed, then
         another timestamp is stored. The difference between these timestamps represents the time taken to send the
@@ -110,9 +230,17 @@ class PrefixCommands:
         :param ctx: The context of the command invocation. This includes metadata like the user who invoked it and what
             channel it was invoked from.
         :type ctx: Context
+        :param mode: ``None``, ``"full"`` or ``"json"``, in any case.
 
         :return: None
         """
+        mode = mode.lower() if mode is not None else None
+
+        if mode in ("full", "json"):
+            await self.ping_full(ctx, as_json=mode == "json")
+
+            return
+
         await delete_message(ctx=ctx, embed_instance=self.embeds)
 
         before = monotonic()
@@ -128,8 +256,90 @@ class PrefixCommands:
             api_latency=api_latency,
             sent_by=ctx.author))
 
-        await asyncio.sleep(120)
-        await msg.delete()
+        await self.deletions.schedule(msg, delay=120)
+
+    async def ping_full(self, ctx: Context, as_json: bool):
+        """Sends every latency figure of ``latency_report()``, as an embed or as JSON for scripts. Owner-only.
+
+        :param ctx: The context of the command invocation.
+        :type ctx: Context
+        :param as_json: Send the report as JSON (a file if it doesn't fit in a message) instead of an embed.
+
+        :return: None
+        """
+        if not await self.check_owner(ctx):
+            return
+
+        await delete_message(ctx=ctx, embed_instance=self.embeds)
+
+        before = monotonic()
+        msg = await ctx.send(embed=self.embeds.ping_embed())
+        api_latency = monotonic() - before
+
+        report = await self.latency_report(ctx, api_latency=api_latency)
+
+        if not as_json:
+            await msg.edit(embed=self.embeds.ping_full_embed(report=report, sent_by=ctx.author))
+
+        else:
+            text = json.dumps(report, indent=2)
+
+            # Messages are capped at 2000 characters.
+            if len(text) < 1980:
+                await msg.edit(content=f"```json\n{text}\n```", embed=None)
+
+            else:
+                await msg.delete()
+
+                msg = await ctx.send(file=discord.File(io.BytesIO(text.encode()), filename="ping.json"))
+
+        await self.deletions.schedule(msg, delay=120)
+
+    async def latency_report(self, ctx: Context, api_latency: float) -> dict:
+        """Collects the figures that ``bot.latency`` averages away: every shard's heartbeat latency, the shard of the
+        invoking guild, how late the event loop runs callbacks, a database round trip, and the percentiles of the most
+        recent Discord API requests (see ``METRICS.rest_window``). Latencies are in milliseconds, ``None`` where
+        unknown.
+
+        :param ctx: The context of the command invocation.
+        :type ctx: Context
+        :param api_latency: Seconds the placeholder message took to send.
+
+        :return: ``{"api_ms", "loop_lag_ms", "database_ms", "guild_shard", "shards", "rest"}``
+        """
+        def milliseconds(seconds: Optional[float]) -> Optional[float]:
+            # A shard's latency is infinite until its first heartbeat is acknowledged.
+            return None if seconds is None or seconds == float("inf") else round(seconds * 1000, 2)
+
+        # A callback scheduled now should run right away; any delay is time the loop spent on other work.
+        scheduled = perf_counter()
+        await asyncio.sleep(0)
+        loop_lag = perf_counter() - scheduled
+
+        try:
+            database_latency = await self.database.round_trip()
+
+        except DatabaseError as error:
+            print(f"{EROR_LOG} {error}")
+
+            database_latency = None
+
+        p50, p95, p99 = METRICS.rest_window.percentiles(0.5, 0.95, 0.99)
+
+        return {
+            "api_ms": milliseconds(api_latency),
+            "loop_lag_ms": milliseconds(loop_lag),
+            "database_ms": milliseconds(database_latency),
+            "guild_shard": ctx.guild.shard_id if ctx.guild else None,
+            # Only this process's shards in cluster mode.
+            "shards": {str(shard_id): milliseconds(shard.latency) for shard_id, shard in self.bot.shards.items()},
+            "rest": {
+                "samples": len(METRICS.rest_window),
+                "p50_ms": milliseconds(p50),
+                "p95_ms": milliseconds(p95),
+                "p99_ms": milliseconds(p99),
+            },
+        }
 
     async def shutdown(self, ctx: Context):
         """This command checks if the invoking user ID matches one of the user ID's in the ``bot.owner_ids`` list. The
@@ -145,29 +355,238 @@ class PrefixCommands:
         """
         await delete_message(ctx=ctx, embed_instance=self.embeds)
 
-        if ctx.author.id not in self.bot.owner_ids:
-            await ctx.send(embed=self.embeds.error_client_forbidden())
-
-            print(f"{WARN_LOG} Shutdown command called by unauthorized user: {ctx.author}")
-
+        if not await self.check_owner(ctx):
             return
 
         print(f"{INFO_LOG} Received shutdown signal from {ctx.author}")
 
         await ctx.send(embed=self.embeds.shutdown_embed(sent_by=ctx.author))
 
-        await stop_bot(bot_instance=self.bot, database_instance=self.database)
+        # The launcher stops every worker process, this one included.
+        if self.cluster:
+            await self.cluster.send("shutdown", requested_by=str(ctx.author))
+
+            return
+
+        await stop_bot(bot_instance=self.bot, database_instance=self.database, deletion_instance=self.deletions)
+
+    async def backup(self, ctx: Context):
+        """This owner-only command takes an online backup of the database (see ``BackupManager`` in ``backup.py``)
+        and replies with the size of each snapshot and how long it took.
+
+        :param ctx: The context of the command invocation. This includes metadata like the user who invoked it and what
+            channel it was invoked from.
+        :type ctx: Context
+
+        :return: None
+        """
+        await delete_message(ctx=ctx, embed_instance=self.embeds)
+
+        if not await self.check_owner(ctx):
+            return
+
+        print(f"{INFO_LOG} Received backup request from {ctx.author}")
+
+        try:
+            results = await self.backups.backup()
+
+        except DatabaseError as error:
+            print(f"{EROR_LOG} {error}")
+
+            await ctx.send(embed=self.embeds.error_backup_failed())
+
+            return
+
+        await ctx.send(embed=self.embeds.backup_embed(results=results, sent_by=ctx.author))
+
+    async def maintenance_(self, ctx: Context):
+        """This owner-only command runs database maintenance right away instead of waiting for the maintenance window
+        (see ``MaintenanceScheduler`` in ``maintenance.py``) and replies with the pages freed and the time taken.
+
+        The trailing underscore keeps it from shadowing ``self.maintenance``.
+
+        :param ctx: The context of the command invocation. This includes metadata like the user who invoked it and what
+            channel it was invoked from.
+        :type ctx: Context
+
+        :return: None
+        """
+        await delete_message(ctx=ctx, embed_instance=self.embeds)
+
+        if not await self.check_owner(ctx):
+            return
+
+        print(f"{INFO_LOG} Received maintenance request from {ctx.author}")
+
+        try:
+            results = await self.maintenance.maintain()
+
+        except DatabaseError as error:
+            print(f"{EROR_LOG} {error}")
+
+            await ctx.send(embed=self.embeds.error_maintenance_failed())
+
+            return
+
+        await ctx.send(embed=self.embeds.maintenance_embed(results=results, sent_by=ctx.author))
+
+    async def profile(self, ctx: Context):
+        """This owner-only command replies with the query profiler's summary (see ``QueryProfiler`` in
+        ``profiler.py``): latency percentiles per database operation and any query planned as a full table scan.
+
+        :param ctx: The context of the command invocation. This includes metadata like the user who invoked it and what
+            channel it was invoked from.
+        :type ctx: Context
+
+        :return: None
+        """
+        await delete_message(ctx=ctx, embed_instance=self.embeds)
+
+        if not await self.check_owner(ctx):
+            return
+
+        if not self.database.profiler:
+            await ctx.send(embed=self.embeds.error_profiler_disabled())
+
+            return
+
+        await ctx.send(embed=self.embeds.profile_embed(summary=self.database.profiler.summary(), sent_by=ctx.author))
+
+    async def reload(self, ctx: Context):
+        """This owner-only command re-reads the configuration file and applies it without restarting (see
+        ``reload_config()`` in ``reload.py``), replying with the keys that changed or why the file was rejected.
+
+        :param ctx: The context of the command invocation. This includes metadata like the user who invoked it and what
+            channel it was invoked from.
+        :type ctx: Context
+
+        :return: None
+        """
+        await delete_message(ctx=ctx, embed_instance=self.embeds)
+
+        if not await self.check_owner(ctx):
+            return
+
+        print(f"{INFO_LOG} Received reload request from {ctx.author}")
+
+        try:
+            changed = reload_config(self.bot)
+
+        except ConfigError as error:
+            print(f"{EROR_LOG} Configuration not reloaded: {error.faulty_key}: {error.message}")
+
+            await ctx.send(embed=self.embeds.error_reload_rejected(key=error.faulty_key, message=error.message))
+
+            return
+
+        # Validated here first, so the other worker processes only reload a file known to be good.
+        if self.cluster:
+            await self.cluster.send("reload")
+
+        await ctx.send(embed=self.embeds.reload_embed(changed=changed, sent_by=ctx.author))
+
+    async def sync(self, ctx: Context):
+        """This owner-only command syncs every application command scope to Discord, even the ones whose commands
+        haven't changed since their last sync (see ``CommandSync``), e.g. after they were changed outside this bot.
+
+        :param ctx: The context of the command invocation. This includes metadata like the user who invoked it and what
+            channel it was invoked from.
+        :type ctx: Context
+
+        :return: None
+        """
+        await delete_message(ctx=ctx, embed_instance=self.embeds)
+
+        if not await self.check_owner(ctx):
+            return
+
+        print(f"{INFO_LOG} Received sync request from {ctx.author}")
+
+        try:
+            synced = await self.command_sync.sync(force=True)
+
+        except (DatabaseError, discord.HTTPException) as error:
+            print(f"{EROR_LOG} Could not synchronize application commands: {error}")
+
+            await ctx.send(embed=self.embeds.error_sync_failed())
+
+            return
+
+        print(f"{INFO_LOG} Synchronized application commands ({', '.join(synced)})")
+
+        await ctx.send(embed=self.embeds.sync_embed(synced=synced, sent_by=ctx.author))
 
 
 class SlashCommands(commands.Cog):
-    def __init__(self, bot_instance: commands.AutoShardedBot, database_instance: Database, embed_instance: Embeds):
+    def __init__(self, bot_instance: commands.AutoShardedBot, database_instance: Database, embed_instance: Embeds,
+                 rate_limiter_instance: RateLimiter, permission_instance: PermissionResolver):
         self.embeds = embed_instance
         self.bot = bot_instance
         self.database = database_instance
+        self.rate_limits = rate_limiter_instance
+        self.permissions = permission_instance
+
+        # Series of ``METRICS`` by command name, see ``run()``.
+        self.durations = SeriesCache(METRICS.commands, "slash")
+        self.throttled = SeriesCache(METRICS.throttled)
 
     @discord.app_commands.command(name="set_admin", description="Set the server-wide admin role.")
     @discord.app_commands.describe(role="The role to set as admin.")
     async def set_admin(self, interaction: discord.Interaction, role: discord.Role):
+        await self.run(interaction, self.set_admin_, role)
+
+    @discord.app_commands.command(name="set_prefix", description="Set the prefix of the prefix commands.")
+    @discord.app_commands.describe(prefix="The new prefix. Leave it out to go back to the default prefix.")
+    async def set_prefix(self, interaction: discord.Interaction, prefix: Optional[str] = None):
+        await self.run(interaction, self.set_prefix_, prefix)
+
+    async def run(self, interaction: discord.Interaction, command: Callable[..., Awaitable[None]], *args):
+        """Runs a command if the rate limits of the invoking user, channel and guild allow it, and records how long it
+        took in ``METRICS``.
+
+        An interaction must always be answered, so a throttled command gets an ephemeral reply instead of none. Role-gated
+        commands (see ``PermissionResolver``) are checked next.
+
+        :param interaction:
+        :param command: The method implementing the command.
+        :param args: The command's options.
+
+        :return: None
+        """
+        name = interaction.command.name
+
+        retry_after = self.rate_limits.hit(name, interaction.user.id, interaction.channel_id, interaction.guild_id)
+
+        if retry_after:
+            self.throttled[name].inc()
+
+            await interaction.response.send_message(embed=self.embeds.error_rate_limited(retry_after), ephemeral=True)
+
+            return
+
+        if self.permissions.gated(name):
+            try:
+                allowed = await self.permissions.allowed(interaction.user, name)
+
+            except DatabaseError as error:
+                print(f"{EROR_LOG} {error}")
+
+                allowed = False
+
+            if not allowed:
+                await interaction.response.send_message(embed=self.embeds.error_client_forbidden(), ephemeral=True)
+
+                return
+
+        started = perf_counter()
+
+        try:
+            await command(interaction, *args)
+
+        finally:
+            self.durations[name].observe(perf_counter() - started)
+
+    async def set_admin_(self, interaction: discord.Interaction, role: discord.Role):
         """This command lets only the guild owner set the admin role for their guild-specific configuration in the
         database.
 
@@ -191,10 +610,10 @@ class SlashCommands(commands.Cog):
 
             return
         try:
-            async with self.database as db:
-                await db.add_admin_role(role=role, guild=interaction.guild)
+            await self.database.add_admin_role(role=role, guild=interaction.guild)
+            self.permissions.invalidate(interaction.guild.id)
 
-                print(f"{INFO_LOG} Updated the admin role for guild '{interaction.guild.name}' in the database")
+            print(f"{INFO_LOG} Updated the admin role for guild '{interaction.guild.name}' in the database")
 
         except DatabaseError as error:
             print(f"{EROR_LOG} {error}")
@@ -202,3 +621,49 @@ class SlashCommands(commands.Cog):
         await send_message(embed=self.embeds.admin_role_set(role=role.mention), ephemeral=True)
 
         return
+
+    async def set_prefix_(self, interaction: discord.Interaction, prefix: Optional[str]):
+        """This command lets only the guild owner set the command prefix of their guild, following the same rules as
+        the ``command_prefix`` value in the configuration.
+
+        :param interaction:
+        :param prefix: ``None`` to go back to the prefix in the configuration.
+
+        :return: None
+
+        :except DatabaseError:
+        """
+
+        send_message = interaction.response.send_message
+
+        if interaction.guild is None:
+            await send_message(embed=self.embeds.error_guild_only(), ephemeral=True)
+
+            return
+
+        if interaction.user.id != interaction.guild.owner_id:
+            await send_message(embed=self.embeds.error_client_forbidden(), ephemeral=True)
+
+            return
+
+        if prefix is not None:
+            try:
+                validate_command_prefix(prefix)
+
+            except ConfigError as error:
+                await send_message(embed=self.embeds.error_invalid_prefix(error.message), ephemeral=True)
+
+                return
+
+        try:
+            await self.database.set_prefix(guild=interaction.guild, prefix=prefix)
+
+            print(f"{INFO_LOG} Updated the command prefix for guild '{interaction.guild.name}' in the database")
+
+        except DatabaseError as error:
+            print(f"{EROR_LOG} {error}")
+
+        await send_message(embed=self.embeds.prefix_set(prefix=prefix or VALUES.COMMAND_PREFIX),
+                           ephemeral=True)
+
+        return
@@ -22,20 +22,57 @@ FROM, OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER
 DEALINGS IN THE SOFTWARE.
 """
 
+import asyncio
+import hashlib
 import json
+import os
 import sys
 import datetime
-from typing import List, Union
-
-import requests
+import time
+from typing import List, Optional, Tuple, Union
 
 from .exceptions import *
+from .partitions import *
 from .prefixes import *
 
 __all__ = (
     'VALUES',
+    'TOKEN_VALIDATION_CACHE_PATH',
+    'validate_token',
+    'token_recently_validated',
+    'remember_token_validation',
+    'SESSIONS_DIRECTORY',
+    'validate_command_prefix',
 )
 
+# Configuration keys ``Values.reload()`` may change while the bot is running. The rest are only read at startup (the
+# token, the database layout, ...).
+LIVE_KEYS = frozenset({
+    "owner_ids",
+    "command_prefix",
+    "print_intro",
+    "enable_token_validation",
+    "token_validation_cache_hours",
+    "quick_restart",
+})
+
+# Command rate limits used when ``rate_limits`` isn't in the configuration file, as ``{command: {scope: (uses,
+# per_seconds)}}`` (see ``RateLimiter`` in ``ratelimit.py``).
+DEFAULT_RATE_LIMITS = {
+    "help": {"user": (2, 30.0), "channel": (5, 30.0)},
+    "ping": {"user": (2, 30.0), "channel": (5, 30.0)},
+    "set_admin": {"user": (3, 60.0), "guild": (5, 60.0)},
+    "set_prefix": {"user": (3, 60.0), "guild": (5, 60.0)},
+}
+
+RATE_LIMIT_SCOPES = ("user", "channel", "guild")
+
+# Holds a fingerprint of the last successfully validated token (see ``remember_token_validation()``).
+TOKEN_VALIDATION_CACHE_PATH = "/opt/archon/var/cache/token_validation.json"
+
+# Gateway sessions saved for a quick restart (see ``ResumableBot`` in ``sessions.py``).
+SESSIONS_DIRECTORY = "/opt/archon/var/cache/sessions"
+
 
 def load_json_config(file_path: str = "/opt/archon/etc/discord_bot_config.json"):
     """Loads and parses the values in the configuration file while testing for exceptions along the way.
@@ -63,47 +100,112 @@ def load_json_config(file_path: str = "/opt/archon/etc/discord_bot_config.json")
         raise ConfigError("file_path", message=f"Invalid JSON format: {json_error}")
 
 
-def validate_token(enable_token_validation: bool, token: str):
-    """Checks the authenticatable validity of a Discord token by using the Discord API.
+def validate_token_validation(enable_token_validation: bool, token: str) -> bool:
+    """Checks the token validation settings without touching the network. The token itself is authenticated later,
+    during startup (see ``validate_token()``).
 
     :param enable_token_validation: Skips token authentication if ``False``. This may be desired if you're completely
     affirmative with the validity of your token and would like to reduce API overhead and/or risk of getting rate
     limited by the API.
     :param token: The actual token used  to authenticate with the Discord API.
 
-    :return: ``token``
+    :return: ``enable_token_validation``
 
     :raises ConfigError:
     """
     if not isinstance(enable_token_validation, bool):
         raise ConfigError("enable_token_validation", message=f"Must be a boolean (true/false)")
 
-    if not enable_token_validation:
-        print(f"{WARN_LOG} Skipping token authentication validation")
-        return token
+    if not isinstance(token, str) or not token.strip():
+        raise ConfigError("token", message="Must be a non-empty string")
 
-    if enable_token_validation:
-        response = requests.get(url="https://discord.com/api/v10/users/@me", headers={"Authorization": f"Bot {token}"})
+    return enable_token_validation
 
-        if response.status_code == 200:
-            return token
 
-        elif response.status_code == 401:
-            raise ConfigError("token", message=f"Token will not connect to the Discord API")
+def token_fingerprint(token: str) -> str:
+    """:return: A SHA-256 digest of the token, so the token itself is never written to the validation cache."""
+    return hashlib.sha256(token.encode()).hexdigest()
 
-        else:
-            raise ConfigError("token", message=f"Unexpected HTTP response during token authentication: {response.status_code} - {response.text}")
 
-    return None
+def token_recently_validated(cache_path: str, token: str, ttl_hours: Optional[float]) -> bool:
+    """Checks the validation cache for a successful validation of this exact token less than ``ttl_hours`` ago.
+
+    :param cache_path:
+    :param token:
+    :param ttl_hours: ``None`` disables the cache.
+
+    :return: ``True`` if the token doesn't need validating again.
+    """
+    if ttl_hours is None:
+        return False
+
+    try:
+        with open(cache_path) as cache_file:
+            cache = json.load(cache_file)
+
+        return (cache["fingerprint"] == token_fingerprint(token)
+                and 0 <= time.time() - cache["validated_at"] < ttl_hours * 3600)
 
+    # A missing, unreadable or malformed cache only means validating again.
+    except (OSError, ValueError, KeyError, TypeError):
+        return False
 
-def validate_database_path(database_path: str):
-    """Checks the validity of the database path and database file itself.
 
-    The binary header is read and compared to the binary header of what would be a valid SQLite3 file. If the header is
-    not equal to that of a valid SQLite3, raise ``ConfigError``.
+def remember_token_validation(cache_path: str, token: str):
+    """Records a successful validation of ``token`` in the validation cache. Failing to write it is only a warning.
+
+    :return: ``None``
+    """
+    temporary_path = f"{cache_path}.tmp"
+
+    try:
+        with open(temporary_path, "w") as cache_file:
+            json.dump({"fingerprint": token_fingerprint(token), "validated_at": time.time()}, cache_file)
+
+        # Atomic, so a crash never leaves a half-written cache behind.
+        os.replace(temporary_path, cache_path)
+
+    except OSError as error:
+        print(f"{WARN_LOG} Could not write the token validation cache '{cache_path}': {error}")
+
+
+async def validate_token(bot_instance: "discord.Client", token: str, timeout: float = 10.0):
+    """Checks the authenticatable validity of a Discord token by logging in with it.
+
+    Logging in is itself the ``/users/@me`` request a separate validation would make, and it's made by discord.py's
+    own aiohttp session, so validating costs no extra round trip. The bot stays logged in; ``start_bot()`` only has to
+    connect afterward.
+
+    :param bot_instance:
+    :param token: The actual token used  to authenticate with the Discord API.
+    :param timeout: Seconds to wait for Discord before giving up.
+
+    :return: ``None``
+
+    :raises ConfigError:
+    """
+    # Imported here so loading the configuration doesn't pull in discord.py.
+    import discord
+
+    try:
+        await asyncio.wait_for(bot_instance.login(token), timeout=timeout)
+
+    except discord.LoginFailure:
+        raise ConfigError("token", message=f"Token will not connect to the Discord API")
+
+    except asyncio.TimeoutError:
+        raise ConfigError("token", message=f"Discord did not answer token authentication within {timeout:g}s")
+
+    except (discord.HTTPException, OSError) as error:
+        raise ConfigError("token", message=f"Unexpected error during token authentication: {error}")
+
+
+def validate_database_file(database_path: str, key: str = "database_path"):
+    """Reads the binary header of a database file and compares it to the binary header of what would be a valid SQLite3
+    file. If the header is not equal to that of a valid SQLite3, raise ``ConfigError``.
 
     :param database_path:
+    :param key: Name of the configuration key (for the error message).
 
     :return: ``database_path``
 
@@ -118,19 +220,53 @@ def validate_database_path(database_path: str):
             binary_header = binary_database_file.read(16)
 
             if binary_header != b'SQLite format 3\x00':
-                raise ConfigError("database_path", message=f"Not an SQLite3 database ({binary_header})")
+                raise ConfigError(key, message=f"Not an SQLite3 database ({binary_header})")
 
     except (FileNotFoundError, IsADirectoryError):
-        raise ConfigError("database_path", message=f"'{database_path}' not found or is a directory")
+        raise ConfigError(key, message=f"'{database_path}' not found or is a directory")
 
     except PermissionError:
-        raise ConfigError("database_path", message=f"Cannot access '{database_path}': Permission denied")
+        raise ConfigError(key, message=f"Cannot access '{database_path}': Permission denied")
+
+    return database_path
+
+
+def validate_database_path(database_path: str, database_partitions: int = 1):
+    """Checks the validity of the database path and database file itself (see ``validate_database_file()``).
+
+    With more than one partition, the guild tables live in one file per partition next to the main database file (see
+    ``partition_path()``). Partition files that already exist must be SQLite3 databases, and the
+    directory must be writable so missing ones can be created.
+
+    :param database_path:
+    :param database_partitions: The already validated ``database_partitions`` value.
+
+    :return: ``database_path``
+
+    :raises ConfigError:
+    """
+    validate_database_file(database_path)
+
+    if database_partitions <= 1:
+        return database_path
+
+    database_directory = os.path.dirname(database_path) or "."
+
+    for index in range(database_partitions):
+        file_path = partition_path(database_path, index)
+
+        if os.path.exists(file_path):
+            validate_database_file(file_path)
+
+        elif not os.access(database_directory, os.W_OK | os.X_OK):
+            raise ConfigError("database_path", message=f"Cannot create partition '{file_path}': Permission denied")
 
     return database_path
 
 
 def validate_command_prefix(command_prefix: str):
-    """Checks the validity of the command prefix (used in the ``PrefixCommands`` class at ``commands.py``).
+    """Checks the validity of the command prefix (used in the ``PrefixCommands`` class at ``commands.py``), both the
+    global one and the ones guilds set with ``/set_prefix``.
 
     If the length of the prefix is greater than ``1``, has whitespace, or is alphanumeric (composed of a letter or
     number), raise ``ConfigError`` with its respective error message for context.
@@ -227,16 +363,271 @@ def validate_print_intro(print_intro: bool):
         return print_intro
 
 
+def validate_boolean(key: str, value: bool) -> bool:
+    """Checks that an optional on/off setting is a JSON boolean.
+
+    :param key: Name of the configuration key (for the error message).
+    :param value:
+
+    :return: ``value``
+
+    :raises ConfigError:
+    """
+    if not isinstance(value, bool):
+        raise ConfigError(key, message="Must be a boolean (true/false)")
+
+    return value
+
+
+def validate_positive_integer(key: str, value: int) -> int:
+    """Checks that an optional numeric setting is a whole number greater than zero.
+
+    :param key: Name of the configuration key (for the error message).
+    :param value:
+
+    :return: ``value``
+
+    :raises ConfigError:
+    """
+    # bool is a subclass of int, but ``true`` is never a meaningful size or duration.
+    if isinstance(value, bool) or not isinstance(value, int) or value <= 0:
+        raise ConfigError(key, message=f"Must be a whole number greater than 0, got: {value!r}")
+
+    return value
+
+
+def validate_guild_config_cache_size(guild_config_cache_size: Optional[int]) -> Optional[int]:
+    """Checks the maximum number of guild configurations kept in memory. ``None`` (``null``) means no limit.
+
+    :param guild_config_cache_size:
+
+    :return: ``guild_config_cache_size``
+
+    :raises ConfigError:
+    """
+    if guild_config_cache_size is None:
+        return None
+
+    return validate_positive_integer("guild_config_cache_size", guild_config_cache_size)
+
+
+def validate_database_reader_pool_size(database_reader_pool_size: int) -> int:
+    """Checks the number of read-only database connections. ``0`` runs queries on the writer connection.
+
+    :param database_reader_pool_size:
+
+    :return: ``database_reader_pool_size``
+
+    :raises ConfigError:
+    """
+    if database_reader_pool_size == 0 and not isinstance(database_reader_pool_size, bool):
+        return 0
+
+    return validate_positive_integer("database_reader_pool_size", database_reader_pool_size)
+
+
+def validate_backup_interval_hours(backup_interval_hours: Optional[float]) -> Optional[float]:
+    """Checks the number of hours between scheduled backups. ``None`` (``null``) disables scheduled backups.
+
+    :param backup_interval_hours:
+
+    :return: ``backup_interval_hours``
+
+    :raises ConfigError:
+    """
+    if backup_interval_hours is None:
+        return None
+
+    if isinstance(backup_interval_hours, bool) or not isinstance(backup_interval_hours, (int, float)) \
+            or backup_interval_hours <= 0:
+        raise ConfigError("backup_interval_hours", message=f"Must be null or a number greater than 0, got: "
+                                                            f"{backup_interval_hours!r}")
+
+    return backup_interval_hours
+
+
+def validate_backup_directory(backup_directory: str) -> str:
+    """Checks that the backup directory is an absolute path. It's created on the first backup if it doesn't exist.
+
+    :param backup_directory:
+
+    :return: ``backup_directory``
+
+    :raises ConfigError:
+    """
+    if not isinstance(backup_directory, str) or not os.path.isabs(backup_directory):
+        raise ConfigError("backup_directory", message=f"Must be an absolute path, got: {backup_directory!r}")
+
+    if os.path.exists(backup_directory) and not os.path.isdir(backup_directory):
+        raise ConfigError("backup_directory", message=f"'{backup_directory}' is not a directory")
+
+    return backup_directory
+
+
+def validate_maintenance_window(maintenance_window: Optional[str]) -> Optional[Tuple[int, int]]:
+    """Parses the daily database maintenance window, written as ``"HH:MM-HH:MM"`` in UTC (e.g. ``"03:00-05:00"``).
+    The window may wrap around midnight. ``None`` (``null``) disables scheduled maintenance.
+
+    :param maintenance_window:
+
+    :return: ``(start_minute, end_minute)`` in minutes after midnight, or ``None``.
+
+    :raises ConfigError:
+    """
+    if maintenance_window is None:
+        return None
+
+    try:
+        start, end = str(maintenance_window).split("-")
+
+        minutes = []
+
+        for moment in (start, end):
+            hours, minute = (int(part) for part in moment.strip().split(":"))
+
+            if not (0 <= hours < 24 and 0 <= minute < 60):
+                raise ValueError
+
+            minutes.append(hours * 60 + minute)
+
+    except ValueError:
+        raise ConfigError("maintenance_window", message=f"Must be null or \"HH:MM-HH:MM\" (UTC), got: "
+                                                         f"{maintenance_window!r}")
+
+    if minutes[0] == minutes[1]:
+        raise ConfigError("maintenance_window", message="Start and end of the window cannot be the same")
+
+    return minutes[0], minutes[1]
+
+
+def validate_token_validation_cache_hours(token_validation_cache_hours: Optional[float]) -> Optional[float]:
+    """Checks how long a successful token validation is trusted. ``None`` (``null``) means always validating.
+
+    :param token_validation_cache_hours:
+
+    :return: ``token_validation_cache_hours``
+
+    :raises ConfigError:
+    """
+    if token_validation_cache_hours is None:
+        return None
+
+    if (isinstance(token_validation_cache_hours, bool) or not isinstance(token_validation_cache_hours, (int, float))
+            or token_validation_cache_hours <= 0):
+        raise ConfigError("token_validation_cache_hours",
+                          message=f"Must be null or a number greater than 0, got: {token_validation_cache_hours!r}")
+
+    return token_validation_cache_hours
+
+
+def validate_metrics_host(metrics_host: str) -> str:
+    """Checks the address metrics are served on.
+
+    :param metrics_host:
+
+    :return: ``metrics_host``
+
+    :raises ConfigError:
+    """
+    if not isinstance(metrics_host, str) or not metrics_host.strip():
+        raise ConfigError("metrics_host", message=f"Must be an IP address or host name, got: {metrics_host!r}")
+
+    return metrics_host
+
+
+def validate_metrics_port(metrics_port: Optional[int]) -> Optional[int]:
+    """Checks the port metrics are served on. ``None`` (``null``) doesn't serve them.
+
+    :param metrics_port:
+
+    :return: ``metrics_port``
+
+    :raises ConfigError:
+    """
+    if metrics_port is None:
+        return None
+
+    if isinstance(metrics_port, bool) or not isinstance(metrics_port, int) or not 0 < metrics_port < 65536:
+        raise ConfigError("metrics_port", message=f"Must be null or a port number (1-65535), got: {metrics_port!r}")
+
+    return metrics_port
+
+
+def validate_watchdog_threshold_ms(watchdog_threshold_ms: Optional[int]) -> Optional[int]:
+    """Checks how long the event loop may be blocked before the watchdog logs it. ``None`` (``null``) turns the
+    watchdog off.
+
+    :param watchdog_threshold_ms:
+
+    :return: ``watchdog_threshold_ms``
+
+    :raises ConfigError:
+    """
+    if watchdog_threshold_ms is None:
+        return None
+
+    return validate_positive_integer("watchdog_threshold_ms", watchdog_threshold_ms)
+
+
+def validate_rate_limits(rate_limits: dict) -> dict:
+    """Checks the command rate limits, written as ``{"command": {"scope": [uses, per_seconds]}}`` where scope is
+    ``"user"``, ``"channel"`` or ``"guild"``.
+
+    :param rate_limits:
+
+    :return: ``{command: {scope: (uses, per_seconds)}}``
+
+    :raises ConfigError:
+    """
+    if not isinstance(rate_limits, dict):
+        raise ConfigError("rate_limits", message=f"Must be an object of command names, got: {rate_limits!r}")
+
+    validated = {}
+
+    for command, buckets in rate_limits.items():
+        if not isinstance(buckets, dict):
+            raise ConfigError("rate_limits", message=f"The limits of '{command}' must be an object, got: {buckets!r}")
+
+        validated[command] = {}
+
+        for scope, limit in buckets.items():
+            if scope not in RATE_LIMIT_SCOPES:
+                raise ConfigError("rate_limits", message=f"The scope of a '{command}' limit must be one of "
+                                                         f"{', '.join(RATE_LIMIT_SCOPES)}, got: {scope!r}")
+
+            if (not isinstance(limit, (list, tuple)) or len(limit) != 2
+                    or isinstance(limit[0], bool) or not isinstance(limit[0], int) or limit[0] <= 0
+                    or isinstance(limit[1], bool) or not isinstance(limit[1], (int, float)) or limit[1] <= 0):
+                raise ConfigError("rate_limits", message=f"The '{command}' {scope} limit must be [uses, seconds] "
+                                                         f"with both greater than 0, got: {limit!r}")
+
+            validated[command][scope] = (limit[0], float(limit[1]))
+
+    return validated
+
+
 class Values:
     def __init__(self):
-        try:
-            json_config = load_json_config()
+        """Every configuration value, as attributes named after the upper-cased configuration key.
 
-            self.TOKEN: str = validate_token(json_config["enable_token_validation"], json_config["token"])
-            self.DATABASE_PATH: str = validate_database_path(json_config["database_path"])
-            self.COMMAND_PREFIX: str = validate_command_prefix(json_config["command_prefix"])
-            self.OWNER_IDS: list = validate_owner_ids(json_config["owner_ids"])
-            self.PRINT_INTRO: bool = validate_print_intro(json_config["print_intro"])
+        Nothing is read until ``load()`` is called at startup, so importing ``bot_code`` never touches the file system
+        or the network.
+        """
+        self.loaded: bool = False
+        self.file_path: Optional[str] = None
+
+        # The parsed file the current values came from, to tell what a reload changes.
+        self.json_config: dict = {}
+
+    def load(self, file_path: str = "/opt/archon/etc/discord_bot_config.json"):
+        """Reads and validates the configuration file. Exits with ``78`` (``EX_CONFIG``) if any value is invalid.
+
+        :param file_path: The path to the configuration file.
+
+        :return: ``None``
+        """
+        try:
+            self.validate(load_json_config(file_path))
 
         except ConfigError as error:
             print(f"{EROR_LOG} Invalid configuration: {error.faulty_key}: {error.message}")
@@ -244,5 +635,94 @@ class Values:
             # For POSIX-compliance.
             sys.exit(78)
 
+        self.file_path = file_path
+        self.loaded = True
+
+    def validate(self, json_config: dict):
+        """Runs every validator over a parsed configuration file and stores the results as attributes.
+
+        :param json_config:
+
+        :return: ``None``
+
+        :raises ConfigError:
+        """
+        self.TOKEN: str = json_config["token"]
+        self.TOKEN_VALIDATION: bool = validate_token_validation(json_config["enable_token_validation"], self.TOKEN)
+        self.DATABASE_PARTITIONS: int = validate_positive_integer(
+            "database_partitions", json_config.get("database_partitions", 1))
+        self.DATABASE_PATH: str = validate_database_path(json_config["database_path"], self.DATABASE_PARTITIONS)
+        self.COMMAND_PREFIX: str = validate_command_prefix(json_config["command_prefix"])
+        self.OWNER_IDS: list = validate_owner_ids(json_config["owner_ids"])
+        self.PRINT_INTRO: bool = validate_print_intro(json_config["print_intro"])
+
+        # Optional keys, older configuration files don't have them.
+        self.WRITE_BEHIND: bool = validate_boolean(
+            "enable_write_behind", json_config.get("enable_write_behind", False))
+        self.WRITE_BEHIND_BATCH_SIZE: int = validate_positive_integer(
+            "write_behind_batch_size", json_config.get("write_behind_batch_size", 500))
+        self.WRITE_BEHIND_MAX_DELAY_MS: int = validate_positive_integer(
+            "write_behind_max_delay_ms", json_config.get("write_behind_max_delay_ms", 250))
+        self.GUILD_CONFIG_CACHE_SIZE: Optional[int] = validate_guild_config_cache_size(
+            json_config.get("guild_config_cache_size"))
+        self.DATABASE_READER_POOL_SIZE: int = validate_database_reader_pool_size(
+            json_config.get("database_reader_pool_size", 2))
+        self.BACKUP_DIRECTORY: str = validate_backup_directory(
+            json_config.get("backup_directory", "/opt/archon/var/backups"))
+        self.BACKUP_INTERVAL_HOURS: Optional[float] = validate_backup_interval_hours(
+            json_config.get("backup_interval_hours"))
+        self.BACKUP_KEEP: int = validate_positive_integer("backup_keep", json_config.get("backup_keep", 7))
+        self.MAINTENANCE_WINDOW: Optional[Tuple[int, int]] = validate_maintenance_window(
+            json_config.get("maintenance_window"))
+        self.QUERY_PROFILER: bool = validate_boolean(
+            "enable_query_profiler", json_config.get("enable_query_profiler", False))
+        self.SLOW_QUERY_MS: int = validate_positive_integer(
+            "slow_query_ms", json_config.get("slow_query_ms", 100))
+        self.TOKEN_VALIDATION_CACHE_HOURS: Optional[float] = validate_token_validation_cache_hours(
+            json_config.get("token_validation_cache_hours", 24))
+        self.QUICK_RESTART: bool = validate_boolean("quick_restart", json_config.get("quick_restart", False))
+        self.RATE_LIMITS: dict = validate_rate_limits(json_config.get("rate_limits", DEFAULT_RATE_LIMITS))
+        self.METRICS_HOST: str = validate_metrics_host(json_config.get("metrics_host", "127.0.0.1"))
+        self.METRICS_PORT: Optional[int] = validate_metrics_port(json_config.get("metrics_port"))
+        self.WATCHDOG_THRESHOLD_MS: Optional[int] = validate_watchdog_threshold_ms(
+            json_config.get("watchdog_threshold_ms", 250))
+
+        self.json_config = json_config
+
+    def reload(self) -> List[str]:
+        """Re-reads the configuration file the values were loaded from and, if every value is valid and only keys in
+        ``LIVE_KEYS`` changed, replaces the values all at once. Otherwise, nothing changes.
+
+        Applying the new values to the running bot is up to the caller (see ``reload_config()`` in ``reload.py``).
+
+        :return: The configuration keys that changed.
+
+        :raises ConfigError: If the file is invalid or a key that can't change while running did.
+        """
+        json_config = load_json_config(self.file_path)
+
+        changed = sorted(key for key in set(json_config) | set(self.json_config)
+                         if json_config.get(key) != self.json_config.get(key))
+
+        frozen = [key for key in changed if key not in LIVE_KEYS]
+
+        if frozen:
+            raise ConfigError(", ".join(frozen), message="Cannot be changed while the bot is running, restart it to "
+                                                         "apply the change")
+
+        # Validated on a copy so a bad value never leaves a mix of old and new settings behind.
+        candidate = Values()
+
+        try:
+            candidate.validate(json_config)
+
+        except KeyError as error:
+            raise ConfigError(error.args[0], message="Missing from the configuration file")
+
+        vars(self).update({name: value for name, value in vars(candidate).items()
+                           if name not in ("loaded", "file_path")})
+
+        return changed
+
 
 VALUES = Values()
@@ -22,43 +22,121 @@ FROM, OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER
 DEALINGS IN THE SOFTWARE.
 """
 
+from __future__ import annotations
+
+import asyncio
+import sqlite3
+import sys
 from datetime import datetime
-from typing import Optional
+from time import perf_counter
+from typing import TYPE_CHECKING, Any, Callable, Dict, Iterable, List, Optional, Sequence, Tuple, Union
 
-import discord
 import aiosqlite
 from unidecode import unidecode
 
+from .cache import *
+from .metrics import *
 from .exceptions import *
+from .migrations import *
+from .pool import *
+from .profiler import *
+from .prefixes import *
+from .write_behind import *
+
+# discord.py is only used in annotations here, and takes longer to import than everything else combined.
+if TYPE_CHECKING:
+    import discord
 
 __all__ = (
     'Database',
 )
 
+# ``(query, parameters)``, see ``Database.unit_of_work()``.
+Statement = Tuple[str, Union[tuple, list]]
+
+# Series of ``METRICS.database`` by operation name, shared by every ``Database`` (see ``submit()``).
+OPERATION_DURATIONS = SeriesCache(METRICS.database)
+
 
 class Database:
-    def __init__(self, database_path: str = "/opt/archon/var/db/database.sqlite3"):
-        """
+    def __init__(self, database_path: str = "/opt/archon/var/db/database.sqlite3", cache_size_kib: int = 16384,
+                 mmap_size: int = 268435456, busy_timeout: int = 5000, config_cache_size: Optional[int] = None,
+                 reader_pool_size: int = 2, profiler: Optional[QueryProfiler] = None):
+        """A single, long-lived SQLite3 connection shared by every command and event handler.
+
         Usage::
 
-            async with Database() as db:
-                await db.func()
-                    ...
+            database = Database()
+
+            await database.connect()  # Once, in ``start_bot()``.
+            await database.func()
+                ...
+            await database.close()  # Once, in ``stop_bot()``.
+
+        Where ``func()`` is any of the methods. ``async with Database() as db:`` still works for short-lived scripts,
+        but the bot itself should never open and close the connection per event.
 
-        Where ``func()`` is any of the methods.
+        The connection runs in WAL journal mode so readers don't block the writer, and every multi-statement write is
+        serialized through ``self.lock`` so concurrent handlers can't interleave their transactions on the shared
+        connection. Queries go through a separate pool of read-only connections (``self.readers``) so they never wait
+        behind a write transaction.
 
         :param database_path: Path to the SQLite3 database file.
+        :param cache_size_kib: Size of SQLite's page cache in KiB.
+        :param mmap_size: Maximum number of bytes of the database file to memory-map.
+        :param busy_timeout: Milliseconds to wait on a locked database before raising ``OperationalError``.
+        :param config_cache_size: Maximum number of ``"General Configuration"`` rows kept in memory, or ``None`` to
+            keep all of them.
+        :param reader_pool_size: Number of read-only connections used by queries, or ``0`` to run queries on the
+            writer connection.
+        :param profiler: Records timings and query plans of every job sent to a connection (see ``profiler.py``), or
+            ``None`` to not profile.
         """
         self.db_path: str = database_path
         self.db_instance: Optional[aiosqlite.Connection] = None
 
+        self.cache_size_kib = cache_size_kib
+        self.mmap_size = mmap_size
+        self.busy_timeout = busy_timeout
+
+        # Serializes transactions on the shared (writer) connection.
+        self.lock = TrackedLock()
+
+        self.readers: Optional[ReaderPool] = ReaderPool(
+            database_path=database_path,
+            size=reader_pool_size,
+            cache_size_kib=cache_size_kib,
+            mmap_size=mmap_size,
+            busy_timeout=busy_timeout
+        ) if reader_pool_size else None
+
+        self.profiler = profiler
+
+        # Read-through, write-through copy of "General Configuration" (see ``get_guild_config()``).
+        self.guild_config = GuildConfigCache(max_size=config_cache_size)
+
+        # Guild ID to "Command Prefix", only for guilds that set one. Always complete (even if ``guild_config`` is
+        # size-limited), since it is read for every message (see ``get_prefix()``).
+        self.prefixes: Dict[int, str] = {}
+
+        # Only set when write-behind mode is enabled (see ``enable_write_behind()``).
+        self.write_queue: Optional[WriteBehindQueue] = None
+
+    @property
+    def databases(self) -> List["Database"]:
+        """Every database file behind this object, for maintenance that works file by file. ``PartitionedDatabase``
+        returns one per partition.
+
+        :return: ``[self]``
+        """
+        return [self]
+
     async def __aenter__(self) -> "Database":
-        """Open the SQLite3 database connection and return the database object.
+        """Open the SQLite3 database connection (if it isn't already) and return the database object.
 
         :return: ``Database``
         """
-        if not self.db_instance:
-            self.db_instance = await aiosqlite.connect(self.db_path)
+        await self.connect()
 
         return self
 
@@ -70,35 +148,346 @@ class Database:
         :param exc_tb:
         :return: ``None``
         """
+        await self.close()
+
+    async def connect(self):
+        """Opens the shared SQLite3 connection and applies the connection pragmas. Calling this on an already open
+        ``Database`` does nothing.
+
+        :return: ``None``
+
+        :raises DatabaseError: If the connection can't be opened or configured.
+        """
         if self.db_instance:
-            await self.db_instance.close()
+            return
+
+        try:
+            self.db_instance = await aiosqlite.connect(self.db_path)
+
+            # journal_mode is persistent in the database file, the rest are per-connection.
+            await self.db_instance.execute("PRAGMA journal_mode = WAL")
+            await self.db_instance.execute("PRAGMA synchronous = NORMAL")  # Durable in WAL mode, no fsync per commit.
+            await self.db_instance.execute(f"PRAGMA cache_size = -{int(self.cache_size_kib)}")
+            await self.db_instance.execute(f"PRAGMA mmap_size = {int(self.mmap_size)}")
+            await self.db_instance.execute(f"PRAGMA busy_timeout = {int(self.busy_timeout)}")
+            await self.db_instance.execute("PRAGMA temp_store = MEMORY")
+
+        except aiosqlite.Error as error:
+            await self.close()
+
+            raise DatabaseError(f"An error occurred when opening the database '{self.db_path}': {error}")
+
+        # Opened after the writer, which is what switches the database file to WAL mode.
+        if self.readers:
+            try:
+                await self.readers.open()
+
+            except DatabaseError:
+                await self.close()
+
+                raise
+
+    async def close(self):
+        """Flushes any queued writes and waits for any in-flight transaction to finish, then closes the shared SQLite3
+        connection.
+
+        :return: ``None``
+        """
+        if self.write_queue:
+            await self.write_queue.stop()
 
-            self.db_instance = None
+            self.write_queue = None
+
+        async with self.lock:
+            if self.readers:
+                await self.readers.close()
+
+            if self.db_instance:
+                await self.db_instance.close()
+
+                self.db_instance = None
+
+    async def submit(self, connection: aiosqlite.Connection, work: Callable[[sqlite3.Connection], Any],
+                     operation: str) -> Any:
+        """Runs a synchronous callable over the raw ``sqlite3.Connection`` as one job on an aiosqlite connection's
+        worker thread, through the profiler if there is one. Every statement ``Database`` runs after startup goes
+        through here, and is timed in ``METRICS``.
+
+        :param connection: Writer or reader connection.
+        :param work:
+        :param operation: Name the job is profiled and timed under.
+
+        :return: Whatever ``work`` returns.
+        """
+        started = perf_counter()
+
+        try:
+            if self.profiler:
+                return await self.profiler.run(connection, work, operation)
+
+            # aiosqlite has no public API to run a callable on its thread; _execute() is what its own methods use.
+            return await connection._execute(lambda: work(connection._conn))
+
+        finally:
+            OPERATION_DURATIONS[operation].observe(perf_counter() - started)
+
+    async def fetch(self, query: str, parameters: tuple = (), operation: Optional[str] = None) \
+            -> Tuple[List[str], List[tuple]]:
+        """Runs a read-only query on a reader connection (or on the writer if there's no reader pool), as a single
+        worker thread hop.
+
+        :param query:
+        :param parameters:
+        :param operation: Name the query is profiled and timed under. Defaults to the calling method's name.
+
+        :return: The column names and every row of the result.
+
+        :raises aiosqlite.Error: If the query fails. Callers wrap it in ``DatabaseError`` with their own context.
+        """
+        if operation is None:
+            operation = sys._getframe(1).f_code.co_name
+
+        def query_rows(connection: sqlite3.Connection) -> Tuple[List[str], List[tuple]]:
+            cursor = connection.execute(query, parameters)
+
+            return [column[0] for column in cursor.description], cursor.fetchall()
+
+        if not self.readers:
+            return await self.submit(self.db_instance, query_rows, operation)
+
+        async with self.readers.acquire() as connection:
+            return await self.submit(connection, query_rows, operation)
+
+    def pool_stats(self) -> dict:
+        """Queue-depth statistics of the writer and of the reader pool, to spot reads or writes starving.
+
+        :return: ``{"writer": {...}, "readers": {...}}``, see ``TrackedLock.stats()`` and ``ReaderPool.stats()``.
+        """
+        return {
+            "writer": self.lock.stats(),
+            "readers": self.readers.stats() if self.readers else None,
+        }
 
     async def create_db(self):
-        """Creates the database schema from the SQL script in .../etc/schema.sql.
+        """Brings the database schema up to date by running every migration in ``migrations.py`` newer than the
+        database's ``PRAGMA user_version``.
+
+        Each migration runs in its own transaction together with the ``user_version`` bump, so a failed migration
+        leaves the database at the last good version. Migrations that can't run in a transaction (e.g. ``VACUUM``)
+        bump ``user_version`` after their last statement instead. An already up to date database costs a single pragma read.
 
         :return: ``None``
 
         :raises DatabaseError: IF a fatal SQLite error occurs.
         """
+        async with self.lock:
+            try:
+                version = (await self.db_instance.execute_fetchall("PRAGMA user_version"))[0][0]
+
+            except aiosqlite.Error as error:
+                raise DatabaseError(f"A fatal error occurred when reading the schema version: {error}")
+
+            if version >= LATEST_SCHEMA_VERSION:
+                return
+
+            for migration_version, description, script, transactional in MIGRATIONS:
+                if migration_version <= version:
+                    continue
+
+                try:
+                    if transactional:
+                        # executescript() commits any open transaction first, so the transaction is part of the script.
+                        await self.db_instance.executescript(
+                            f"BEGIN TRANSACTION;\n{script}\nPRAGMA user_version = {int(migration_version)};\nCOMMIT;"
+                        )
+
+                    else:
+                        # Each statement is atomic on its own, so the version is only bumped once they all succeeded.
+                        await self.db_instance.executescript(script)
+                        await self.db_instance.execute(f"PRAGMA user_version = {int(migration_version)}")
+
+                except aiosqlite.Error as error:
+                    await self.db_instance.rollback()
+
+                    raise DatabaseError(f"A fatal error occurred during database migration {migration_version} "
+                                        f"({description}): {error}")
+
+                print(f"{INFO_LOG} Migrated the database '{self.db_path}' to version {migration_version}: {description}")
+
+    async def load_guild_configs(self):
+        """Loads the ``"General Configuration"`` table into the guild configuration cache with one bulk query.
+
+        If the cache has a size limit, only that many rows are loaded; the rest are read through on first use.
+
+        :return: ``None``
+
+        :raises DatabaseError: If the database operation fails.
+        """
+        query = 'SELECT * FROM "General Configuration"'
+
+        if self.guild_config.max_size is not None:
+            query += f" LIMIT {int(self.guild_config.max_size)}"
+
         try:
-            with open("/opt/archon/etc/schema.sql", "r") as db_schema:
-                schema = db_schema.read()
+            columns, rows = await self.fetch(query)
+
+            self.guild_config.load(columns=columns, rows=rows)
 
-                await self.db_instance.executescript(schema)
+            _, rows = await self.fetch('SELECT "Server ID", "Command Prefix" FROM "General Configuration" '
+                                       'WHERE "Command Prefix" IS NOT NULL')
 
-                await self.db_instance.commit()
+            self.prefixes = dict(rows)
 
-        except (aiosqlite.IntegrityError, aiosqlite.ProgrammingError, aiosqlite.OperationalError) as error:
-            await self.db_instance.rollback()
+        except aiosqlite.Error as error:
+            raise DatabaseError(f"An error occurred when loading the guild configurations: {error}")
+
+        print(f"{INFO_LOG} Cached the configuration of {len(self.guild_config)} guild(s), {len(self.prefixes)} with "
+              f"their own command prefix")
+
+    async def round_trip(self) -> float:
+        """Runs the cheapest possible query the way every other read runs, to measure the database's responsiveness
+        (including waiting for a reader connection and the worker thread).
 
-            raise DatabaseError(f"A fatal error occurred during database creation: {error}")
+        :return: Seconds taken.
+
+        :raises DatabaseError: If the database operation fails.
+        """
+        started = perf_counter()
+
+        try:
+            await self.fetch("SELECT 1")
 
         except aiosqlite.Error as error:
-            await self.db_instance.rollback()
+            raise DatabaseError(f"An error occurred when pinging the database: {error}")
+
+        return perf_counter() - started
+
+    async def count_guilds(self) -> int:
+        """:return: The number of guilds stored in ``"Statistics"``.
+
+        :raises DatabaseError: If the database operation fails.
+        """
+        try:
+            _, rows = await self.fetch('SELECT count(*) FROM "Statistics"')
+
+        except aiosqlite.Error as error:
+            raise DatabaseError(f"An error occurred when counting the guilds in the database: {error}")
+
+        return rows[0][0]
+
+    async def get_guild_config(self, guild_id: int) -> Optional[dict]:
+        """Returns the ``"General Configuration"`` row of a guild as a ``dict`` of column names to values (without
+        ``"Server ID"``), or ``None`` if the guild has no row.
+
+        Served from memory; rows that aren't cached are read from the database and cached. The returned ``dict`` is
+        shared with the cache and must not be modified.
+
+        :param guild_id:
+
+        :return: The row, or ``None``.
+
+        :raises DatabaseError: If the row has to be read and the database operation fails.
+        """
+        try:
+            return self.guild_config.get(guild_id)
+
+        except KeyError:
+            pass
+
+        version = self.guild_config.version
+
+        try:
+            columns, rows = await self.fetch(
+                'SELECT * FROM "General Configuration" WHERE "Server ID" = ?',
+                (guild_id,)
+            )
+
+        except aiosqlite.Error as error:
+            raise DatabaseError(f"An error occurred when reading the configuration of guild {guild_id}: {error}")
+
+        row = dict(zip(columns[1:], rows[0][1:])) if rows else None
 
-            raise DatabaseError(f"An error occurred during database creation: {error}")
+        # Not cached if a write landed during the read, the row may be older than it.
+        self.guild_config.fill(guild_id, row, version)
+
+        return row
+
+    async def unit_of_work(self, work: Union[Sequence[Statement], Callable[[sqlite3.Connection], Any]],
+                           operation: Optional[str] = None) -> Any:
+        """Runs a whole transaction as one job on the connection's worker thread.
+
+        Every ``await self.db_instance.execute(...)`` is a round trip to aiosqlite's worker thread and a wakeup of the
+        event loop. A unit of work sends the ``BEGIN``, every statement and the ``COMMIT`` (or ``ROLLBACK`` on failure)
+        to the thread at once, so a transaction costs a single round trip no matter how many statements it has.
+
+        ``work`` is either:
+
+        * A sequence of ``(query, parameters)`` statements. If ``parameters`` is a ``list``, the statement is run with
+          ``executemany()``. Returns a list with the fetched rows of each statement.
+        * A synchronous callable taking the raw ``sqlite3.Connection``. Returns whatever the callable returns. It runs
+          on the worker thread, so it must not touch the event loop or block on anything but SQLite.
+
+        :param work:
+        :param operation: Name the transaction is profiled under. Defaults to the calling method's name.
+
+        :return: See above.
+
+        :raises sqlite3.Error: If a statement fails, after the transaction is rolled back. Callers wrap it in
+            ``DatabaseError`` with their own context (``aiosqlite.Error`` is the same class).
+        """
+        if not callable(work):
+            statements = work
+
+            def work(connection: sqlite3.Connection) -> list:
+                results = []
+
+                for query, parameters in statements:
+                    if isinstance(parameters, list):
+                        cursor = connection.executemany(query, parameters)
+
+                    else:
+                        cursor = connection.execute(query, parameters)
+
+                    results.append(cursor.fetchall())
+
+                return results
+
+        def transaction(connection: sqlite3.Connection) -> Any:
+            connection.execute("BEGIN TRANSACTION")
+
+            try:
+                result = work(connection)
+
+            except BaseException:
+                connection.rollback()
+
+                raise
+
+            connection.commit()
+
+            return result
+
+        if operation is None:
+            operation = sys._getframe(1).f_code.co_name
+
+        return await self.run_exclusive(transaction, operation=operation)
+
+    async def run_exclusive(self, work: Callable[[sqlite3.Connection], Any], operation: Optional[str] = None) -> Any:
+        """Runs a synchronous callable over the raw ``sqlite3.Connection`` on the writer's worker thread, holding the
+        writer lock but without opening a transaction (for statements that can't run in one, like checkpoints).
+
+        :param work:
+        :param operation: Name the job is profiled under. Defaults to the calling method's name.
+
+        :return: Whatever ``work`` returns.
+
+        :raises sqlite3.Error: If ``work`` raises it.
+        """
+        if operation is None:
+            operation = sys._getframe(1).f_code.co_name
+
+        async with self.lock:
+            return await self.submit(self.db_instance, work, operation)
 
     async def add_guild(self, guild: discord.Guild):
         """Adds a new guild to the database using the provided ``discord.Guild`` object.
@@ -115,26 +504,19 @@ class Database:
         current_date = datetime.now().strftime("%Y-%m-%d")  # Example: 2025-10-22
 
         try:
-            await self.db_instance.execute("BEGIN TRANSACTION")
-
-            # Unidecode is used to cleanse the guild name for non-ASCII characters.
-            await self.db_instance.execute(
-                'INSERT INTO "Statistics" ("Server Name", "Server ID", "Join Date") VALUES (?, ?, ?)',
-                (unidecode(guild.name), guild.id, current_date)
-            )
-                
-            await self.db_instance.execute(
-                'INSERT INTO "General Configuration" ("Server ID") VALUES (?)',
-                (guild.id,)
-            )
-
-            await self.db_instance.commit()
+            await self.unit_of_work([
+                # Unidecode is used to cleanse the guild name for non-ASCII characters.
+                ('INSERT INTO "Statistics" ("Server Name", "Server ID", "Join Date") VALUES (?, ?, ?)',
+                 (unidecode(guild.name), guild.id, current_date)),
+                ('INSERT INTO "General Configuration" ("Server ID") VALUES (?)',
+                 (guild.id,)),
+            ])
 
         except aiosqlite.Error as error:
-            await self.db_instance.rollback()
-
             raise DatabaseError(f"An error occurred when adding guild {guild.name} ({guild.id}) to the database: {error}")
 
+        self.guild_config.add(guild.id)
+
     async def delete_guild(self, guild: discord.Guild):
         """Uses the ``discord.Guid`` class to delete a guild and its entire configuration data from the database (used
         in the ``on_guild_remove()`` event in ``events.py``).
@@ -143,25 +525,17 @@ class Database:
         :return:
         """
         try:
-            await self.db_instance.execute("BEGIN TRANSACTION")
-
-            await self.db_instance.execute(
-                'DELETE FROM "Statistics" WHERE "Server ID" = (?)',
-                (guild.id,)
-            )
-
-            await self.db_instance.execute(
-                'DELETE FROM "General Configuration" WHERE "Server ID" = (?)',
-                (guild.id,)
-            )
-
-            await self.db_instance.commit()
+            await self.unit_of_work([
+                ('DELETE FROM "Statistics" WHERE "Server ID" = (?)', (guild.id,)),
+                ('DELETE FROM "General Configuration" WHERE "Server ID" = (?)', (guild.id,)),
+            ])
 
         except aiosqlite.Error as error:
-            await self.db_instance.rollback()
-
             raise DatabaseError(f"An error occurred when deleting guild '{guild.name}' ({guild.id}) from the database: {error}")
 
+        self.guild_config.delete(guild.id)
+        self.prefixes.pop(guild.id, None)
+
     async def add_admin_role(self, role: discord.Role, guild: discord.Guild):
         """Takes the ``discord.Role`` object and adds it to the database according the guild id in the ``discord.Guild``
         object.
@@ -169,18 +543,349 @@ class Database:
         :param role:
         :param guild:
         :return:
+
+        :raises DatabaseError: If the database operation fails, or the guild isn't in the database.
         """
+        # A guild added in write-behind mode may still be queued, and the UPDATE would match no row.
+        if self.write_queue:
+            await self.write_queue.flush()
+
         try:
-            await self.db_instance.execute("BEGIN TRANSACTION")
+            updated = await self.unit_of_work(lambda connection: connection.execute(
+                'UPDATE "General Configuration" SET "Admin Role ID" = ? WHERE "Server ID" = ?', (role.id, guild.id)
+            ).rowcount)
 
-            await self.db_instance.execute(
-                'UPDATE "General Configuration" SET "Admin Role ID" = ? WHERE "Server ID" = ?',
-                (role.id, guild.id)
-            )
+        except aiosqlite.Error as error:
+            raise DatabaseError(f"An error occurred when updating the admin role id for guild '{guild.name}' ({guild.id}): {error}")
+
+        if not updated:
+            raise DatabaseError(f"An error occurred when updating the admin role id for guild '{guild.name}' "
+                                f"({guild.id}): the guild isn't in the database")
+
+        self.guild_config.update(guild.id, "Admin Role ID", role.id)
+
+    def get_prefix(self, guild_id: int) -> Optional[str]:
+        """Returns the command prefix a guild set, or ``None`` if it uses the global one. Only reads memory, so it is
+        safe to call for every message.
+
+        :param guild_id:
+
+        :return: The prefix, or ``None``.
+        """
+        return self.prefixes.get(guild_id)
+
+    async def set_prefix(self, guild: discord.Guild, prefix: Optional[str]):
+        """Sets the command prefix of a guild, or goes back to the global one if ``prefix`` is ``None``.
+
+        :param guild:
+        :param prefix: Must already be validated (see ``validate_command_prefix()``).
+        :return: ``None``
 
-            await self.db_instance.commit()
+        :raises DatabaseError: If the database operation fails, or the guild isn't in the database.
+        """
+        # See add_admin_role().
+        if self.write_queue:
+            await self.write_queue.flush()
+
+        try:
+            updated = await self.unit_of_work(lambda connection: connection.execute(
+                'UPDATE "General Configuration" SET "Command Prefix" = ? WHERE "Server ID" = ?', (prefix, guild.id)
+            ).rowcount)
 
         except aiosqlite.Error as error:
-            await self.db_instance.rollback()
+            raise DatabaseError(f"An error occurred when updating the command prefix for guild '{guild.name}' ({guild.id}): {error}")
 
-            raise DatabaseError(f"An error occurred when updating the admin role id for guild '{guild.name}' ({guild.id}): {error}")
+        if not updated:
+            raise DatabaseError(f"An error occurred when updating the command prefix for guild '{guild.name}' "
+                                f"({guild.id}): the guild isn't in the database")
+
+        self.guild_config.update(guild.id, "Command Prefix", prefix)
+
+        if prefix is None:
+            self.prefixes.pop(guild.id, None)
+
+        else:
+            self.prefixes[guild.id] = prefix
+
+    async def add_scheduled_deletions(self, deletions: Sequence[Tuple[int, int, Optional[int], float]]):
+        """Stores messages in ``"Scheduled Deletions"`` so they are still deleted if the bot restarts first.
+
+        :param deletions: ``(message_id, channel_id, guild_id, due_at)`` tuples, where ``guild_id`` is ``None`` for
+            direct messages and ``due_at`` is a UNIX timestamp.
+        :return: ``None``
+
+        :raises DatabaseError: If the database operation fails.
+        """
+        try:
+            await self.unit_of_work([
+                ('INSERT OR REPLACE INTO "Scheduled Deletions" ("Message ID", "Channel ID", "Server ID", "Due At") '
+                 'VALUES (?, ?, ?, ?)', list(deletions)),
+            ])
+
+        except aiosqlite.Error as error:
+            raise DatabaseError(f"An error occurred when scheduling {len(deletions)} message deletion(s): {error}")
+
+    async def remove_scheduled_deletions(self, message_ids: Sequence[int]):
+        """Removes messages from ``"Scheduled Deletions"`` once they have been dealt with.
+
+        :param message_ids:
+        :return: ``None``
+
+        :raises DatabaseError: If the database operation fails.
+        """
+        try:
+            await self.unit_of_work([
+                ('DELETE FROM "Scheduled Deletions" WHERE "Message ID" = ?', [(message_id,) for message_id in message_ids]),
+            ])
+
+        except aiosqlite.Error as error:
+            raise DatabaseError(f"An error occurred when removing {len(message_ids)} scheduled message deletion(s): {error}")
+
+    async def get_command_hashes(self) -> Dict[int, str]:
+        """:return: ``"Command Sync"`` as a ``dict`` of scope (``0`` for global, otherwise a guild ID) to the hash of
+        the commands last synced to it.
+
+        :raises DatabaseError: If the database operation fails.
+        """
+        try:
+            _, rows = await self.fetch('SELECT "Scope", "Payload Hash" FROM "Command Sync"')
+
+        except aiosqlite.Error as error:
+            raise DatabaseError(f"An error occurred when reading the application command hashes: {error}")
+
+        return dict(rows)
+
+    async def set_command_hash(self, scope: int, payload_hash: Optional[str]):
+        """Stores the hash of the commands just synced to a scope, or removes the scope if ``payload_hash`` is
+        ``None``.
+
+        :param scope: ``0`` for global, otherwise a guild ID.
+        :param payload_hash:
+        :return: ``None``
+
+        :raises DatabaseError: If the database operation fails.
+        """
+        if payload_hash is None:
+            statement = ('DELETE FROM "Command Sync" WHERE "Scope" = ?', (scope,))
+
+        else:
+            statement = ('INSERT OR REPLACE INTO "Command Sync" ("Scope", "Payload Hash") VALUES (?, ?)',
+                         (scope, payload_hash))
+
+        try:
+            await self.unit_of_work([statement])
+
+        except aiosqlite.Error as error:
+            raise DatabaseError(f"An error occurred when storing the application command hash of scope {scope}: {error}")
+
+    async def get_partition_count(self) -> Optional[int]:
+        """:return: The number of partitions the guild rows were last laid out for, or ``None`` if it was never stored
+            (databases from before it was).
+
+        :raises DatabaseError: If the database operation fails.
+        """
+        try:
+            _, rows = await self.fetch('SELECT "Partition Count" FROM "Partitioning" WHERE "ID" = 0')
+
+        except aiosqlite.Error as error:
+            raise DatabaseError(f"An error occurred when reading the partition count: {error}")
+
+        return rows[0][0] if rows else None
+
+    async def set_partition_count(self, partition_count: int):
+        """Stores the number of partitions the guild rows are laid out for.
+
+        :param partition_count: ``1`` when the guild tables live in this file.
+        :return: ``None``
+
+        :raises DatabaseError: If the database operation fails.
+        """
+        try:
+            await self.unit_of_work([
+                ('INSERT OR REPLACE INTO "Partitioning" ("ID", "Partition Count") VALUES (0, ?)', (partition_count,))
+            ])
+
+        except aiosqlite.Error as error:
+            raise DatabaseError(f"An error occurred when storing the partition count: {error}")
+
+    async def get_scheduled_deletions(self) -> List[Tuple[int, int, Optional[int], float]]:
+        """:return: Every row of ``"Scheduled Deletions"`` as ``(message_id, channel_id, guild_id, due_at)``.
+
+        :raises DatabaseError: If the database operation fails.
+        """
+        try:
+            _, rows = await self.fetch('SELECT "Message ID", "Channel ID", "Server ID", "Due At" FROM "Scheduled Deletions"')
+
+        except aiosqlite.Error as error:
+            raise DatabaseError(f"An error occurred when reading the scheduled message deletions: {error}")
+
+        return [tuple(row) for row in rows]
+
+    def enable_write_behind(self, max_batch_size: int = 500, max_delay: float = 0.25):
+        """Starts the write-behind queue used by ``queue_add_guild()`` and ``queue_delete_guild()``.
+
+        Queued guild mutations are applied in batches of up to ``max_batch_size`` rows, at most ``max_delay`` seconds
+        after they were queued, with a single transaction (and fsync) per batch. Anything still queued is flushed by
+        ``close()``.
+
+        :param max_batch_size: Maximum number of mutations per batch.
+        :param max_delay: Maximum number of seconds a mutation waits before being written.
+
+        :return: ``None``
+        """
+        if self.write_queue:
+            return
+
+        self.write_queue = WriteBehindQueue(apply_batch=self.apply_guild_batch,
+                                            max_batch_size=max_batch_size,
+                                            max_delay=max_delay)
+        self.write_queue.start()
+
+    def queue_add_guild(self, guild: discord.Guild):
+        """Write-behind version of ``add_guild()``. Returns immediately, the row is written by the next batch.
+
+        :param guild:
+
+        :return: ``None``
+        """
+        current_date = datetime.now().strftime("%Y-%m-%d")
+
+        self.write_queue.put("add", (unidecode(guild.name), guild.id, current_date))
+
+        # The cache is updated right away so reads agree with the queued write.
+        self.guild_config.add(guild.id)
+
+    def queue_delete_guild(self, guild: discord.Guild):
+        """Write-behind version of ``delete_guild()``. Returns immediately, the rows are deleted by the next batch.
+
+        :param guild:
+
+        :return: ``None``
+        """
+        self.write_queue.put("delete", (guild.id,))
+
+        self.guild_config.delete(guild.id)
+        self.prefixes.pop(guild.id, None)
+
+    async def apply_guild_batch(self, batch: list):
+        """Applies a batch of queued guild mutations in one transaction.
+
+        The batch is split into runs of consecutive mutations of the same kind, and each run is sent with a single
+        ``executemany()``. Keeping the runs in order means a guild that is added and removed within one batch ends up
+        in the same state as if each mutation was written on its own. Inserts use ``OR IGNORE`` so a guild that's
+        already stored (e.g. replayed after a reconnect) can't fail the whole batch.
+
+        :param batch: List of ``(operation, parameters)`` tuples queued by ``queue_add_guild()`` and
+            ``queue_delete_guild()``.
+
+        :return: ``None``
+
+        :raises DatabaseError: If the database operation fails. None of the batch is applied in that case.
+        """
+        runs = []
+
+        for operation, parameters in batch:
+            if runs and runs[-1][0] == operation:
+                runs[-1][1].append(parameters)
+
+            else:
+                runs.append((operation, [parameters]))
+
+        statements = []
+
+        for operation, rows in runs:
+            if operation == "add":
+                statements.append((
+                    'INSERT OR IGNORE INTO "Statistics" ("Server Name", "Server ID", "Join Date") VALUES (?, ?, ?)',
+                    rows
+                ))
+                statements.append((
+                    'INSERT OR IGNORE INTO "General Configuration" ("Server ID") VALUES (?)',
+                    [(guild_id,) for _, guild_id, _ in rows]
+                ))
+
+            elif operation == "delete":
+                statements.append(('DELETE FROM "Statistics" WHERE "Server ID" = (?)', rows))
+                statements.append(('DELETE FROM "General Configuration" WHERE "Server ID" = (?)', rows))
+
+        try:
+            await self.unit_of_work(statements)
+
+        except aiosqlite.Error as error:
+            raise DatabaseError(f"An error occurred when writing a batch of {len(batch)} guild changes: {error}")
+
+    async def reconcile_guilds(self, guilds: Iterable[discord.Guild], shard_ids: Optional[Sequence[int]] = None,
+                               shard_count: Optional[int] = None) -> Tuple[int, int]:
+        """Brings the database in line with the guilds the bot is actually in (used in the ``on_ready()`` event in
+        ``events.py``), catching up on guilds joined or left while the bot was offline.
+
+        The stored ``"Server ID"``s are loaded with one query and diffed against ``guilds``. The missing guilds are
+        inserted and the stale ones deleted with one ``executemany()`` per table. All of it runs as a single unit of
+        work, in one transaction.
+
+        :param guilds: Every guild the bot is in, usually ``bot.guilds``.
+        :param shard_ids: The shards this process runs, when other processes run the rest (cluster mode, see
+            ``cluster.py``). Only stored guilds on these shards are considered, the others aren't in ``guilds`` but
+            haven't been left either.
+        :param shard_count: The total number of shards, required with ``shard_ids``.
+
+        :return: The number of guilds added and removed.
+
+        :raises DatabaseError: If the database operation fails.
+        """
+        # Resolved here, guild objects belong to the event loop's thread.
+        current_guilds = {guild.id: unidecode(guild.name) for guild in guilds}
+        current_date = datetime.now().strftime("%Y-%m-%d")
+
+        def reconcile(connection: sqlite3.Connection) -> Tuple[set, set]:
+            known_ids = {row[0] for row in connection.execute('SELECT "Server ID" FROM "Statistics"')}
+
+            if shard_ids is not None:
+                # Same formula as discord.py, guild_id >> 22 is the snowflake's timestamp.
+                known_ids = {guild_id for guild_id in known_ids if (guild_id >> 22) % shard_count in shard_ids}
+
+            added_ids = current_guilds.keys() - known_ids
+            removed_ids = known_ids - current_guilds.keys()
+
+            if added_ids:
+                connection.executemany(
+                    'INSERT OR IGNORE INTO "Statistics" ("Server Name", "Server ID", "Join Date") VALUES (?, ?, ?)',
+                    [(current_guilds[guild_id], guild_id, current_date) for guild_id in added_ids]
+                )
+
+                connection.executemany(
+                    'INSERT OR IGNORE INTO "General Configuration" ("Server ID") VALUES (?)',
+                    [(guild_id,) for guild_id in added_ids]
+                )
+
+            if removed_ids:
+                connection.executemany(
+                    'DELETE FROM "Statistics" WHERE "Server ID" = (?)',
+                    [(guild_id,) for guild_id in removed_ids]
+                )
+
+                connection.executemany(
+                    'DELETE FROM "General Configuration" WHERE "Server ID" = (?)',
+                    [(guild_id,) for guild_id in removed_ids]
+                )
+
+            return added_ids, removed_ids
+
+        # Queued writes go first so they can't be undone by (or undo) the reconciliation.
+        if self.write_queue:
+            await self.write_queue.flush()
+
+        try:
+            added_ids, removed_ids = await self.unit_of_work(reconcile)
+
+        except aiosqlite.Error as error:
+            raise DatabaseError(f"An error occurred when reconciling the guilds in the database: {error}")
+
+        for guild_id in added_ids:
+            self.guild_config.add(guild_id)
+
+        for guild_id in removed_ids:
+            self.guild_config.delete(guild_id)
+            self.prefixes.pop(guild_id, None)
+
+        return len(added_ids), len(removed_ids)
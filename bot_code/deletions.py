@@ -0,0 +1,258 @@
+"""
+The MIT License (MIT)
+
+Copyright (c) 2025 Ethan Kenneth Davies
+
+Permission is hereby granted, free of charge, to any person obtaining a
+copy of this software and associated documentation files (the "Software"),
+to deal in the Software without restriction, including without limitation
+the rights to use, copy, modify, merge, publish, distribute, sublicense,
+and/or sell copies of the Software, and to permit persons to whom the
+Software is furnished to do so, subject to the following conditions:
+
+The above copyright notice and this permission notice shall be included in
+all copies or substantial portions of the Software.
+
+THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS
+OR IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING
+FROM, OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER
+DEALINGS IN THE SOFTWARE.
+"""
+
+import asyncio
+import heapq
+import time
+from collections import defaultdict
+from typing import Dict, List, Optional, Tuple
+
+import discord
+from discord.ext import commands
+
+from .database import *
+from .exceptions import *
+from .prefixes import *
+
+__all__ = (
+    'DeletionScheduler',
+)
+
+# Discord only bulk deletes 2 to 100 messages at a time, and only messages younger than 14 days.
+BULK_DELETE_LIMIT = 100
+BULK_DELETE_MAX_AGE = 14 * 24 * 60 * 60
+
+# Seconds before messages are tried again after their deletion failed with anything but an HTTP error.
+RETRY_DELAY = 60
+
+
+class DeletionScheduler:
+    def __init__(self, bot_instance: commands.Bot, database_instance: Database, coalesce_window: float = 1.0):
+        """Deletes bot messages after a delay, from one task for the whole bot instead of one sleeping task per message.
+
+        Pending deletions are kept in a heap ordered by due time and the task only wakes for the earliest one. Every
+        deletion is also stored in ``"Scheduled Deletions"``, so messages scheduled before a restart are still deleted
+        afterwards. Messages of the same channel that come due within ``coalesce_window`` seconds of each other are
+        removed with a single bulk delete where Discord allows it.
+
+        :param bot_instance:
+        :param database_instance: The ``Database`` (or ``PartitionedDatabase``) the deletions are stored in.
+        :param coalesce_window: Seconds a due deletion may wait for others in the same channel to be bulk deleted
+            with it.
+        """
+        self.bot = bot_instance
+        self.database = database_instance
+        self.coalesce_window = coalesce_window
+
+        self.heap: List[Tuple[float, int, int, Optional[int]]] = []
+        self.wakeup = asyncio.Event()
+        self.runner: Optional[asyncio.Task] = None
+
+    def owns(self, guild_id: Optional[int]) -> bool:
+        """:return: Whether this process runs the shard of ``guild_id``. Direct messages (``None``) go to shard 0."""
+        shard_ids = getattr(self.bot, "shard_ids", None)
+        shard_count = getattr(self.bot, "shard_count", None)
+
+        if shard_ids is None or not shard_count:
+            return True
+
+        return ((guild_id or 0) >> 22) % shard_count in shard_ids
+
+    async def start(self):
+        """Loads the deletions stored by a previous run and starts the scheduler. Must be called from a running event
+        loop, after the database is connected and the shard ids are set.
+
+        :return: ``None``
+
+        :raises DatabaseError: If the database operation fails.
+        """
+        if self.runner is not None:
+            return
+
+        rows = await self.database.get_scheduled_deletions()
+
+        # Other processes of a cluster load the rest.
+        self.heap = [(due_at, message_id, channel_id, guild_id) for message_id, channel_id, guild_id, due_at in rows
+                     if self.owns(guild_id)]
+        heapq.heapify(self.heap)
+
+        if self.heap:
+            print(f"{INFO_LOG} Loaded {len(self.heap)} scheduled message deletion(s)")
+
+        self.runner = asyncio.create_task(self.run())
+
+    async def stop(self):
+        """Stops the scheduler. Pending deletions stay stored and are picked up by the next ``start()``.
+
+        :return: ``None``
+        """
+        if self.runner is None:
+            return
+
+        self.runner.cancel()
+
+        try:
+            await self.runner
+
+        except asyncio.CancelledError:
+            pass
+
+        self.runner = None
+
+    async def schedule(self, message: discord.Message, delay: float):
+        """Deletes ``message`` after ``delay`` seconds. If the deletion can't be stored, it is still scheduled, but
+        won't survive a restart.
+
+        :param message:
+        :param delay:
+        :return: ``None``
+        """
+        guild_id = message.guild.id if message.guild else None
+        due_at = time.time() + delay
+
+        try:
+            await self.database.add_scheduled_deletions([(message.id, message.channel.id, guild_id, due_at)])
+
+        except DatabaseError as error:
+            print(f"{WARN_LOG} {error.message}")
+
+        heapq.heappush(self.heap, (due_at, message.id, message.channel.id, guild_id))
+
+        if self.heap[0][1] == message.id:
+            self.wakeup.set()
+
+    async def run(self):
+        """Sleeps until the earliest deletion is due, deletes everything due by then, and repeats until ``stop()``.
+
+        A channel whose deletion fails with anything but an HTTP error (see ``delete_messages()``), most likely because
+        the connection to Discord dropped, is tried again ``RETRY_DELAY`` seconds later rather than ending the only
+        task that deletes anything.
+
+        :return: ``None``
+        """
+        while True:
+            self.wakeup.clear()
+
+            timeout = self.heap[0][0] - time.time() if self.heap else None
+
+            if timeout is None or timeout > 0:
+                try:
+                    await asyncio.wait_for(self.wakeup.wait(), timeout)
+
+                except asyncio.TimeoutError:
+                    pass
+
+                continue
+
+            cutoff = time.time() + self.coalesce_window
+            due: Dict[int, List[int]] = defaultdict(list)
+            guild_ids: Dict[int, Optional[int]] = {}
+
+            while self.heap and self.heap[0][0] <= cutoff:
+                _, message_id, channel_id, guild_id = heapq.heappop(self.heap)
+                due[channel_id].append(message_id)
+                guild_ids[channel_id] = guild_id
+
+            message_ids = []
+
+            for channel_id, channel_message_ids in due.items():
+                try:
+                    await self.delete_messages(channel_id, channel_message_ids)
+
+                except Exception as error:
+                    print(f"{EROR_LOG} Deleting {len(channel_message_ids)} message(s) in channel {channel_id} failed, "
+                          f"retrying in {RETRY_DELAY} seconds: {error!r}")
+
+                    # Still stored, so a restart in between doesn't lose them either.
+                    retry_at = time.time() + RETRY_DELAY
+
+                    for message_id in channel_message_ids:
+                        heapq.heappush(self.heap, (retry_at, message_id, channel_id, guild_ids[channel_id]))
+
+                    continue
+
+                message_ids.extend(channel_message_ids)
+
+            if not message_ids:
+                continue
+
+            try:
+                await self.database.remove_scheduled_deletions(message_ids)
+
+            except DatabaseError as error:
+                print(f"{EROR_LOG} {error.message}")
+
+    def can_bulk_delete(self, channel_id: int) -> bool:
+        """:return: Whether the bot may bulk delete in the channel (a guild channel where it has Manage Messages)."""
+        channel = self.bot.get_channel(channel_id)
+
+        if channel is None or not hasattr(channel, "guild"):
+            return False
+
+        return channel.permissions_for(channel.guild.me).manage_messages
+
+    async def delete_messages(self, channel_id: int, message_ids: List[int]):
+        """Deletes messages of one channel through the HTTP API, so the channel and messages don't need to be cached.
+
+        Messages are bulk deleted in chunks of up to 100 if the bot is allowed to; the rest (and any chunk the bulk
+        delete fails for) are deleted one at a time. Messages that are already gone or can't be deleted are skipped.
+        Anything but an HTTP error (e.g. ``OSError`` or ``aiohttp.ClientError`` when the connection drops) is raised to
+        ``run()``.
+
+        :param channel_id:
+        :param message_ids:
+        :return: ``None``
+        """
+        single = list(message_ids)
+
+        if len(message_ids) > 1 and self.can_bulk_delete(channel_id):
+            oldest = time.time() - BULK_DELETE_MAX_AGE + 60
+            bulk = [message_id for message_id in message_ids
+                    if discord.utils.snowflake_time(message_id).timestamp() > oldest]
+            single = [message_id for message_id in message_ids if message_id not in bulk]
+
+            for index in range(0, len(bulk), BULK_DELETE_LIMIT):
+                chunk = bulk[index:index + BULK_DELETE_LIMIT]
+
+                if len(chunk) == 1:
+                    single.extend(chunk)
+                    continue
+
+                try:
+                    await self.bot.http.delete_messages(channel_id, chunk, reason="Scheduled deletion")
+
+                except discord.HTTPException as error:
+                    print(f"{WARN_LOG} Bulk deleting {len(chunk)} message(s) in channel {channel_id} failed, deleting "
+                          f"them one at a time: {error}")
+                    single.extend(chunk)
+
+        for message_id in single:
+            try:
+                await self.bot.http.delete_message(channel_id, message_id)
+
+            except (discord.NotFound, discord.Forbidden):
+                pass
+
+            except discord.HTTPException as error:
+                print(f"{WARN_LOG} Deleting message {message_id} in channel {channel_id} failed: {error}")
@@ -22,6 +22,9 @@ FROM, OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER
 DEALINGS IN THE SOFTWARE.
 """
 
+import math
+from typing import List
+
 from discord import Embed, User
 
 __all__ = (
@@ -47,23 +50,24 @@ class Embeds:
             color=int(self.primary_color,)
         )
 
-    def help_embed(self) -> Embed:
+    def help_embed(self, prefix: str = "?") -> Embed:
         return Embed(
             title="Help Menu",
             description=f"{self.bot_name} is an all-in-one Discord utility, "
                         "being only as complex or as simple as the admin tailors it to be.",
             color=int(self.primary_color,)
         ).add_field(
-            name="Prefix Commands: (\"?\")",
-            value=f"`?help` - Displays this help message.\n"
-                  f"`?ping` - Outputs {self.bot_name}'s websocket and API latencies in milliseconds (`ms`).",
+            name=f"Prefix Commands: (\"{prefix}\")",
+            value=f"`{prefix}help` - Displays this help message.\n"
+                  f"`{prefix}ping` - Outputs {self.bot_name}'s websocket and API latencies in milliseconds (`ms`).",
             inline=False
         ).add_field(
             name="Slash Commands: (\"/\")",
             value="`/set_admin` - Sets the server *server-wide* admin role.\n"
                   "This is used to restrict all of the following commands to just "
                   "the set admin role:\n"
-                  "   - `command_one`\n- `command_two`\n- `command_three`",
+                  "   - `command_one`\n- `command_two`\n- `command_three`\n"
+                  "`/set_prefix` - Sets the prefix of the prefix commands in this server.",
             inline=False
         )
 
@@ -81,6 +85,36 @@ class Embeds:
             color=int(self.primary_color,)
         ).set_footer(text=f"Ping issued by: `{sent_by}`")
 
+    def ping_full_embed(self, report: dict, sent_by: User) -> Embed:
+        def value(milliseconds) -> str:
+            return "unknown" if milliseconds is None else f"{milliseconds}ms"
+
+        # Slowest first, embed field values are capped at 1024 characters.
+        shards = sorted(report["shards"].items(), key=lambda shard: -1 if shard[1] is None else shard[1], reverse=True)
+        lines = [f"`{shard_id}` - `{value(latency)}`" for shard_id, latency in shards[:20]]
+
+        if len(shards) > 20:
+            lines.append(f"...and {len(shards) - 20} more")
+
+        rest = report["rest"]
+
+        return Embed(
+            title="Pong",
+            description=f"**API Latency:** `{value(report['api_ms'])}`\n"
+                        f"**Event Loop Lag:** `{value(report['loop_lag_ms'])}`\n"
+                        f"**Database Round Trip:** `{value(report['database_ms'])}`\n"
+                        f"**This Server's Shard:** `{report['guild_shard']}`",
+            color=int(self.primary_color,)
+        ).add_field(
+            name="Shard Heartbeat Latency",
+            value="\n".join(lines) or "No shards connected.",
+            inline=False
+        ).add_field(
+            name=f"API Requests (last {rest['samples']})",
+            value=f"p50 `{value(rest['p50_ms'])}`, p95 `{value(rest['p95_ms'])}`, p99 `{value(rest['p99_ms'])}`",
+            inline=False
+        ).set_footer(text=f"Ping issued by: {sent_by}")
+
     def shutdown_embed(self, sent_by: User) -> Embed:
         return Embed(
             title="Shutting down...",
@@ -88,6 +122,51 @@ class Embeds:
             color=int(self.primary_color,)
         ).set_footer(text=f"Shutdown issued by: {sent_by}")
 
+    def backup_embed(self, results: List[dict], sent_by: User) -> Embed:
+        return Embed(
+            title="Backup Complete",
+            description="\n".join(f"`{result['path']}` - `{result['bytes']:,} bytes` in `{result['seconds']:.2f}s`"
+                                  for result in results),
+            color=int(self.primary_color,)
+        ).set_footer(text=f"Backup issued by: {sent_by}")
+
+    def maintenance_embed(self, results: List[dict], sent_by: User) -> Embed:
+        return Embed(
+            title="Maintenance Complete",
+            description="\n".join(f"`{result['path']}` - `{result['pages_freed']}` page(s) freed, "
+                                  f"`{result['wal_pages_checkpointed']}` WAL page(s) checkpointed in "
+                                  f"`{result['seconds']:.2f}s`"
+                                  for result in results),
+            color=int(self.primary_color,)
+        ).set_footer(text=f"Maintenance issued by: {sent_by}")
+
+    def profile_embed(self, summary: dict, sent_by: User) -> Embed:
+        operations = "\n".join(f"`{operation}` - `{stats['count']}` call(s), p50 `{stats['p50_ms']}ms`, "
+                                f"p95 `{stats['p95_ms']}ms`, p99 `{stats['p99_ms']}ms`, "
+                                f"queued `{stats['average_queue_ms']}ms` avg"
+                                for operation, stats in summary["operations"].items())
+
+        embed = Embed(
+            title="Query Profile",
+            description=operations or "No database operations recorded yet.",
+            color=int(self.primary_color,)
+        ).set_footer(text=f"Profile requested by: {sent_by}")
+
+        if summary["full_scans"]:
+            # Embed field values are capped at 1024 characters.
+            embed.add_field(name="Full Table Scans",
+                            value="\n".join(f"`{statement}`" for statement in summary["full_scans"])[:1024],
+                            inline=False)
+
+        return embed
+
+    def reload_embed(self, changed: List[str], sent_by: User) -> Embed:
+        return Embed(
+            title="Configuration Reloaded",
+            description=("Changed: " + ", ".join(f"`{key}`" for key in changed)) if changed else "Nothing changed.",
+            color=int(self.primary_color,)
+        ).set_footer(text=f"Reload issued by: {sent_by}")
+
     def admin_role_set(self, role: str) -> Embed:
         return Embed(
             title="Admin Role Is Set",
@@ -95,6 +174,20 @@ class Embeds:
             color=int(self.primary_color,)
         )
 
+    def sync_embed(self, synced: List[str], sent_by: User) -> Embed:
+        return Embed(
+            title="Application Commands Synced",
+            description="Synced: " + ", ".join(f"`{scope}`" for scope in synced),
+            color=int(self.primary_color,)
+        ).set_footer(text=f"Sync issued by: {sent_by}")
+
+    def prefix_set(self, prefix: str) -> Embed:
+        return Embed(
+            title="Command Prefix Is Set",
+            description=f"The command prefix is set to `{prefix}`",
+            color=int(self.primary_color,)
+        )
+
     def error_client_forbidden(self) -> Embed:
         return Embed(
             title="Error: Client Forbidden",
@@ -109,6 +202,56 @@ class Embeds:
             color=int(self.error_color)
         )
 
+    def error_backup_failed(self) -> Embed:
+        return Embed(
+            title="Error: Backup Failed",
+            description="The backup could not be completed, see the log for details.",
+            color=int(self.error_color,)
+        )
+
+    def error_maintenance_failed(self) -> Embed:
+        return Embed(
+            title="Error: Maintenance Failed",
+            description="Database maintenance could not be completed, see the log for details.",
+            color=int(self.error_color,)
+        )
+
+    def error_profiler_disabled(self) -> Embed:
+        return Embed(
+            title="Error: Profiler Disabled",
+            description="The query profiler is off. Set `enable_query_profiler` to `true` in the configuration and "
+                        "restart the bot.",
+            color=int(self.error_color,)
+        )
+
+    def error_reload_rejected(self, key: str, message: str) -> Embed:
+        return Embed(
+            title="Error: Reload Rejected",
+            description=f"`{key}`: {message}. The running configuration is unchanged.",
+            color=int(self.error_color,)
+        )
+
+    def error_rate_limited(self, retry_after: float) -> Embed:
+        return Embed(
+            title="Error: Rate Limited",
+            description=f"You are using this command too often, try again in {math.ceil(retry_after)} second(s).",
+            color=int(self.error_color,)
+        )
+
+    def error_invalid_prefix(self, message: str) -> Embed:
+        return Embed(
+            title="Error: Invalid Prefix",
+            description=f"{message}. The prefix must be a single character that isn't a letter, number or whitespace.",
+            color=int(self.error_color,)
+        )
+
+    def error_sync_failed(self) -> Embed:
+        return Embed(
+            title="Error: Sync Failed",
+            description="The application commands could not be synced, see the log for details.",
+            color=int(self.error_color,)
+        )
+
     def error_guild_only(self) -> Embed:
         return Embed(
             title="Error: Guild Only",
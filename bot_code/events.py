@@ -22,13 +22,20 @@ FROM, OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER
 DEALINGS IN THE SOFTWARE.
 """
 
+from time import perf_counter
+from typing import Awaitable, Callable
+
 import discord
 from discord.ext.commands import AutoShardedBot
 
+from .command_sync import *
 from .database import *
 from .embeds import *
 from .exceptions import *
+from .metrics import *
+from .permissions import *
 from .prefixes import *
+from .timeline import *
 
 __all__ = (
     'Events',
@@ -36,33 +43,115 @@ __all__ = (
 
 
 class Events:
-    def __init__(self, bot_instance: AutoShardedBot, database_instance: Database, embed_instance: Embeds):
+    def __init__(self, bot_instance: AutoShardedBot, database_instance: Database, embed_instance: Embeds,
+                 command_sync_instance: CommandSync, permission_instance: PermissionResolver):
         self.bot = bot_instance
         self.database = database_instance
         self.embeds = embed_instance
+        self.command_sync = command_sync_instance
+        self.permissions = permission_instance
 
-        events = [self.on_ready, self.on_guild_join, self.on_guild_remove]
+        events = [self.on_ready, self.on_shard_ready, self.on_guild_join, self.on_guild_remove,
+                  self.on_guild_role_delete]
 
         # Register each method as an event
         for event in events:
-            self.bot.add_listener(event)
+            self.bot.add_listener(self.timed(event), event.__name__)
+
+        # Only counted, per shard.
+        for event_name in ("shard_connect", "shard_disconnect", "shard_resumed"):
+            self.bot.add_listener(self.counted(event_name), f"on_{event_name}")
+
+    @staticmethod
+    def timed(listener: Callable[..., Awaitable[None]]) -> Callable[..., Awaitable[None]]:
+        """:return: ``listener``, recording how long each call takes in ``METRICS``."""
+        histogram = METRICS.events.labels(listener.__name__)
+
+        async def timed_listener(*args):
+            started = perf_counter()
+
+            try:
+                await listener(*args)
+
+            finally:
+                histogram.observe(perf_counter() - started)
+
+        return timed_listener
+
+    @staticmethod
+    def counted(event_name: str) -> Callable[[int], Awaitable[None]]:
+        """:return: A listener counting a gateway event per shard in ``METRICS``."""
+        counters = SeriesCache(METRICS.gateway, event_name)
+
+        async def count(shard_id: int):
+            counters[str(shard_id)].inc()
+
+        return count
+
+    async def on_shard_ready(self, shard_id: int):
+        TIMELINE.mark(f"shard {shard_id} ready")
 
     async def on_ready(self):
+        TIMELINE.end("gateway connect")
+
         print(f"----------")
         print(f"{INFO_LOG} Bot user: {self.bot.user}")
         print(f"{INFO_LOG} Status: {self.bot.status}")
 
-        await self.bot.tree.sync()
-        print(f"{INFO_LOG} Synchronized application commands")
+        # After a quick restart the guild cache was rebuilt from the REST API (see ``ResumableBot``), and a guild that
+        # failed to fetch would be deleted. Guilds joined or left while offline arrive as replayed events instead.
+        if getattr(self.bot, "resumed", False):
+            print(f"{INFO_LOG} Resumed the previous gateway sessions, skipping guild reconciliation")
+
+        else:
+            await self.reconcile_guilds()
 
-        for shard_id in range(self.bot.shard_count):
+        await self.sync_commands()
+
+        # Only this process's shards in cluster mode.
+        for shard_id in self.bot.shards:
             print(f"{INFO_LOG} Shard {shard_id} is online")
+
+        TIMELINE.finish()
         print("----------")
 
+    async def sync_commands(self):
+        try:
+            with TIMELINE.phase("tree.sync"):
+                synced = await self.command_sync.sync()
+
+        except (DatabaseError, discord.HTTPException) as error:
+            print(f"{EROR_LOG} Could not synchronize application commands: {error}")
+
+            return
+
+        if synced:
+            print(f"{INFO_LOG} Synchronized application commands ({', '.join(synced)})")
+
+        else:
+            print(f"{INFO_LOG} Application commands are unchanged, skipped synchronizing them")
+
+    async def reconcile_guilds(self):
+        try:
+            with TIMELINE.phase("reconcile guilds"):
+                added, removed = await self.database.reconcile_guilds(self.bot.guilds, shard_ids=self.bot.shard_ids,
+                                                                      shard_count=self.bot.shard_count)
+
+            print(f"{INFO_LOG} Reconciled guilds with the database ({added} added, {removed} removed)")
+            print(f"{INFO_LOG} Guilds in the database: {await self.database.count_guilds()}")
+
+        except DatabaseError as error:
+            print(f"{EROR_LOG} {error}")
+
     async def on_guild_join(self, guild: discord.Guild):
         try:
-            async with self.database as db:
-                await db.add_guild(guild)
+            if self.database.write_queue:
+                self.database.queue_add_guild(guild)
+
+                print(f"{INFO_LOG} Queued guild '{guild.name}' to be added to the database")
+
+            else:
+                await self.database.add_guild(guild)
 
                 print(f"{INFO_LOG} Added guild '{guild.name}' to the database")
 
@@ -76,10 +165,21 @@ class Events:
 
                 break
 
+    async def on_guild_role_delete(self, role: discord.Role):
+        # The deleted role may be one a policy allowed.
+        self.permissions.invalidate(role.guild.id)
+
     async def on_guild_remove(self, guild: discord.Guild):
+        self.permissions.invalidate(guild.id)
+
         try:
-            async with self.database as db:
-                await db.delete_guild(guild)
+            if self.database.write_queue:
+                self.database.queue_delete_guild(guild)
+
+                print(f"{INFO_LOG} Queued guild '{guild.name}' to be removed from the database")
+
+            else:
+                await self.database.delete_guild(guild)
 
                 print(f"{INFO_LOG} Removed guild '{guild.name}' from the database")
 
@@ -0,0 +1,58 @@
+"""
+The MIT License (MIT)
+
+Copyright (c) 2025 Ethan Kenneth Davies
+
+Permission is hereby granted, free of charge, to any person obtaining a
+copy of this software and associated documentation files (the "Software"),
+to deal in the Software without restriction, including without limitation
+the rights to use, copy, modify, merge, publish, distribute, sublicense,
+and/or sell copies of the Software, and to permit persons to whom the
+Software is furnished to do so, subject to the following conditions:
+
+The above copyright notice and this permission notice shall be included in
+all copies or substantial portions of the Software.
+
+THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS
+OR IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING
+FROM, OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER
+DEALINGS IN THE SOFTWARE.
+"""
+
+from __future__ import annotations
+
+from typing import TYPE_CHECKING
+
+from .database import *
+
+if TYPE_CHECKING:
+    import discord
+    from discord.ext import commands
+
+__all__ = (
+    'GuildPrefixes',
+)
+
+
+class GuildPrefixes:
+    def __init__(self, database_instance: Database, default: str):
+        """The bot's ``command_prefix``: resolves the prefix of every message to the prefix its guild set, or
+        ``default`` (the ``command_prefix`` value in the configuration) in direct messages and guilds without one.
+
+        discord.py calls this for every message it receives, so it only does a ``dict`` lookup in the prefixes
+        ``Database`` preloads and updates (see ``Database.get_prefix()``), never a query.
+
+        :param database_instance: The ``Database`` (or ``PartitionedDatabase``) the guild prefixes are stored in.
+        :param default:
+        """
+        self.database = database_instance
+        self.default = default
+
+    def __call__(self, bot_instance: commands.Bot, message: discord.Message) -> str:
+        if message.guild is None:
+            return self.default
+
+        return self.database.get_prefix(message.guild.id) or self.default
@@ -0,0 +1,181 @@
+"""
+The MIT License (MIT)
+
+Copyright (c) 2025 Ethan Kenneth Davies
+
+Permission is hereby granted, free of charge, to any person obtaining a
+copy of this software and associated documentation files (the "Software"),
+to deal in the Software without restriction, including without limitation
+the rights to use, copy, modify, merge, publish, distribute, sublicense,
+and/or sell copies of the Software, and to permit persons to whom the
+Software is furnished to do so, subject to the following conditions:
+
+The above copyright notice and this permission notice shall be included in
+all copies or substantial portions of the Software.
+
+THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS
+OR IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING
+FROM, OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER
+DEALINGS IN THE SOFTWARE.
+"""
+
+import asyncio
+import json
+import os
+from typing import Awaitable, Callable, Dict, Optional
+
+from .prefixes import *
+
+__all__ = (
+    'ClusterServer',
+    'ClusterClient',
+)
+
+# Messages are JSON objects, one per line, with at least an "op" key, e.g. {"op": "shutdown"}.
+Handler = Callable[[dict], Awaitable[None]]
+
+
+async def send_message(writer: asyncio.StreamWriter, message: dict):
+    writer.write(json.dumps(message).encode() + b"\n")
+
+    await writer.drain()
+
+
+class ClusterServer:
+    def __init__(self, socket_path: str, on_message: Callable[[int, dict], Awaitable[None]]):
+        """The launcher's end of the cluster IPC channel (see ``cluster.py``): a Unix socket every worker process
+        connects to and introduces itself on with ``{"op": "hello", "cluster": <cluster ID>}``.
+
+        :param socket_path: Created on ``start()`` (owner-only permissions) and removed on ``close()``.
+        :param on_message: Called with the sending worker's cluster ID and every message after the hello.
+        """
+        self.socket_path = socket_path
+        self.on_message = on_message
+
+        self.server: Optional[asyncio.AbstractServer] = None
+        self.workers: Dict[int, asyncio.StreamWriter] = {}
+
+    async def start(self):
+        # Left behind if the previous launcher was killed.
+        if os.path.exists(self.socket_path):
+            os.unlink(self.socket_path)
+
+        self.server = await asyncio.start_unix_server(self.handle_worker, path=self.socket_path)
+
+        # Anyone who can connect can shut the bot down.
+        os.chmod(self.socket_path, 0o600)
+
+    async def close(self):
+        if self.server:
+            self.server.close()
+
+            for writer in self.workers.values():
+                writer.close()
+
+            self.workers.clear()
+
+            if os.path.exists(self.socket_path):
+                os.unlink(self.socket_path)
+
+            self.server = None
+
+    async def handle_worker(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter):
+        cluster_id = None
+
+        try:
+            hello = json.loads(await reader.readline() or b"{}")
+
+            if hello.get("op") != "hello":
+                return
+
+            cluster_id = int(hello["cluster"])
+            self.workers[cluster_id] = writer
+
+            while line := await reader.readline():
+                await self.on_message(cluster_id, json.loads(line))
+
+        except (ValueError, KeyError, ConnectionError) as error:
+            print(f"{WARN_LOG} Dropped IPC connection of cluster {cluster_id}: {error}")
+
+        finally:
+            # A restarted worker may have connected again already.
+            if cluster_id is not None and self.workers.get(cluster_id) is writer:
+                del self.workers[cluster_id]
+
+            writer.close()
+
+    async def broadcast(self, message: dict, exclude: Optional[int] = None):
+        """Sends ``message`` to every connected worker, except ``exclude``.
+
+        :return: ``None``
+        """
+        for cluster_id, writer in list(self.workers.items()):
+            if cluster_id == exclude:
+                continue
+
+            try:
+                await send_message(writer, message)
+
+            except ConnectionError as error:
+                print(f"{WARN_LOG} Could not send '{message['op']}' to cluster {cluster_id}: {error}")
+
+
+class ClusterClient:
+    def __init__(self, socket_path: str, cluster_id: int, handlers: Dict[str, Handler]):
+        """A worker process's end of the cluster IPC channel (see ``ClusterServer``).
+
+        :param socket_path:
+        :param cluster_id: This worker's index, as given by the launcher.
+        :param handlers: Called with every message from the launcher, by its ``"op"``. The ``"disconnected"`` handler
+            is called with an empty message if the launcher goes away.
+        """
+        self.socket_path = socket_path
+        self.cluster_id = cluster_id
+        self.handlers = handlers
+
+        self.writer: Optional[asyncio.StreamWriter] = None
+        self.listener: Optional[asyncio.Task] = None
+
+    async def connect(self):
+        reader, self.writer = await asyncio.open_unix_connection(self.socket_path)
+
+        await self.send("hello", cluster=self.cluster_id)
+
+        self.listener = asyncio.create_task(self.listen(reader))
+
+    async def listen(self, reader: asyncio.StreamReader):
+        try:
+            while line := await reader.readline():
+                message = json.loads(line)
+                handler = self.handlers.get(message.get("op"))
+
+                if handler:
+                    await handler(message)
+
+        except (ValueError, ConnectionError) as error:
+            print(f"{WARN_LOG} Lost the IPC connection to the cluster launcher: {error}")
+
+        if "disconnected" in self.handlers:
+            await self.handlers["disconnected"]({})
+
+    async def send(self, op: str, **data):
+        """Sends a message to the launcher.
+
+        :param op: E.g. ``"ready"``, ``"reload"`` or ``"shutdown"``.
+        :param data: Any other JSON-serializable fields.
+
+        :return: ``None``
+        """
+        await send_message(self.writer, {"op": op, **data})
+
+    async def close(self):
+        if self.listener:
+            self.listener.cancel()
+
+        if self.writer:
+            self.writer.close()
+
+            self.writer = None
@@ -0,0 +1,175 @@
+"""
+The MIT License (MIT)
+
+Copyright (c) 2025 Ethan Kenneth Davies
+
+Permission is hereby granted, free of charge, to any person obtaining a
+copy of this software and associated documentation files (the "Software"),
+to deal in the Software without restriction, including without limitation
+the rights to use, copy, modify, merge, publish, distribute, sublicense,
+and/or sell copies of the Software, and to permit persons to whom the
+Software is furnished to do so, subject to the following conditions:
+
+The above copyright notice and this permission notice shall be included in
+all copies or substantial portions of the Software.
+
+THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS
+OR IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING
+FROM, OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER
+DEALINGS IN THE SOFTWARE.
+"""
+
+import asyncio
+import sqlite3
+from datetime import datetime, timedelta, timezone
+from time import monotonic
+from typing import List, Optional, Tuple
+
+from .database import *
+from .exceptions import *
+from .prefixes import *
+
+__all__ = (
+    'MaintenanceScheduler',
+)
+
+
+class MaintenanceScheduler:
+    def __init__(self, database_instance: Database, window: Optional[Tuple[int, int]] = None,
+                 step_budget: float = 0.25, vacuum_pages_per_step: int = 256, analysis_limit: int = 400):
+        """Keeps the database files healthy: refreshes query planner statistics, gives free pages left behind by
+        deleted guilds back to the file system, and checkpoints the WAL.
+
+        Every step takes the writer lock only briefly: ``PRAGMA optimize`` is bounded by ``analysis_limit``, the
+        incremental vacuum frees ``vacuum_pages_per_step`` pages at a time (releasing the writer in between) until
+        ``step_budget`` seconds are used up, and the checkpoint is ``PASSIVE`` so it never waits on readers or writers.
+
+        :param database_instance: The ``Database`` (or ``PartitionedDatabase``) to maintain.
+        :param window: Daily low-traffic window as ``(start_minute, end_minute)`` minutes after midnight UTC, or
+            ``None`` to only run on demand.
+        :param step_budget: Seconds each incremental vacuum may keep going for, per database file.
+        :param vacuum_pages_per_step: Pages freed per incremental vacuum step.
+        :param analysis_limit: Rows sampled per index by ``PRAGMA optimize``.
+        """
+        self.database = database_instance
+        self.window = window
+        self.step_budget = step_budget
+        self.vacuum_pages_per_step = vacuum_pages_per_step
+        self.analysis_limit = analysis_limit
+
+        self.lock = asyncio.Lock()
+        self.scheduler: Optional[asyncio.Task] = None
+
+    def start(self):
+        """Starts the scheduled maintenance if a ``window`` is set. Must be called from a running event loop.
+
+        :return: ``None``
+        """
+        if self.window and self.scheduler is None:
+            self.scheduler = asyncio.create_task(self.run())
+
+    def seconds_until_window(self, now: datetime) -> float:
+        """:return: ``0`` if ``now`` is inside the maintenance window, otherwise the seconds until it opens."""
+        start_minute, end_minute = self.window
+        minute = now.hour * 60 + now.minute
+
+        # A window like 23:00-01:00 wraps around midnight.
+        if start_minute <= minute < end_minute or (end_minute < start_minute and
+                                                   (minute >= start_minute or minute < end_minute)):
+            return 0.0
+
+        start = now.replace(hour=start_minute // 60, minute=start_minute % 60, second=0, microsecond=0)
+
+        if start <= now:
+            start += timedelta(days=1)
+
+        return (start - now).total_seconds()
+
+    async def run(self):
+        """Runs maintenance once per window, every day.
+
+        :return: ``None``
+        """
+        while True:
+            await asyncio.sleep(self.seconds_until_window(datetime.now(timezone.utc)))
+
+            try:
+                await self.maintain()
+
+            except DatabaseError as error:
+                print(f"{EROR_LOG} Scheduled maintenance failed: {error.message}")
+
+            # Don't run a second time within the same window.
+            start_minute, end_minute = self.window
+            await asyncio.sleep(((end_minute - start_minute) % 1440 or 1440) * 60)
+
+    async def maintain(self) -> List[dict]:
+        """Runs every maintenance step on every database file behind ``database_instance``.
+
+        :return: One ``{"path", "pages_freed", "wal_pages_checkpointed", "seconds"}`` dictionary per database file.
+
+        :raises DatabaseError: If a step fails.
+        """
+        async with self.lock:
+            results = []
+
+            for database in self.database.databases:
+                result = await self.maintain_file(database)
+
+                print(f"{INFO_LOG} Maintained '{result['path']}': {result['pages_freed']} page(s) freed, "
+                      f"{result['wal_pages_checkpointed']} WAL page(s) checkpointed in {result['seconds']:.2f}s")
+
+                results.append(result)
+
+            return results
+
+    async def maintain_file(self, database: Database) -> dict:
+        """Runs ``PRAGMA optimize``, a time-boxed incremental vacuum and a passive WAL checkpoint on one database file.
+
+        :param database:
+
+        :return: ``{"path", "pages_freed", "wal_pages_checkpointed", "seconds"}``
+
+        :raises DatabaseError: If a step fails.
+        """
+        started = monotonic()
+
+        def optimize(connection: sqlite3.Connection) -> int:
+            connection.execute(f"PRAGMA analysis_limit = {int(self.analysis_limit)}")
+            connection.execute("PRAGMA optimize")
+
+            return connection.execute("PRAGMA freelist_count").fetchone()[0]
+
+        def vacuum_step(connection: sqlite3.Connection) -> int:
+            connection.execute(f"PRAGMA incremental_vacuum({int(self.vacuum_pages_per_step)})").fetchall()
+
+            return connection.execute("PRAGMA freelist_count").fetchone()[0]
+
+        def checkpoint(connection: sqlite3.Connection) -> int:
+            _, _, checkpointed = connection.execute("PRAGMA wal_checkpoint(PASSIVE)").fetchone()
+
+            return max(checkpointed, 0)
+
+        try:
+            free_pages = initial_free_pages = await database.run_exclusive(optimize)
+
+            deadline = monotonic() + self.step_budget
+
+            # The writer lock is released between steps, so queued writes go through in between.
+            while free_pages and monotonic() < deadline:
+                free_pages = await database.run_exclusive(vacuum_step)
+
+            wal_pages_checkpointed = await database.run_exclusive(checkpoint)
+
+        except sqlite3.Error as error:
+            raise DatabaseError(f"An error occurred during maintenance of '{database.db_path}': {error}")
+
+        return {
+            "path": database.db_path,
+            "pages_freed": initial_free_pages - free_pages,
+            "wal_pages_checkpointed": wal_pages_checkpointed,
+            "seconds": monotonic() - started,
+        }
@@ -0,0 +1,437 @@
+"""
+The MIT License (MIT)
+
+Copyright (c) 2025 Ethan Kenneth Davies
+
+Permission is hereby granted, free of charge, to any person obtaining a
+copy of this software and associated documentation files (the "Software"),
+to deal in the Software without restriction, including without limitation
+the rights to use, copy, modify, merge, publish, distribute, sublicense,
+and/or sell copies of the Software, and to permit persons to whom the
+Software is furnished to do so, subject to the following conditions:
+
+The above copyright notice and this permission notice shall be included in
+all copies or substantial portions of the Software.
+
+THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS
+OR IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING
+FROM, OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER
+DEALINGS IN THE SOFTWARE.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import os
+import re
+from array import array
+from bisect import bisect_left
+from functools import lru_cache
+from time import perf_counter
+from typing import TYPE_CHECKING, Callable, Dict, List, Optional, Tuple
+
+from .prefixes import *
+from .profiler import *
+
+if TYPE_CHECKING:
+    import aiohttp
+    from discord.ext import commands
+
+    from .database import Database
+
+__all__ = (
+    'METRICS',
+    'Metrics',
+    'MetricsServer',
+    'Histogram',
+    'Counter',
+    'Gauge',
+    'RollingWindow',
+    'SeriesCache',
+)
+
+# Seconds. Covers a dict lookup of a cached command up to a REST call stuck behind a rate limit.
+DEFAULT_BUCKETS = (0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+
+# Database gauges read from ``Database.pool_stats()`` when scraped: metric name, type, description, statistic and the
+# factor converting it to the metric's unit.
+POOL_METRICS = (
+    ("archon_database_pool_waiting", "gauge", "Jobs waiting for a connection right now.", "waiting", 1),
+    ("archon_database_pool_max_waiting", "gauge", "Most jobs ever waiting for a connection at once.", "max_waiting", 1),
+    ("archon_database_pool_average_wait_seconds", "gauge", "Average wait for a connection, over every acquisition.",
+     "average_wait_ms", 0.001),
+    ("archon_database_pool_acquisitions_total", "counter", "Connections handed out.", "acquisitions", 1),
+)
+
+# REST paths are grouped by route: IDs become "{id}" and the tokens of webhook and interaction URLs are never exposed.
+SNOWFLAKE = re.compile(r"/\d{15,21}(?=/|$)")
+TOKEN = re.compile(r"/(webhooks|interactions)/\{id\}/[^/]+")
+
+
+def escape(value: str) -> str:
+    """Escapes a label value for the Prometheus text format."""
+    return value.replace("\\", "\\\\").replace("\"", "\\\"").replace("\n", "\\n")
+
+
+def rest_route(path: str) -> str:
+    """:return: The route of a Discord API URL path, e.g. ``/api/v10/channels/{id}/messages``."""
+    return TOKEN.sub(r"/\1/{id}/{token}", SNOWFLAKE.sub("/{id}", path))
+
+
+class Histogram:
+    __slots__ = ("bounds", "counts", "sum")
+
+    def __init__(self, bounds: Tuple[float, ...]):
+        """A histogram of one label set. The buckets are allocated once, so recording a value is a binary search and
+        two additions.
+
+        :param bounds: Upper bound of each bucket, ascending. Values above the last one go to ``+Inf``.
+        """
+        self.bounds = bounds
+        self.counts = [0] * (len(bounds) + 1)
+        self.sum = 0.0
+
+    def observe(self, value: float):
+        self.counts[bisect_left(self.bounds, value)] += 1
+        self.sum += value
+
+
+class Counter:
+    __slots__ = ("value",)
+
+    def __init__(self):
+        self.value = 0
+
+    def inc(self, amount: int = 1):
+        self.value += amount
+
+
+class RollingWindow:
+    __slots__ = ("values", "index", "full")
+
+    def __init__(self, size: int = 1024):
+        """The last ``size`` values of a measurement, in a fixed ring buffer, for recent percentiles that a cumulative
+        histogram would average away.
+
+        :param size:
+        """
+        self.values = array("d", bytes(8 * size))
+        self.index = 0
+        self.full = False
+
+    def __len__(self) -> int:
+        return len(self.values) if self.full else self.index
+
+    def observe(self, value: float):
+        self.values[self.index] = value
+        self.index += 1
+
+        if self.index == len(self.values):
+            self.index = 0
+            self.full = True
+
+    def percentiles(self, *fractions: float) -> List[float]:
+        """:return: The nearest-rank percentile of the window for each of ``fractions`` (e.g. ``0.95``), ``0.0`` while
+        it is empty."""
+        values = sorted(self.values if self.full else self.values[:self.index])
+
+        return [percentile(values, fraction) for fraction in fractions]
+
+
+class Gauge:
+    __slots__ = ("value",)
+
+    def __init__(self):
+        self.value = 0.0
+
+    def set(self, value: float):
+        self.value = value
+
+
+class Family:
+    def __init__(self, name: str, description: str, label_names: Tuple[str, ...], kind: str,
+                 factory: Callable[[], object]):
+        """Every series of one metric, keyed by their label values. A series is created the first time its label
+        values are used and kept from then on; callers on a hot path keep the series ``labels()`` returns instead of
+        looking it up every time.
+
+        :param name:
+        :param description:
+        :param label_names:
+        :param kind: ``"histogram"``, ``"counter"`` or ``"gauge"``.
+        :param factory: Creates the series of a new label set.
+        """
+        self.name = name
+        self.description = description
+        self.label_names = label_names
+        self.kind = kind
+        self.factory = factory
+
+        self.children: Dict[Tuple[str, ...], object] = {}
+
+    def labels(self, *values: str):
+        try:
+            return self.children[values]
+
+        except KeyError:
+            child = self.children[values] = self.factory()
+
+            return child
+
+    def render(self, lines: List[str]):
+        """Appends the metric in the Prometheus text format to ``lines``.
+
+        :param lines:
+        :return: ``None``
+        """
+        lines.append(f"# HELP {self.name} {self.description}")
+        lines.append(f"# TYPE {self.name} {self.kind}")
+
+        for values, child in self.children.items():
+            labels = ",".join(f'{name}="{escape(str(value))}"' for name, value in zip(self.label_names, values))
+            series = f"{{{labels}}}" if labels else ""
+
+            if self.kind != "histogram":
+                lines.append(f"{self.name}{series} {child.value}")
+
+                continue
+
+            prefix = f"{labels}," if labels else ""
+            cumulative = 0
+
+            for bound, count in zip((*child.bounds, "+Inf"), child.counts):
+                cumulative += count
+                lines.append(f'{self.name}_bucket{{{prefix}le="{bound}"}} {cumulative}')
+
+            lines.append(f"{self.name}_sum{series} {child.sum}")
+            lines.append(f"{self.name}_count{series} {cumulative}")
+
+
+class SeriesCache(dict):
+    __slots__ = ("family", "fixed")
+
+    def __init__(self, family: Family, *fixed: str):
+        """The series of ``family`` keyed by its first label value, with the values of the labels after it fixed. A
+        hot path keeps one and finds its series with a lookup on a value it already has (e.g. a command name), instead
+        of building a label tuple for ``labels()`` on every observation. A series is resolved on first use.
+
+        :param family:
+        :param fixed: Values of the labels after the first one.
+        """
+        super().__init__()
+
+        self.family = family
+        self.fixed = fixed
+
+    def __missing__(self, value: str):
+        series = self[value] = self.family.labels(value, *self.fixed)
+
+        return series
+
+
+class Metrics:
+    def __init__(self, buckets: Tuple[float, ...] = DEFAULT_BUCKETS):
+        """Runtime metrics of the bot, served in the Prometheus text format by ``MetricsServer``.
+
+        Recording is always on: it costs a dictionary lookup (skipped where the caller keeps the series) and a few
+        additions, and nothing is formatted until the metrics are scraped.
+
+        :param buckets: Histogram bucket bounds, in seconds.
+        """
+        self.commands = Family("archon_command_duration_seconds", "Time taken by each command.",
+                               ("command", "kind"), "histogram", lambda: Histogram(buckets))
+        self.throttled = Family("archon_commands_throttled_total", "Commands dropped by the rate limits.",
+                                ("command",), "counter", Counter)
+        self.events = Family("archon_event_duration_seconds", "Time taken by each event listener.",
+                             ("event",), "histogram", lambda: Histogram(buckets))
+        self.gateway = Family("archon_shard_gateway_events_total", "Gateway connects, disconnects and resumes.",
+                              ("shard", "event"), "counter", Counter)
+        self.rest = Family("archon_rest_request_duration_seconds", "Discord API requests, by route and status.",
+                           ("method", "route", "status"), "histogram", lambda: Histogram(buckets))
+        self.database = Family("archon_database_operation_duration_seconds", "Database operations, from submitting "
+                               "the job to its result (including waiting for the database).",
+                               ("operation",), "histogram", lambda: Histogram(buckets))
+
+        self.loop_lag = Family("archon_event_loop_lag_seconds", "How late the event loop ran the watchdog's timer.",
+                               (), "histogram", lambda: Histogram(buckets))
+        self.loop_stalls = Family("archon_event_loop_stalls_total", "Times the event loop was blocked for longer "
+                                  "than the watchdog threshold.", (), "counter", Counter)
+        self.longest_loop_stall = Family("archon_event_loop_longest_stall_seconds", "Longest time the event loop "
+                                         "was blocked.", (), "gauge", Gauge)
+
+        # The most recent Discord API request durations, for ``?ping full``.
+        self.rest_window = RollingWindow()
+
+        self.families = (self.commands, self.throttled, self.events, self.gateway, self.rest, self.database,
+                         self.loop_lag, self.loop_stalls, self.longest_loop_stall)
+
+        # Set by ``MetricsServer``; per-shard gauges are read from it when scraped.
+        self.bot: Optional[commands.AutoShardedBot] = None
+
+        # Set by ``MetricsServer``; connection pool and configuration cache gauges are read from it when scraped.
+        self.database_instance: Optional[Database] = None
+
+    def http_trace(self) -> aiohttp.TraceConfig:
+        """:return: An ``aiohttp.TraceConfig`` recording every Discord API request, for the ``http_trace`` option of
+        ``discord.Client``."""
+        import aiohttp
+
+        # The series of each request, so the path of one that was already made skips ``rest_route()`` and the label
+        # tuple. Bounded, since paths hold IDs.
+        @lru_cache(maxsize=4096)
+        def series(method: str, path: str, status: str) -> Histogram:
+            return self.rest.labels(method, rest_route(path), status)
+
+        async def on_request_start(session, context, params):
+            context.started = perf_counter()
+
+        async def on_request_end(session, context, params):
+            duration = perf_counter() - context.started
+
+            series(params.method, params.url.path, str(params.response.status)).observe(duration)
+            self.rest_window.observe(duration)
+
+        async def on_request_exception(session, context, params):
+            duration = perf_counter() - context.started
+
+            series(params.method, params.url.path, "error").observe(duration)
+            self.rest_window.observe(duration)
+
+        trace = aiohttp.TraceConfig()
+        trace.on_request_start.append(on_request_start)
+        trace.on_request_end.append(on_request_end)
+        trace.on_request_exception.append(on_request_exception)
+
+        return trace
+
+    def render(self) -> str:
+        """:return: Every metric in the Prometheus text format."""
+        lines = []
+
+        for family in self.families:
+            family.render(lines)
+
+        if self.bot is not None:
+            lines.append("# HELP archon_shard_latency_seconds Time between a shard's last heartbeat and its ack.")
+            lines.append("# TYPE archon_shard_latency_seconds gauge")
+
+            for shard_id, shard in self.bot.shards.items():
+                # Infinite until the shard's first heartbeat is acknowledged.
+                latency = "+Inf" if shard.latency == float("inf") else shard.latency
+
+                lines.append(f'archon_shard_latency_seconds{{shard="{shard_id}"}} {latency}')
+
+        if self.database_instance is not None:
+            self.render_database(lines)
+
+        return "\n".join(lines) + "\n"
+
+    def render_database(self, lines: List[str]):
+        """Appends the queue depth of every database file's writer and reader pool, to spot reads or writes starving,
+        and its guild configuration cache counters, in the Prometheus text format to ``lines``.
+
+        :param lines:
+        :return: ``None``
+        """
+        databases = [(database, escape(os.path.basename(database.db_path)))
+                     for database in self.database_instance.databases]
+        pools = []
+
+        for database, database_file in databases:
+            stats = database.pool_stats()
+
+            for pool in ("writer", "readers"):
+                if stats[pool] is not None:
+                    pools.append((f'file="{database_file}",pool="{pool}"', stats[pool]))
+
+        for name, kind, description, statistic, factor in POOL_METRICS:
+            lines.append(f"# HELP {name} {description}")
+            lines.append(f"# TYPE {name} {kind}")
+
+            for labels, stats in pools:
+                lines.append(f"{name}{{{labels}}} {stats[statistic] * factor}")
+
+        for name, kind, description, attribute in (
+            ("archon_guild_config_cache_hits_total", "counter", "Guild configuration lookups answered from memory.",
+             "hits"),
+            ("archon_guild_config_cache_misses_total", "counter", "Guild configuration lookups read from the database.",
+             "misses"),
+            ("archon_guild_config_cache_evictions_total", "counter", "Guild configurations dropped to stay under "
+             "guild_config_cache_size.", "evictions"),
+        ):
+            lines.append(f"# HELP {name} {description}")
+            lines.append(f"# TYPE {name} {kind}")
+
+            for database, database_file in databases:
+                lines.append(f'{name}{{file="{database_file}"}} {getattr(database.guild_config, attribute)}')
+
+        lines.append("# HELP archon_guild_config_cache_size Guild configurations held in memory.")
+        lines.append("# TYPE archon_guild_config_cache_size gauge")
+
+        for database, database_file in databases:
+            lines.append(f'archon_guild_config_cache_size{{file="{database_file}"}} {len(database.guild_config)}')
+
+
+class MetricsServer:
+    def __init__(self, metrics: Metrics, bot_instance: commands.AutoShardedBot, host: str = "127.0.0.1",
+                 port: int = 9464, database_instance: Optional[Database] = None):
+        """Serves ``metrics`` on ``http://<host>:<port>/metrics`` for Prometheus to scrape. It is a minimal HTTP/1.0
+        server on the bot's event loop, so keep it on a local or otherwise private address.
+
+        :param metrics:
+        :param bot_instance: The bot whose shard latencies are reported.
+        :param host:
+        :param port:
+        :param database_instance: The ``Database`` (or ``PartitionedDatabase``) whose connection pools and guild
+            configuration caches are reported.
+        """
+        self.metrics = metrics
+        self.host = host
+        self.port = port
+
+        self.server: Optional[asyncio.AbstractServer] = None
+
+        metrics.bot = bot_instance
+        metrics.database_instance = database_instance
+
+    async def start(self):
+        """:return: ``None``"""
+        self.server = await asyncio.start_server(self.handle, self.host, self.port)
+
+        print(f"{INFO_LOG} Serving metrics on http://{self.host}:{self.port}/metrics")
+
+    async def close(self):
+        """:return: ``None``"""
+        if self.server is not None:
+            self.server.close()
+            await self.server.wait_closed()
+
+            self.server = None
+
+    async def handle(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter):
+        try:
+            request = await asyncio.wait_for(reader.readuntil(b"\r\n\r\n"), timeout=5)
+            method, path, _ = request.split(b"\r\n", 1)[0].decode("latin-1").split(" ", 2)
+
+            if method == "GET" and path.split("?", 1)[0] == "/metrics":
+                status, body = "200 OK", self.metrics.render().encode()
+
+            else:
+                status, body = "404 Not Found", b"Not found\n"
+
+            writer.write(f"HTTP/1.0 {status}\r\nContent-Type: text/plain; version=0.0.4; charset=utf-8\r\n"
+                         f"Content-Length: {len(body)}\r\nConnection: close\r\n\r\n".encode() + body)
+            await writer.drain()
+
+        except (asyncio.TimeoutError, asyncio.IncompleteReadError, asyncio.LimitOverrunError, ValueError,
+                ConnectionError):
+            pass
+
+        finally:
+            writer.close()
+
+
+METRICS = Metrics()
@@ -0,0 +1,118 @@
+"""
+The MIT License (MIT)
+
+Copyright (c) 2025 Ethan Kenneth Davies
+
+Permission is hereby granted, free of charge, to any person obtaining a
+copy of this software and associated documentation files (the "Software"),
+to deal in the Software without restriction, including without limitation
+the rights to use, copy, modify, merge, publish, distribute, sublicense,
+and/or sell copies of the Software, and to permit persons to whom the
+Software is furnished to do so, subject to the following conditions:
+
+The above copyright notice and this permission notice shall be included in
+all copies or substantial portions of the Software.
+
+THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS
+OR IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING
+FROM, OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER
+DEALINGS IN THE SOFTWARE.
+"""
+
+from typing import Tuple
+
+__all__ = (
+    'MIGRATIONS',
+    'LATEST_SCHEMA_VERSION',
+)
+
+# Each migration is ``(version, description, script, transactional)``. The database's ``PRAGMA user_version`` holds the
+# version of the last migration applied to it, and ``Database.create_db()`` runs every newer script, in order, each in
+# its own transaction unless ``transactional`` is ``False``. Never edit a migration that has been released; add a new
+# one instead.
+MIGRATIONS: Tuple[Tuple[int, str, str, bool], ...] = (
+    (1, "Create the initial schema", """
+        CREATE TABLE IF NOT EXISTS "Statistics" (
+            "Server Name" TEXT,
+            "Server ID" INTEGER NOT NULL UNIQUE,
+            "Join Date" TEXT,
+            PRIMARY KEY("Server ID")
+        );
+
+        CREATE TABLE IF NOT EXISTS "General Configuration" (
+            "Server ID" INTEGER NOT NULL UNIQUE,
+            "Admin Role ID" INTEGER,
+            PRIMARY KEY("Server ID")
+        );
+    """, True),
+    # "Server ID" becomes the rowid itself, which drops the redundant UNIQUE index SQLite kept next to each table, and
+    # STRICT stops non-integer IDs from ever being stored.
+    (2, "Rebuild the tables as compact STRICT tables keyed on \"Server ID\"", """
+        CREATE TABLE "Statistics (new)" (
+            "Server ID" INTEGER PRIMARY KEY,
+            "Server Name" TEXT,
+            "Join Date" TEXT
+        ) STRICT;
+
+        INSERT INTO "Statistics (new)" ("Server ID", "Server Name", "Join Date")
+            SELECT "Server ID", "Server Name", "Join Date" FROM "Statistics";
+
+        DROP TABLE "Statistics";
+
+        ALTER TABLE "Statistics (new)" RENAME TO "Statistics";
+
+        CREATE TABLE "General Configuration (new)" (
+            "Server ID" INTEGER PRIMARY KEY,
+            "Admin Role ID" INTEGER
+        ) STRICT;
+
+        INSERT INTO "General Configuration (new)" ("Server ID", "Admin Role ID")
+            SELECT "Server ID", "Admin Role ID" FROM "General Configuration";
+
+        DROP TABLE "General Configuration";
+
+        ALTER TABLE "General Configuration (new)" RENAME TO "General Configuration";
+    """, True),
+    # Lets ``MaintenanceScheduler`` hand free pages back to the file system in small, bounded steps. Switching an
+    # existing database over takes one full VACUUM, which can't run inside a transaction.
+    (3, "Enable incremental auto-vacuum", """
+        PRAGMA auto_vacuum = INCREMENTAL;
+
+        VACUUM;
+    """, False),
+    # Bot messages waiting to be deleted by ``DeletionScheduler``, so pending deletions survive a restart. Lookups are
+    # only ever by "Message ID" (the rowid); the scheduler keeps its own due-time heap, so "Due At" needs no index.
+    (4, "Create the scheduled message deletions table", """
+        CREATE TABLE "Scheduled Deletions" (
+            "Message ID" INTEGER PRIMARY KEY,
+            "Channel ID" INTEGER NOT NULL,
+            "Server ID" INTEGER,
+            "Due At" REAL NOT NULL
+        ) STRICT;
+    """, True),
+    # A guild's own command prefix, or NULL for the global ``command_prefix``.
+    (5, "Add per-guild command prefixes", """
+        ALTER TABLE "General Configuration" ADD COLUMN "Command Prefix" TEXT;
+    """, True),
+    # Hash of the application commands last synced to Discord, per scope: 0 for the global commands, otherwise the ID
+    # of the guild the commands are scoped to (see ``CommandSync``).
+    (6, "Create the application command sync table", """
+        CREATE TABLE "Command Sync" (
+            "Scope" INTEGER PRIMARY KEY,
+            "Payload Hash" TEXT NOT NULL
+        ) STRICT;
+    """, True),
+    # The ``database_partitions`` the guild rows were last laid out for, a single row in the main database file (see
+    # ``repartition()`` in ``partitions.py``).
+    (7, "Create the partitioning table", """
+        CREATE TABLE "Partitioning" (
+            "ID" INTEGER PRIMARY KEY CHECK ("ID" = 0),
+            "Partition Count" INTEGER NOT NULL
+        ) STRICT;
+    """, True),
+)
+
+LATEST_SCHEMA_VERSION: int = MIGRATIONS[-1][0]
@@ -0,0 +1,402 @@
+"""
+The MIT License (MIT)
+
+Copyright (c) 2025 Ethan Kenneth Davies
+
+Permission is hereby granted, free of charge, to any person obtaining a
+copy of this software and associated documentation files (the "Software"),
+to deal in the Software without restriction, including without limitation
+the rights to use, copy, modify, merge, publish, distribute, sublicense,
+and/or sell copies of the Software, and to permit persons to whom the
+Software is furnished to do so, subject to the following conditions:
+
+The above copyright notice and this permission notice shall be included in
+all copies or substantial portions of the Software.
+
+THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS
+OR IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING
+FROM, OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER
+DEALINGS IN THE SOFTWARE.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import os
+import sqlite3
+from typing import TYPE_CHECKING, Any, Callable, Dict, Iterable, List, Optional, Sequence, Tuple, Union
+
+import aiosqlite
+
+from .database import *
+from .exceptions import *
+from .prefixes import *
+
+# discord.py is only used in annotations here, and takes longer to import than everything else combined.
+if TYPE_CHECKING:
+    import discord
+
+__all__ = (
+    'PartitionedDatabase',
+    'partition_index',
+    'partition_path',
+    'repartition',
+)
+
+# Tables holding one row per guild, split across the partitions.
+GUILD_TABLES = ("Statistics", "General Configuration")
+
+
+def partition_index(guild_id: int, partition_count: int) -> int:
+    """Returns the partition a guild lives in. This is the formula Discord uses to pick a guild's shard, so with as
+    many partitions as shards every shard writes to its own file.
+
+    :param guild_id:
+    :param partition_count:
+
+    :return: Index of the partition, from ``0`` to ``partition_count - 1``.
+    """
+    return (guild_id >> 22) % partition_count
+
+
+def partition_path(database_path: str, index: int) -> str:
+    """Returns the file of a partition, next to the main database file (``database.sqlite3`` ->
+    ``database.0.sqlite3``, ``database.1.sqlite3``, ...).
+
+    :param database_path: Path to the main SQLite3 database file.
+    :param index: Index of the partition.
+
+    :return: Path to the partition's SQLite3 database file.
+    """
+    root, extension = os.path.splitext(database_path)
+
+    return f"{root}.{index}{extension}"
+
+
+class PartitionedDatabase:
+    def __init__(self, database_path: str = "/opt/archon/var/db/database.sqlite3", partition_count: int = 2,
+                 config_cache_size: Optional[int] = None, **database_options):
+        """Drop-in replacement for ``Database`` that spreads the guild tables across ``partition_count`` SQLite3
+        files, each with its own connection and writer lock.
+
+        Calls about one guild are routed to the guild's partition (see ``partition_index()``). Calls about every guild
+        (loading the configuration cache, reconciliation, counts) fan out to all partitions concurrently and merge the
+        results. The main database file at ``database_path`` stays as the home of tables that aren't per guild.
+
+        :param database_path: Path to the main SQLite3 database file. Partitions are created next to it.
+        :param partition_count: Number of partitions. Should match the bot's shard count.
+        :param config_cache_size: Maximum number of cached ``"General Configuration"`` rows across all partitions, or
+            ``None`` to keep all of them.
+        :param database_options: Passed on to every ``Database``.
+        """
+        self.db_path = database_path
+        self.partition_count = partition_count
+
+        if config_cache_size is not None:
+            config_cache_size = -(-config_cache_size // partition_count)  # Ceiling division.
+
+        self.main = Database(database_path=database_path, config_cache_size=config_cache_size, **database_options)
+        self.partitions: List[Database] = [
+            Database(database_path=partition_path(database_path, index), config_cache_size=config_cache_size,
+                     **database_options)
+            for index in range(partition_count)
+        ]
+
+    @property
+    def databases(self) -> List[Database]:
+        """:return: The main database followed by every partition."""
+        return [self.main, *self.partitions]
+
+    @property
+    def write_queue(self):
+        """:return: The write-behind queue of the first partition if write-behind mode is enabled, otherwise ``None``.
+        """
+        return self.partitions[0].write_queue
+
+    @property
+    def profiler(self):
+        """:return: The query profiler shared by every file if profiling is enabled, otherwise ``None``."""
+        return self.main.profiler
+
+    def route(self, guild_id: int) -> Database:
+        """:return: The partition holding the given guild."""
+        return self.partitions[partition_index(guild_id, self.partition_count)]
+
+    async def connect(self):
+        await asyncio.gather(*(database.connect() for database in self.databases))
+
+    async def close(self):
+        await asyncio.gather(*(database.close() for database in self.databases))
+
+    async def create_db(self):
+        """Migrates every database file. Guild rows laid out for another partition count are moved by
+        ``repartition()``, run after this.
+
+        :return: ``None``
+
+        :raises DatabaseError: IF a fatal SQLite error occurs.
+        """
+        await asyncio.gather(*(database.create_db() for database in self.databases))
+
+    async def load_guild_configs(self):
+        await asyncio.gather(*(partition.load_guild_configs() for partition in self.partitions))
+
+    async def round_trip(self) -> float:
+        return await self.main.round_trip()
+
+    async def count_guilds(self) -> int:
+        return sum(await asyncio.gather(*(partition.count_guilds() for partition in self.partitions)))
+
+    async def get_guild_config(self, guild_id: int) -> Optional[dict]:
+        return await self.route(guild_id).get_guild_config(guild_id)
+
+    async def add_guild(self, guild: discord.Guild):
+        await self.route(guild.id).add_guild(guild)
+
+    async def delete_guild(self, guild: discord.Guild):
+        await self.route(guild.id).delete_guild(guild)
+
+    async def add_admin_role(self, role: discord.Role, guild: discord.Guild):
+        await self.route(guild.id).add_admin_role(role=role, guild=guild)
+
+    def get_prefix(self, guild_id: int) -> Optional[str]:
+        return self.route(guild_id).get_prefix(guild_id)
+
+    async def set_prefix(self, guild: discord.Guild, prefix: Optional[str]):
+        await self.route(guild.id).set_prefix(guild=guild, prefix=prefix)
+
+    # Scheduled deletions, command hashes and the partition count aren't per guild (direct messages and global commands
+    # have none), so they live in the main database file.
+    async def get_command_hashes(self) -> Dict[int, str]:
+        return await self.main.get_command_hashes()
+
+    async def set_command_hash(self, scope: int, payload_hash: Optional[str]):
+        await self.main.set_command_hash(scope, payload_hash)
+
+    async def get_partition_count(self) -> Optional[int]:
+        return await self.main.get_partition_count()
+
+    async def set_partition_count(self, partition_count: int):
+        await self.main.set_partition_count(partition_count)
+
+    async def add_scheduled_deletions(self, deletions: Sequence[Tuple[int, int, Optional[int], float]]):
+        await self.main.add_scheduled_deletions(deletions)
+
+    async def remove_scheduled_deletions(self, message_ids: Sequence[int]):
+        await self.main.remove_scheduled_deletions(message_ids)
+
+    async def get_scheduled_deletions(self) -> List[Tuple[int, int, Optional[int], float]]:
+        return await self.main.get_scheduled_deletions()
+
+    def enable_write_behind(self, max_batch_size: int = 500, max_delay: float = 0.25):
+        for partition in self.partitions:
+            partition.enable_write_behind(max_batch_size=max_batch_size, max_delay=max_delay)
+
+    def queue_add_guild(self, guild: discord.Guild):
+        self.route(guild.id).queue_add_guild(guild)
+
+    def queue_delete_guild(self, guild: discord.Guild):
+        self.route(guild.id).queue_delete_guild(guild)
+
+    async def reconcile_guilds(self, guilds: Iterable[discord.Guild], shard_ids: Optional[Sequence[int]] = None,
+                               shard_count: Optional[int] = None) -> Tuple[int, int]:
+        """Splits ``guilds`` by partition and reconciles every partition concurrently.
+
+        :param guilds: Every guild the bot is in, usually ``bot.guilds``.
+        :param shard_ids: See ``Database.reconcile_guilds()``.
+        :param shard_count:
+
+        :return: The number of guilds added and removed, across all partitions.
+
+        :raises DatabaseError: If the database operation fails.
+        """
+        guilds_by_partition: Dict[int, list] = {index: [] for index in range(self.partition_count)}
+
+        for guild in guilds:
+            guilds_by_partition[partition_index(guild.id, self.partition_count)].append(guild)
+
+        results = await asyncio.gather(*(
+            partition.reconcile_guilds(guilds_by_partition[index], shard_ids=shard_ids, shard_count=shard_count)
+            for index, partition in enumerate(self.partitions)
+        ))
+
+        return sum(added for added, _ in results), sum(removed for _, removed in results)
+
+    def pool_stats(self) -> dict:
+        """:return: ``Database.pool_stats()`` of the main database and of every partition, keyed by file path."""
+        return {database.db_path: database.pool_stats() for database in self.databases}
+
+
+def previous_partition_count(database_path: str) -> int:
+    """Works out the partition count of a database from before it was stored, from the partition files next to it.
+
+    :param database_path: Path to the main SQLite3 database file.
+
+    :return: The number of consecutive partition files, or ``1`` if there are none (the guild tables lived in the
+        main database file).
+    """
+    partition_count = 0
+
+    while os.path.exists(partition_path(database_path, partition_count)):
+        partition_count += 1
+
+    return partition_count or 1
+
+
+async def repartition(database_instance: Union[Database, PartitionedDatabase]):
+    """Moves the guild rows into the files they belong in if ``database_partitions`` changed since the last start.
+
+    With another partition count a guild hashes to another file (see ``partition_index()``), so left where they are
+    its rows would be taken for a guild the bot left, and reconciliation would replace them with blank ones. The
+    partition count the rows are laid out for is stored in the main database file; when it differs, every file of the
+    old layout that still exists (the main database file, then each old partition) is drained into the new one:
+
+    * Each new partition pulls the rows that hash to it through ``ATTACH`` with ``INSERT OR IGNORE``. With a single
+      partition, the main database file pulls every row.
+    * The moved rows are then deleted from the old file, keeping those that still belong to it.
+
+    The new count is only stored once every file is drained, so an interrupted move is picked up again on the next
+    start. Copying before deleting, and ignoring rows that were already copied, makes that safe.
+
+    :param database_instance: The ``Database`` or ``PartitionedDatabase`` described by the configuration, migrated.
+    :return: ``None``
+
+    :raises DatabaseError: If the database operation fails.
+    """
+    if isinstance(database_instance, PartitionedDatabase):
+        main, targets = database_instance.main, database_instance.partitions
+
+    else:
+        main, targets = database_instance, [database_instance]
+
+    partition_count = len(targets)
+    previous_count = await main.get_partition_count()
+
+    if previous_count is None:
+        previous_count = previous_partition_count(main.db_path)
+
+    if previous_count == partition_count:
+        # The stored count is what says the layout is right, not the files, so it's stored for older databases too.
+        await main.set_partition_count(partition_count)
+
+        return
+
+    previous_paths = [main.db_path]
+
+    if previous_count > 1:
+        previous_paths += [partition_path(main.db_path, index) for index in range(previous_count)]
+
+    target_indexes = {target.db_path: index for index, target in enumerate(targets)}
+    moved = 0
+
+    try:
+        for source_path in previous_paths:
+            if not os.path.exists(source_path):
+                continue
+
+            for index, target in enumerate(targets):
+                if target.db_path != source_path:
+                    moved += await pull_guild_rows(target, source_path, partition_count, index)
+
+            if source_path in target_indexes:
+                # The rows that still hash to this file stay.
+                owner = targets[target_indexes[source_path]]
+
+                await owner.unit_of_work([
+                    (f'DELETE FROM "{table}" WHERE ("Server ID" >> 22) % ? != ?',
+                     (partition_count, target_indexes[source_path]))
+                    for table in GUILD_TABLES
+                ])
+
+            elif source_path == main.db_path:
+                await main.unit_of_work([(f'DELETE FROM "{table}"', ()) for table in GUILD_TABLES])
+
+            else:
+                # An old partition past the new count isn't open, so it's emptied through an attached connection.
+                def empty(connection: sqlite3.Connection):
+                    for table in GUILD_TABLES:
+                        connection.execute(f'DELETE FROM source_database."{table}"')
+
+                await run_attached(targets[0], source_path, empty, operation="repartition")
+
+    except aiosqlite.Error as error:
+        raise DatabaseError(f"An error occurred when moving guilds from {previous_count} into {partition_count} "
+                            f"partition(s): {error}")
+
+    await main.set_partition_count(partition_count)
+
+    print(f"{INFO_LOG} Moved {moved} guild(s) from {previous_count} into {partition_count} partition(s)")
+
+
+async def pull_guild_rows(target: Database, source_path: str, partition_count: int, index: int) -> int:
+    """Copies the guild rows of another database file that hash to ``index`` into ``target``.
+
+    :param target: The database file the rows belong in.
+    :param source_path: Path to the database file to copy them from.
+    :param partition_count:
+    :param index: Index of ``target`` among the ``partition_count`` partitions.
+
+    :return: The number of guilds copied, not counting those ``target`` already had.
+
+    :raises aiosqlite.Error: If the database operation fails.
+    """
+    def pull(connection: sqlite3.Connection) -> int:
+        copied = 0
+
+        for table in GUILD_TABLES:
+            cursor = connection.execute(
+                f'INSERT OR IGNORE INTO main."{table}" SELECT * FROM source_database."{table}" '
+                f'WHERE ("Server ID" >> 22) % ? = ?', (partition_count, index)
+            )
+
+            if table == "Statistics":
+                copied = cursor.rowcount
+
+        return copied
+
+    return await run_attached(target, source_path, pull, operation="pull_guild_rows")
+
+
+async def run_attached(target: Database, source_path: str, work: Callable[[sqlite3.Connection], Any],
+                       operation: str) -> Any:
+    """Runs ``work`` in a transaction on ``target``'s writer connection, with another database file attached to it as
+    ``source_database``.
+
+    ``ATTACH`` and ``DETACH`` can't run inside a transaction, so they bracket it, and all three are a single
+    ``run_exclusive()`` job: nothing else can write on the connection while the file is attached, and the whole job is
+    profiled and timed like any other.
+
+    :param target:
+    :param source_path: Path to the database file to attach.
+    :param work: Synchronous callable taking the raw ``sqlite3.Connection``, see ``Database.unit_of_work()``.
+    :param operation: Name the job is profiled and timed under.
+
+    :return: Whatever ``work`` returns.
+
+    :raises aiosqlite.Error: If the database operation fails, after the transaction is rolled back.
+    """
+    def attached(connection: sqlite3.Connection) -> Any:
+        connection.execute("ATTACH DATABASE ? AS source_database", (source_path,))
+
+        try:
+            connection.execute("BEGIN TRANSACTION")
+
+            try:
+                result = work(connection)
+
+            except BaseException:
+                connection.rollback()
+
+                raise
+
+            connection.commit()
+
+            return result
+
+        finally:
+            connection.execute("DETACH DATABASE source_database")
+
+    return await target.run_exclusive(attached, operation=operation)
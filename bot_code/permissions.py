@@ -0,0 +1,161 @@
+"""
+The MIT License (MIT)
+
+Copyright (c) 2025 Ethan Kenneth Davies
+
+Permission is hereby granted, free of charge, to any person obtaining a
+copy of this software and associated documentation files (the "Software"),
+to deal in the Software without restriction, including without limitation
+the rights to use, copy, modify, merge, publish, distribute, sublicense,
+and/or sell copies of the Software, and to permit persons to whom the
+Software is furnished to do so, subject to the following conditions:
+
+The above copyright notice and this permission notice shall be included in
+all copies or substantial portions of the Software.
+
+THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS
+OR IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING
+FROM, OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER
+DEALINGS IN THE SOFTWARE.
+"""
+
+from __future__ import annotations
+
+from bisect import bisect_left
+from typing import TYPE_CHECKING, Dict, FrozenSet, Optional, Union
+
+from .database import *
+
+if TYPE_CHECKING:
+    import discord
+
+__all__ = (
+    'PermissionResolver',
+    'GATED_COMMANDS',
+)
+
+# Command name to the policy it is gated by. Every policy so far lets the guild owner and the admin role set with
+# ``/set_admin`` through. No command is gated yet (see the help text).
+GATED_COMMANDS: Dict[str, str] = {}
+
+NOBODY: FrozenSet[int] = frozenset()
+
+# Members with more roles than this are checked with a binary search of their role IDs instead of a set intersection
+# (see ``PermissionResolver.check()``). Measured crossover on CPython 3.11.
+BINARY_SEARCH_ROLES = 12
+
+
+class PermissionResolver:
+    def __init__(self, database_instance: Database, command_policies: Optional[Dict[str, str]] = None):
+        """Decides who may run role-gated commands without walking ``member.roles`` or reading the database per
+        invocation.
+
+        For every guild it has seen, the role IDs each policy allows are kept as a ``frozenset``, built once from the
+        guild's configuration. A check is then a ``dict`` lookup and a set intersection with the member's role IDs,
+        which discord.py already keeps as a sorted array of integers, or a binary search of them if there are many (see
+        ``check()``). Members gaining or losing roles needs no invalidation, since their current roles are what is
+        checked; a guild's entry is only dropped when its configuration changes (``invalidate()``), one of its roles is
+        deleted, or the bot leaves it.
+
+        :param database_instance: The ``Database`` (or ``PartitionedDatabase``) the guild configurations are read from.
+        :param command_policies: Command name to policy name, ``GATED_COMMANDS`` if ``None``.
+        """
+        self.database = database_instance
+        self.command_policies = GATED_COMMANDS if command_policies is None else command_policies
+
+        # Guild ID to policy name to the role IDs it allows.
+        self.guilds: Dict[int, Dict[str, FrozenSet[int]]] = {}
+
+    def gated(self, command: str) -> bool:
+        """:return: Whether ``command`` is restricted by a policy."""
+        return command in self.command_policies
+
+    def check(self, member: discord.Member, command: str) -> Optional[bool]:
+        """The fast path of ``allowed()``, only answering from memory.
+
+        :param member:
+        :param command:
+
+        :return: Whether ``member`` may run ``command``, or ``None`` if the guild isn't cached yet.
+        """
+        policy = self.command_policies.get(command)
+
+        if policy is None:
+            return True
+
+        policies = self.guilds.get(member.guild.id)
+
+        if policies is None:
+            return None
+
+        if member.id == member.guild.owner_id:
+            return True
+
+        # ``Member._roles`` is the sorted array of role IDs discord.py keeps; ``Member.roles`` would build and sort a
+        # list of ``Role`` objects on every call. A set intersection boxes every role ID, so it is only the cheapest
+        # for a handful of them.
+        roles = member._roles
+        allowed = policies.get(policy, NOBODY)
+
+        if len(roles) <= BINARY_SEARCH_ROLES:
+            return not allowed.isdisjoint(roles)
+
+        # Otherwise each allowed role is binary searched for, which barely grows with the member's role count. Through
+        # a ``memoryview``, since indexing the array subclass itself (what ``SnowflakeList.has()`` does) is several
+        # times slower.
+        roles = memoryview(roles)
+        count = len(roles)
+
+        for role_id in allowed:
+            index = bisect_left(roles, role_id)
+
+            if index != count and roles[index] == role_id:
+                return True
+
+        return False
+
+    async def allowed(self, user: Union[discord.Member, discord.User], command: str) -> bool:
+        """:return: Whether ``user`` may run ``command``. Gated commands are never allowed outside a guild.
+
+        :raises DatabaseError: If the guild's configuration has to be read and that fails.
+        """
+        if not self.gated(command):
+            return True
+
+        if getattr(user, "guild", None) is None:
+            return False
+
+        result = self.check(user, command)
+
+        if result is None:
+            await self.load(user.guild.id)
+
+            result = self.check(user, command)
+
+        return result
+
+    async def load(self, guild_id: int):
+        """Builds the role sets of a guild's policies from its configuration.
+
+        :param guild_id:
+        :return: ``None``
+
+        :raises DatabaseError: If the database operation fails.
+        """
+        row = await self.database.get_guild_config(guild_id) or {}
+        admin_role_id = row.get("Admin Role ID")
+
+        self.guilds[guild_id] = {
+            "admin": frozenset((admin_role_id,)) if admin_role_id is not None else NOBODY,
+        }
+
+    def invalidate(self, guild_id: int):
+        """Drops a guild's role sets, they are rebuilt on the next check.
+
+        :param guild_id:
+        :return: ``None``
+        """
+        self.guilds.pop(guild_id, None)
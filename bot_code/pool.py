@@ -0,0 +1,187 @@
+"""
+The MIT License (MIT)
+
+Copyright (c) 2025 Ethan Kenneth Davies
+
+Permission is hereby granted, free of charge, to any person obtaining a
+copy of this software and associated documentation files (the "Software"),
+to deal in the Software without restriction, including without limitation
+the rights to use, copy, modify, merge, publish, distribute, sublicense,
+and/or sell copies of the Software, and to permit persons to whom the
+Software is furnished to do so, subject to the following conditions:
+
+The above copyright notice and this permission notice shall be included in
+all copies or substantial portions of the Software.
+
+THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS
+OR IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING
+FROM, OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER
+DEALINGS IN THE SOFTWARE.
+"""
+
+import asyncio
+from contextlib import asynccontextmanager
+from time import monotonic
+from typing import AsyncIterator, List
+from urllib.parse import quote
+
+import aiosqlite
+
+from .exceptions import *
+
+__all__ = (
+    'ReaderPool',
+    'TrackedLock',
+)
+
+
+class TrackedLock(asyncio.Lock):
+    """``asyncio.Lock`` that keeps queue-depth statistics, used to serialize the writer connection of ``Database``."""
+
+    def __init__(self):
+        super().__init__()
+
+        self.waiting = 0
+        self.max_waiting = 0
+        self.acquisitions = 0
+        self.total_wait = 0.0
+
+    async def acquire(self):
+        self.acquisitions += 1
+
+        # Uncontended, don't count it as a waiter.
+        if not self.locked():
+            return await super().acquire()
+
+        self.waiting += 1
+        self.max_waiting = max(self.max_waiting, self.waiting)
+
+        started = monotonic()
+
+        try:
+            return await super().acquire()
+
+        finally:
+            self.waiting -= 1
+            self.total_wait += monotonic() - started
+
+    def stats(self) -> dict:
+        """:return: Current and peak number of waiters, total acquisitions and the average wait in milliseconds."""
+        return {
+            "size": 1,
+            "waiting": self.waiting,
+            "max_waiting": self.max_waiting,
+            "acquisitions": self.acquisitions,
+            "average_wait_ms": round(self.total_wait / self.acquisitions * 1000, 3) if self.acquisitions else 0.0,
+        }
+
+
+class ReaderPool:
+    def __init__(self, database_path: str, size: int = 2, cache_size_kib: int = 16384, mmap_size: int = 268435456,
+                 busy_timeout: int = 5000):
+        """A fixed number of read-only connections to a WAL database, so reads never queue behind the writer.
+
+        Usage::
+
+            async with pool.acquire() as connection:
+                await connection.execute_fetchall(...)
+
+        :param database_path: Path to the SQLite3 database file.
+        :param size: Number of read-only connections.
+        :param cache_size_kib: Size of each connection's page cache in KiB.
+        :param mmap_size: Maximum number of bytes of the database file to memory-map.
+        :param busy_timeout: Milliseconds to wait on a locked database before raising ``OperationalError``.
+        """
+        self.db_path = database_path
+        self.size = size
+        self.cache_size_kib = cache_size_kib
+        self.mmap_size = mmap_size
+        self.busy_timeout = busy_timeout
+
+        self.connections: List[aiosqlite.Connection] = []
+        self.idle: asyncio.Queue = asyncio.Queue()
+
+        self.waiting = 0
+        self.max_waiting = 0
+        self.acquisitions = 0
+        self.total_wait = 0.0
+
+    async def open(self):
+        """Opens every connection of the pool. The database must already be in WAL mode.
+
+        :return: ``None``
+
+        :raises DatabaseError: If a connection can't be opened.
+        """
+        try:
+            for _ in range(self.size):
+                connection = await aiosqlite.connect(f"file:{quote(self.db_path)}?mode=ro", uri=True)
+
+                self.connections.append(connection)
+
+                await connection.execute(f"PRAGMA cache_size = -{int(self.cache_size_kib)}")
+                await connection.execute(f"PRAGMA mmap_size = {int(self.mmap_size)}")
+                await connection.execute(f"PRAGMA busy_timeout = {int(self.busy_timeout)}")
+                await connection.execute("PRAGMA query_only = ON")
+
+                self.idle.put_nowait(connection)
+
+        except aiosqlite.Error as error:
+            await self.close()
+
+            raise DatabaseError(f"An error occurred when opening the reader connections to '{self.db_path}': {error}")
+
+    async def close(self):
+        """Closes every connection of the pool.
+
+        :return: ``None``
+        """
+        for connection in self.connections:
+            await connection.close()
+
+        self.connections.clear()
+        self.idle = asyncio.Queue()
+
+    @asynccontextmanager
+    async def acquire(self) -> AsyncIterator[aiosqlite.Connection]:
+        """Waits for an idle connection and hands it out for the duration of the ``async with`` block.
+
+        :return: A read-only ``aiosqlite.Connection``.
+        """
+        self.acquisitions += 1
+
+        if not self.idle.empty():
+            connection = self.idle.get_nowait()
+
+        else:
+            self.waiting += 1
+            self.max_waiting = max(self.max_waiting, self.waiting)
+
+            started = monotonic()
+
+            try:
+                connection = await self.idle.get()
+
+            finally:
+                self.waiting -= 1
+                self.total_wait += monotonic() - started
+
+        try:
+            yield connection
+
+        finally:
+            self.idle.put_nowait(connection)
+
+    def stats(self) -> dict:
+        """:return: Pool size, current and peak number of waiters, total acquisitions and the average wait in
+            milliseconds."""
+        return {
+            "size": self.size,
+            "waiting": self.waiting,
+            "max_waiting": self.max_waiting,
+            "acquisitions": self.acquisitions,
+            "average_wait_ms": round(self.total_wait / self.acquisitions * 1000, 3) if self.acquisitions else 0.0,
+        }
@@ -0,0 +1,240 @@
+"""
+The MIT License (MIT)
+
+Copyright (c) 2025 Ethan Kenneth Davies
+
+Permission is hereby granted, free of charge, to any person obtaining a
+copy of this software and associated documentation files (the "Software"),
+to deal in the Software without restriction, including without limitation
+the rights to use, copy, modify, merge, publish, distribute, sublicense,
+and/or sell copies of the Software, and to permit persons to whom the
+Software is furnished to do so, subject to the following conditions:
+
+The above copyright notice and this permission notice shall be included in
+all copies or substantial portions of the Software.
+
+THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS
+OR IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING
+FROM, OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER
+DEALINGS IN THE SOFTWARE.
+"""
+
+import re
+import sqlite3
+import threading
+from collections import deque
+from time import perf_counter
+from typing import Any, Callable, Deque, Dict, List, Optional
+
+import aiosqlite
+
+from .prefixes import *
+
+__all__ = (
+    'QueryProfiler',
+    'ProfiledConnection',
+    'percentile',
+)
+
+# Statements ``EXPLAIN QUERY PLAN`` works on. Anything else (PRAGMA, BEGIN, ATTACH, ...) is timed but not explained.
+EXPLAINABLE = ("SELECT", "INSERT", "UPDATE", "DELETE", "REPLACE", "WITH")
+
+
+def percentile(sorted_values: List[float], fraction: float) -> float:
+    """Nearest-rank percentile of an already sorted list.
+
+    :param sorted_values:
+    :param fraction: Between ``0`` and ``1``, e.g. ``0.95``.
+
+    :return: The value, or ``0.0`` for an empty list.
+    """
+    if not sorted_values:
+        return 0.0
+
+    return sorted_values[min(len(sorted_values) - 1, int(fraction * len(sorted_values)))]
+
+
+class ProfiledConnection:
+    """Wraps the raw ``sqlite3.Connection`` handed to ``Database`` work callables, timing every ``execute()`` and
+    ``executemany()`` and reporting it to the profiler. Everything else is passed through."""
+
+    def __init__(self, connection: sqlite3.Connection, profiler: "QueryProfiler", operation: str):
+        self.connection = connection
+        self.profiler = profiler
+        self.operation = operation
+
+    def __getattr__(self, name: str) -> Any:
+        return getattr(self.connection, name)
+
+    def execute(self, query: str, parameters=()) -> sqlite3.Cursor:
+        started = perf_counter()
+        cursor = self.connection.execute(query, parameters)
+
+        self.profiler.record_statement(self.connection, self.operation, query, parameters,
+                                       perf_counter() - started, cursor.rowcount)
+
+        return cursor
+
+    def executemany(self, query: str, parameters) -> sqlite3.Cursor:
+        # Materialized so the first row can be reused to explain the statement.
+        parameters = list(parameters)
+
+        started = perf_counter()
+        cursor = self.connection.executemany(query, parameters)
+
+        self.profiler.record_statement(self.connection, self.operation, query, parameters[0] if parameters else (),
+                                       perf_counter() - started, cursor.rowcount)
+
+        return cursor
+
+
+class QueryProfiler:
+    def __init__(self, slow_query_ms: float = 100.0, sample_size: int = 1024):
+        """Opt-in instrumentation for every job ``Database`` sends to a connection's worker thread.
+
+        Per ``Database`` method (operation) it keeps the last ``sample_size`` wall times along with the time spent
+        waiting in aiosqlite's queue and executing on the worker thread. Per distinct statement it keeps call counts,
+        execution time and rows affected, and the first time a statement is seen its ``EXPLAIN QUERY PLAN`` is
+        captured and any full table scan is flagged. Statements slower than ``slow_query_ms`` are logged.
+
+        Timing a ``SELECT`` covers stepping to its first row; the time to fetch the rest counts towards the operation.
+
+        :param slow_query_ms: Statements taking longer than this many milliseconds are logged.
+        :param sample_size: Number of recent samples kept per operation for the percentiles.
+        """
+        self.slow_query_ms = slow_query_ms
+        self.sample_size = sample_size
+
+        # operation -> {"wall": deque, "queue": deque, "execute": deque, "count": int}
+        self.operations: Dict[str, dict] = {}
+
+        # normalized statement -> {"count", "seconds", "rows", "plan", "full_scan"}. Written by the worker thread of
+        # every connection (writer, readers, partitions) at once, so only touched under ``statements_lock``.
+        self.statements: Dict[str, dict] = {}
+        self.statements_lock = threading.Lock()
+
+    @staticmethod
+    def normalize(query: str) -> str:
+        return re.sub(r"\s+", " ", query).strip()
+
+    async def run(self, connection: aiosqlite.Connection, work: Callable[[Any], Any], operation: str) -> Any:
+        """Runs ``work`` on the connection's worker thread like ``Database`` does, and records how long the job
+        waited in the queue, executed, and took end to end.
+
+        :param connection:
+        :param work: Callable taking the raw connection. Gets a ``ProfiledConnection`` instead.
+        :param operation: Name the timings are recorded under, usually the ``Database`` method.
+
+        :return: Whatever ``work`` returns.
+        """
+        timings = []
+
+        def job() -> Any:
+            started = perf_counter()
+
+            try:
+                return work(ProfiledConnection(connection._conn, self, operation))
+
+            finally:
+                timings.extend((started, perf_counter()))
+
+        submitted = perf_counter()
+
+        try:
+            return await connection._execute(job)
+
+        finally:
+            finished = perf_counter()
+            started, executed = timings if timings else (finished, finished)
+
+            self.record_operation(operation, wall=finished - submitted, queue=started - submitted,
+                                  execute=executed - started)
+
+    def record_operation(self, operation: str, wall: float, queue: float, execute: float):
+        samples = self.operations.get(operation)
+
+        if samples is None:
+            samples = self.operations[operation] = {
+                "count": 0,
+                "wall": deque(maxlen=self.sample_size),
+                "queue": deque(maxlen=self.sample_size),
+                "execute": deque(maxlen=self.sample_size),
+            }
+
+        samples["count"] += 1
+        samples["wall"].append(wall)
+        samples["queue"].append(queue)
+        samples["execute"].append(execute)
+
+    def record_statement(self, connection: sqlite3.Connection, operation: str, query: str, parameters,
+                         seconds: float, rowcount: int):
+        """Called on the worker thread after every statement of a profiled job.
+
+        :return: ``None``
+        """
+        statement = self.normalize(query)
+
+        with self.statements_lock:
+            stats = self.statements.get(statement)
+            first = stats is None
+
+            if first:
+                stats = self.statements[statement] = {"count": 0, "seconds": 0.0, "rows": 0, "plan": None,
+                                                      "full_scan": False}
+
+            stats["count"] += 1
+            stats["seconds"] += seconds
+            stats["rows"] += max(rowcount, 0)
+
+        # Outside the lock, the other threads don't wait on this one's query plan. Only the thread that saw the
+        # statement first explains it.
+        if first and statement.upper().startswith(EXPLAINABLE):
+            self.explain(connection, statement, parameters, stats)
+
+        if seconds * 1000 >= self.slow_query_ms:
+            print(f"{WARN_LOG} Slow query in {operation} ({seconds * 1000:.1f}ms, {max(rowcount, 0)} row(s)): {statement}")
+
+    def explain(self, connection: sqlite3.Connection, statement: str, parameters, stats: dict):
+        try:
+            plan = [row[3] for row in connection.execute(f"EXPLAIN QUERY PLAN {statement}", parameters)]
+
+        except sqlite3.Error as error:
+            plan = [f"EXPLAIN failed: {error}"]
+
+        stats["plan"] = plan
+
+        # "SCAN <table>" is a full table scan, "SEARCH" and "SCAN ... USING COVERING INDEX" aren't.
+        stats["full_scan"] = any(step.startswith("SCAN ") and "COVERING INDEX" not in step for step in plan)
+
+        if stats["full_scan"]:
+            print(f"{WARN_LOG} Full table scan in query plan ({'; '.join(plan)}): {statement}")
+
+    def summary(self) -> dict:
+        """Percentile summary of every operation seen so far, and every statement flagged with a full table scan.
+
+        :return: ``{"operations": {operation: {...}}, "full_scans": [statement, ...]}``, times in milliseconds.
+        """
+        with self.statements_lock:
+            statements = list(self.statements.items())
+
+        operations = {}
+
+        for operation, samples in sorted(self.operations.items()):
+            wall = sorted(samples["wall"])
+
+            operations[operation] = {
+                "count": samples["count"],
+                "p50_ms": round(percentile(wall, 0.50) * 1000, 3),
+                "p95_ms": round(percentile(wall, 0.95) * 1000, 3),
+                "p99_ms": round(percentile(wall, 0.99) * 1000, 3),
+                "average_queue_ms": round(sum(samples["queue"]) / len(samples["queue"]) * 1000, 3),
+                "average_execute_ms": round(sum(samples["execute"]) / len(samples["execute"]) * 1000, 3),
+            }
+
+        return {
+            "operations": operations,
+            "full_scans": [statement for statement, stats in statements if stats["full_scan"]],
+        }
@@ -0,0 +1,141 @@
+"""
+The MIT License (MIT)
+
+Copyright (c) 2025 Ethan Kenneth Davies
+
+Permission is hereby granted, free of charge, to any person obtaining a
+copy of this software and associated documentation files (the "Software"),
+to deal in the Software without restriction, including without limitation
+the rights to use, copy, modify, merge, publish, distribute, sublicense,
+and/or sell copies of the Software, and to permit persons to whom the
+Software is furnished to do so, subject to the following conditions:
+
+The above copyright notice and this permission notice shall be included in
+all copies or substantial portions of the Software.
+
+THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS
+OR IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING
+FROM, OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER
+DEALINGS IN THE SOFTWARE.
+"""
+
+from itertools import islice
+from time import monotonic_ns
+from typing import Dict, Optional, Tuple
+
+__all__ = (
+    'RateLimiter',
+)
+
+
+class RateLimiter:
+    def __init__(self, limits: Dict[str, Dict[str, Tuple[int, float]]], max_keys: int = 100_000):
+        """Token bucket rate limits for commands, per user, per channel and per guild.
+
+        ``limits`` maps a command name to the buckets it is limited by, e.g. ``{"ping": {"user": (2, 10.0)}}`` lets
+        each user run ``ping`` twice, then once more every 5 seconds. Commands without limits are never throttled.
+
+        Each bucket is stored as a single integer, the time in nanoseconds it will be full again (the "theoretical
+        arrival time" of the generic cell rate algorithm, which behaves exactly like a token bucket). Integers keep the
+        last use of a burst from being refused over a rounding error. A full bucket is the same as no bucket, so once
+        that time has passed the entry is dropped, and memory only grows with the users, channels and guilds that used
+        a command within its period, not with every one ever seen. Expired entries are swept at most once per period;
+        ``max_keys`` caps each table in between, dropping its oldest entries first (which lets them start over with a
+        full bucket).
+
+        :param limits: Command name to ``{scope: (uses, per_seconds)}``, where scope is ``"user"``, ``"channel"`` or
+            ``"guild"``.
+        :param max_keys: Most buckets kept per command and scope.
+        """
+        self.limits = limits
+        self.max_keys = max_keys
+
+        self.tables: Dict[Tuple[str, str], Dict[int, int]] = {}
+        self.next_sweep: Dict[Tuple[str, str], int] = {}
+
+    def hit(self, command: str, user_id: int, channel_id: int, guild_id: Optional[int] = None,
+            now: Optional[int] = None) -> float:
+        """Takes one token from every bucket of ``command`` if all of them have one, otherwise takes none.
+
+        :param command: The command name.
+        :param user_id:
+        :param channel_id:
+        :param guild_id: ``None`` in direct messages, where guild limits don't apply.
+        :param now: ``time.monotonic_ns()``, if the caller already has it.
+
+        :return: ``0.0`` if the command may run, otherwise the seconds until it may.
+        """
+        limits = self.limits.get(command)
+
+        if not limits:
+            return 0.0
+
+        if now is None:
+            now = monotonic_ns()
+
+        keys = {"user": user_id, "channel": channel_id, "guild": guild_id}
+        updates = []
+        retry_after = 0
+
+        for scope, (uses, per) in limits.items():
+            key = keys[scope]
+
+            if key is None:
+                continue
+
+            table = self.tables.setdefault((command, scope), {})
+
+            # Each use pushes the bucket's "full again" time one interval further; a bucket may run up to ``per``
+            # seconds ahead, i.e. ``uses`` uses in a burst. Rounding the interval down means those ``uses`` always fit.
+            per = round(per * 1_000_000_000)
+            interval = per // uses
+            full_at = max(table.get(key, now), now)
+            over = full_at + interval - now - per
+
+            if over > 0:
+                retry_after = max(retry_after, over)
+
+            updates.append((table, key, full_at + interval))
+
+        if retry_after:
+            return retry_after / 1_000_000_000
+
+        for table, key, full_at in updates:
+            table[key] = full_at
+
+        for scope, (_, per) in limits.items():
+            self.sweep((command, scope), per, now)
+
+        return 0.0
+
+    def sweep(self, table_key: Tuple[str, str], per: float, now: int):
+        """Drops the full buckets of a table once per ``per`` seconds, and its oldest buckets whenever it is over
+        ``max_keys``.
+
+        :param table_key: ``(command, scope)``
+        :param per: In seconds.
+        :param now: ``time.monotonic_ns()``
+        :return: ``None``
+        """
+        table = self.tables.get(table_key)
+
+        if table is None:
+            return
+
+        if now >= self.next_sweep.get(table_key, 0) or len(table) > self.max_keys:
+            self.next_sweep[table_key] = now + round(per * 1_000_000_000)
+
+            table = {key: full_at for key, full_at in table.items() if full_at > now}
+
+            if len(table) > self.max_keys:
+                # Dicts keep insertion order, so the first entries are the ones created longest ago.
+                table = dict(islice(table.items(), len(table) - self.max_keys * 9 // 10, None))
+
+            self.tables[table_key] = table
+
+    def size(self) -> int:
+        """:return: The number of buckets currently stored."""
+        return sum(len(table) for table in self.tables.values())
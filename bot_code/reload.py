@@ -0,0 +1,84 @@
+"""
+The MIT License (MIT)
+
+Copyright (c) 2025 Ethan Kenneth Davies
+
+Permission is hereby granted, free of charge, to any person obtaining a
+copy of this software and associated documentation files (the "Software"),
+to deal in the Software without restriction, including without limitation
+the rights to use, copy, modify, merge, publish, distribute, sublicense,
+and/or sell copies of the Software, and to permit persons to whom the
+Software is furnished to do so, subject to the following conditions:
+
+The above copyright notice and this permission notice shall be included in
+all copies or substantial portions of the Software.
+
+THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS
+OR IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING
+FROM, OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER
+DEALINGS IN THE SOFTWARE.
+"""
+
+from typing import List
+
+from discord.ext import commands
+
+from .config import *
+from .guild_prefixes import *
+from .prefixes import *
+from .sessions import *
+
+__all__ = (
+    'apply_settings',
+    'reload_config',
+)
+
+
+def apply_settings(bot_instance: commands.AutoShardedBot):
+    """Applies the settings a running bot reads from ``VALUES`` when it needs them, i.e., the owner IDs, the command
+    prefix and whether to save gateway sessions on shutdown. Only attributes are swapped, so the gateway connections of
+    every shard stay up.
+
+    :param bot_instance:
+
+    :return: ``None``
+    """
+    bot_instance.owner_ids = {int(owner_id) for owner_id in VALUES.OWNER_IDS if owner_id is not None}
+    # Guilds with their own prefix keep it, only the fallback changes.
+    if isinstance(bot_instance.command_prefix, GuildPrefixes):
+        bot_instance.command_prefix.default = VALUES.COMMAND_PREFIX
+
+    else:
+        bot_instance.command_prefix = VALUES.COMMAND_PREFIX
+
+    if isinstance(bot_instance, ResumableBot):
+        bot_instance.sessions_directory = SESSIONS_DIRECTORY if VALUES.QUICK_RESTART else None
+
+
+def reload_config(bot_instance: commands.AutoShardedBot) -> List[str]:
+    """Re-reads the configuration file and applies it to the running bot (see ``Values.reload()``), triggered by
+    ``SIGHUP`` or the ``?reload`` command.
+
+    Nothing here awaits, so no command or event runs in between and sees half the new settings.
+
+    :param bot_instance:
+
+    :return: The configuration keys that changed.
+
+    :raises ConfigError: If the new configuration is invalid or changes a key that requires a restart. The running
+        settings are left as they were.
+    """
+    changed = VALUES.reload()
+
+    apply_settings(bot_instance)
+
+    if changed:
+        print(f"{INFO_LOG} Reloaded the configuration, changed: {', '.join(changed)}")
+
+    else:
+        print(f"{INFO_LOG} Reloaded the configuration, nothing changed")
+
+    return changed
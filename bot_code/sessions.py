@@ -0,0 +1,235 @@
+"""
+The MIT License (MIT)
+
+Copyright (c) 2025 Ethan Kenneth Davies
+
+Permission is hereby granted, free of charge, to any person obtaining a
+copy of this software and associated documentation files (the "Software"),
+to deal in the Software without restriction, including without limitation
+the rights to use, copy, modify, merge, publish, distribute, sublicense,
+and/or sell copies of the Software, and to permit persons to whom the
+Software is furnished to do so, subject to the following conditions:
+
+The above copyright notice and this permission notice shall be included in
+all copies or substantial portions of the Software.
+
+THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS
+OR IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING
+FROM, OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER
+DEALINGS IN THE SOFTWARE.
+"""
+
+import asyncio
+import json
+import os
+import time
+from typing import Dict, List, Optional, Set
+
+import discord
+import yarl
+from discord.ext import commands
+from discord.gateway import DiscordWebSocket
+from discord.shard import Shard
+
+from .prefixes import *
+
+__all__ = (
+    'ResumableBot',
+)
+
+# Discord doesn't document how long a disconnected session stays resumable. Older ones aren't worth a round trip that
+# will most likely end in an INVALID_SESSION.
+SESSION_MAX_AGE = 120
+
+# Guilds fetched at the same time when rebuilding the cache of a resumed shard.
+HYDRATION_CONCURRENCY = 8
+
+
+class ResumableBot(commands.AutoShardedBot):
+    def __init__(self, *args, sessions_directory: Optional[str] = None, **kwargs):
+        """An ``AutoShardedBot`` that can restart without re-identifying its shards ("quick restart").
+
+        On ``close()`` every shard's session ID, sequence number, resume URL and guild IDs are written to
+        ``sessions_directory`` (one file per shard, so any process layout can pick them up), and the gateway connections
+        are closed with a code that keeps the sessions alive. On the next start, shards with a recent enough saved
+        session RESUME it instead of IDENTIFYing; Discord answers with INVALID_SESSION if it expired, and discord.py
+        falls back to IDENTIFY on its own.
+
+        A resumed shard doesn't get READY or the GUILD_CREATE of each of its guilds, so the new process would know none
+        of them. Their guilds, channels, roles and the bot's own member are fetched from the REST API instead (see
+        ``hydrate_shard()``); other members are only cached as events mention them. Once every shard is either ready
+        or resumed and hydrated, ``on_ready`` is dispatched as usual.
+
+        Relies on discord.py internals (``DiscordWebSocket.from_client()``, ``Shard`` and ``AutoShardedClient``'s
+        private attributes), checked against discord.py 2.6.
+
+        :param sessions_directory: Where sessions are saved, or ``None`` to always IDENTIFY (discord.py's behavior).
+        """
+        super().__init__(*args, **kwargs)
+
+        self.sessions_directory = sessions_directory
+
+        # Shards resuming a saved session -> the guild IDs they had, until their guilds are hydrated.
+        self.cold_shards: Dict[int, List[int]] = {}
+        self.ready_shards: Set[int] = set()
+        self.resumed = False
+
+        self.add_listener(self.track_shard_ready, "on_shard_ready")
+        self.add_listener(self.hydrate_shard, "on_shard_resumed")
+
+    def session_path(self, shard_id: int) -> str:
+        return os.path.join(self.sessions_directory, f"shard-{shard_id}.json")
+
+    def take_session(self, shard_id: int) -> Optional[dict]:
+        """Reads and deletes the saved session of a shard. Deleted either way, a session can only be resumed once.
+
+        :return: The saved session, or ``None`` if there's none or it can't be used.
+        """
+        path = self.session_path(shard_id)
+
+        try:
+            with open(path) as session_file:
+                session = json.load(session_file)
+
+            os.unlink(path)
+
+        except FileNotFoundError:
+            return None
+
+        except (OSError, ValueError) as error:
+            print(f"{WARN_LOG} Ignoring the saved session of shard {shard_id}: {error}")
+
+            return None
+
+        if session.get("shard_count") != self.shard_count:
+            return None
+
+        if not 0 <= time.time() - session.get("saved_at", 0) < SESSION_MAX_AGE:
+            return None
+
+        return session
+
+    async def launch_shard(self, gateway: yarl.URL, shard_id: int, *, initial: bool = False) -> None:
+        session = self.take_session(shard_id) if self.sessions_directory else None
+
+        if session is None:
+            return await super().launch_shard(gateway, shard_id, initial=initial)
+
+        try:
+            ws = await asyncio.wait_for(DiscordWebSocket.from_client(
+                self, initial=initial, gateway=yarl.URL(session["resume_url"]), shard_id=shard_id,
+                session=session["session_id"], sequence=session["sequence"], resume=True
+            ), timeout=self.shard_connect_timeout)
+
+        except Exception as error:
+            print(f"{WARN_LOG} Could not resume shard {shard_id}, identifying instead: {error!r}")
+
+            return await super().launch_shard(gateway, shard_id, initial=initial)
+
+        self.cold_shards[shard_id] = session["guild_ids"]
+
+        # What AutoShardedClient.launch_shard() does once connected.
+        self._AutoShardedClient__shards[shard_id] = shard = Shard(ws, self, self._AutoShardedClient__queue.put_nowait)
+        shard.launch()
+
+    async def hydrate_guild(self, guild_id: int, limiter: asyncio.Semaphore):
+        async with limiter:
+            try:
+                data = await self.http.get_guild(guild_id)
+                data["channels"] = await self.http.get_all_guild_channels(guild_id)
+                data["members"] = [await self.http.get_member(guild_id, self.user.id)]
+
+            except discord.HTTPException as error:
+                # Most likely left while the bot was offline, the GUILD_DELETE is in the replayed events.
+                print(f"{WARN_LOG} Could not fetch guild {guild_id} after resuming: {error}")
+
+                return
+
+        self._connection._add_guild_from_data(data)
+
+    async def hydrate_shard(self, shard_id: int):
+        """Rebuilds the guild cache of a shard that resumed a saved session, then reports it ready.
+
+        Does nothing for shards resuming a session of this process (after a network blip), their cache is intact.
+
+        :param shard_id:
+
+        :return: ``None``
+        """
+        guild_ids = self.cold_shards.pop(shard_id, None)
+
+        if guild_ids is None:
+            return
+
+        self.resumed = True
+
+        print(f"{INFO_LOG} Shard {shard_id} resumed its session, fetching its {len(guild_ids)} guild(s)")
+
+        limiter = asyncio.Semaphore(HYDRATION_CONCURRENCY)
+
+        await asyncio.gather(*(self.hydrate_guild(guild_id, limiter) for guild_id in guild_ids))
+
+        self.dispatch("shard_ready", shard_id)
+
+    async def track_shard_ready(self, shard_id: int):
+        self.ready_shards.add(shard_id)
+
+        # discord.py only dispatches on_ready once every shard got READY, which never happens if one resumed.
+        shard_ids = self.shard_ids or range(self.shard_count)
+
+        if self.resumed and not self.is_ready() and self.ready_shards.issuperset(shard_ids):
+            self._connection.call_handlers("ready")
+            self.dispatch("ready")
+
+    async def save_sessions(self):
+        """Writes every shard's session to ``sessions_directory`` and closes its gateway connection without ending
+        the session. Failing to save a session only means that shard identifies on the next start.
+
+        :return: ``None``
+        """
+        os.makedirs(self.sessions_directory, exist_ok=True)
+
+        saved = 0
+
+        for shard_id, shard in self._AutoShardedClient__shards.items():
+            ws = shard.ws
+
+            if ws.session_id is None:
+                continue
+
+            # Stops the shard from reconnecting. Any close code but 1000 and 1001 leaves the session resumable.
+            shard._cancel_task()
+            await ws.close(code=4000)
+
+            session = {
+                "shard_count": self.shard_count,
+                "saved_at": time.time(),
+                "session_id": ws.session_id,
+                "sequence": ws.sequence,
+                "resume_url": str(ws.gateway),
+                "guild_ids": [guild.id for guild in self.guilds if guild.shard_id == shard_id],
+            }
+
+            path = self.session_path(shard_id)
+
+            try:
+                with open(f"{path}.tmp", "w") as session_file:
+                    json.dump(session, session_file)
+
+                os.replace(f"{path}.tmp", path)
+
+                saved += 1
+
+            except OSError as error:
+                print(f"{WARN_LOG} Could not save the session of shard {shard_id}: {error}")
+
+        print(f"{INFO_LOG} Saved the gateway session of {saved} shard(s) for a quick restart")
+
+    async def close(self) -> None:
+        if self.sessions_directory and not self.is_closed() and self.is_ready():
+            await self.save_sessions()
+
+        await super().close()
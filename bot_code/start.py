@@ -22,22 +22,41 @@ FROM, OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER
 DEALINGS IN THE SOFTWARE.
 """
 
+import sys
+from typing import List, Optional
+
 import discord
 from discord.ext import commands
 
+from .backup import *
+from .command_sync import *
 from .commands import *
 from .config import *
 from .database import *
+from .deletions import *
 from .embeds import *
 from .events import *
 from .exceptions import *
+from .guild_prefixes import *
+from .ipc import *
+from .maintenance import *
+from .metrics import *
+from .partitions import *
+from .permissions import *
 from .prefixes import *
+from .ratelimit import *
+from .profiler import *
+from .reload import *
+from .sessions import *
 from .set_logging import *
+from .timeline import *
+from .watchdog import *
 
 __all__ = (
     'start_bot',
     'default_bot',
-    'default_database',
+    'build_database',
+    'build_metrics_server',
 )
 
 intents = discord.Intents.none()
@@ -46,48 +65,242 @@ intents.members = True
 intents.message_content = True
 intents.messages = True
 
-# AutoShardedBot is used for better scaling.
-default_bot = commands.AutoShardedBot(
-    owner_ids=VALUES.OWNER_IDS,
+# AutoShardedBot is used for better scaling, ResumableBot adds quick restarts to it. The configuration isn't loaded yet
+# at import time, so the owner IDs, command prefix and sessions directory are set by ``start_bot()``.
+default_bot = ResumableBot(
     intents=intents,
-    command_prefix=VALUES.COMMAND_PREFIX,
+    command_prefix="?",
     case_insensitive=True,
     help_command=None,
     allowed_mentions=discord.AllowedMentions.none(),
     activity=discord.Activity(type=discord.ActivityType.watching, name="?help"),
-    status=discord.Status.online
+    status=discord.Status.online,
+    http_trace=METRICS.http_trace()
 )
 
-default_database = Database()
-
 embeds_default = Embeds()
 
 
-async def start_bot(bot_instance: commands.AutoShardedBot = default_bot, database_instance: Database = default_database,
-                    embeds_instance: Embeds = embeds_default):
+def build_database() -> Database:
+    """Creates the database described by the (already loaded) configuration, partitioned or not.
+
+    :return: A ``Database`` or ``PartitionedDatabase``, not yet connected.
+    """
+    # One profiler for every database file, so partitions show up as one set of operations.
+    profiler = QueryProfiler(slow_query_ms=VALUES.SLOW_QUERY_MS) if VALUES.QUERY_PROFILER else None
+
+    if VALUES.DATABASE_PARTITIONS > 1:
+        return PartitionedDatabase(database_path=VALUES.DATABASE_PATH,
+                                   partition_count=VALUES.DATABASE_PARTITIONS,
+                                   config_cache_size=VALUES.GUILD_CONFIG_CACHE_SIZE,
+                                   reader_pool_size=VALUES.DATABASE_READER_POOL_SIZE,
+                                   profiler=profiler)
+
+    return Database(database_path=VALUES.DATABASE_PATH,
+                    config_cache_size=VALUES.GUILD_CONFIG_CACHE_SIZE,
+                    reader_pool_size=VALUES.DATABASE_READER_POOL_SIZE,
+                    profiler=profiler)
+
+
+def build_metrics_server(bot_instance: commands.AutoShardedBot, database_instance: Database,
+                         cluster_instance: Optional[ClusterClient] = None) -> Optional[MetricsServer]:
+    """Creates the metrics server described by the (already loaded) configuration.
+
+    :param bot_instance:
+    :param database_instance:
+    :param cluster_instance: The IPC channel to the cluster launcher, if running as a worker process.
+
+    :return: A ``MetricsServer``, not yet started, or ``None`` if ``metrics_port`` isn't set.
+    """
+    if VALUES.METRICS_PORT is None:
+        return None
+
+    # Each process of a cluster serves its own shards' metrics, on the next port up.
+    metrics_port = VALUES.METRICS_PORT + (cluster_instance.cluster_id if cluster_instance else 0)
+
+    return MetricsServer(metrics=METRICS, bot_instance=bot_instance, host=VALUES.METRICS_HOST, port=metrics_port,
+                         database_instance=database_instance)
+
+
+async def authenticate(bot_instance: commands.AutoShardedBot):
+    """Validates the token before anything else starts, unless validation is disabled or this token was validated
+    recently (see ``token_recently_validated()``). Exits with ``78`` (``EX_CONFIG``) if the token is rejected.
+
+    :param bot_instance:
+
+    :return: ``None``
+    """
+    if not VALUES.TOKEN_VALIDATION:
+        print(f"{WARN_LOG} Skipping token authentication validation")
+        return
+
+    if token_recently_validated(TOKEN_VALIDATION_CACHE_PATH, VALUES.TOKEN, VALUES.TOKEN_VALIDATION_CACHE_HOURS):
+        print(f"{INFO_LOG} Token was validated less than {VALUES.TOKEN_VALIDATION_CACHE_HOURS:g} hour(s) ago, "
+              f"skipping validation")
+        return
+
+    try:
+        with TIMELINE.phase("token validation"):
+            await validate_token(bot_instance, VALUES.TOKEN)
+
+    except ConfigError as error:
+        print(f"{EROR_LOG} Invalid configuration: {error.faulty_key}: {error.message}")
+
+        # For POSIX-compliance.
+        sys.exit(78)
+
+    remember_token_validation(TOKEN_VALIDATION_CACHE_PATH, VALUES.TOKEN)
+
+
+async def start_bot(bot_instance: commands.AutoShardedBot = default_bot, database_instance: Optional[Database] = None,
+                    embeds_instance: Embeds = embeds_default, backup_instance: Optional[BackupManager] = None,
+                    maintenance_instance: Optional[MaintenanceScheduler] = None,
+                    deletion_instance: Optional[DeletionScheduler] = None,
+                    rate_limiter_instance: Optional[RateLimiter] = None,
+                    metrics_server_instance: Optional[MetricsServer] = None,
+                    shard_ids: Optional[List[int]] = None, shard_count: Optional[int] = None,
+                    cluster_instance: Optional[ClusterClient] = None, scheduled_tasks: bool = True):
+    """Loads the configuration (if it isn't yet), starts the database and connects every shard. Only returns once the
+    bot is closed.
+
+    :param bot_instance:
+    :param database_instance: Built from the configuration if ``None`` (see ``build_database()``).
+    :param embeds_instance:
+    :param backup_instance: Built from the configuration if ``None``.
+    :param maintenance_instance: Built from the configuration if ``None``.
+    :param deletion_instance: Built if ``None``. Pass it to ``stop_bot()`` as well, so it stops before the database
+        closes.
+    :param rate_limiter_instance: Built from the configuration if ``None``.
+    :param metrics_server_instance: Built from the configuration if ``None`` (see ``build_metrics_server()``). Pass it
+        to ``stop_bot()`` as well, so it stops serving.
+    :param shard_ids: The shards to run, when the rest run in other processes (see ``cluster.py``). All of them if
+        ``None``.
+    :param shard_count: The total number of shards, required with ``shard_ids``.
+    :param cluster_instance: The IPC channel to the cluster launcher, if running as a worker process.
+    :param scheduled_tasks: Starts the scheduled backups and maintenance. Only one process of a cluster should.
+
+    :return: ``None``
+    """
     set_logging(log_level=30, default_log_level=20)
 
     print(f"{INFO_LOG} Starting bot...")
 
+    if not VALUES.loaded:
+        with TIMELINE.phase("config load"):
+            VALUES.load()
+
+    apply_settings(bot_instance)
+
+    # Started first so blocking calls during the rest of the startup are caught too.
+    if VALUES.WATCHDOG_THRESHOLD_MS is not None:
+        LoopWatchdog(threshold=VALUES.WATCHDOG_THRESHOLD_MS / 1000).start()
+
+    if shard_ids is not None:
+        bot_instance.shard_ids = list(shard_ids)
+        bot_instance.shard_count = shard_count
+
+    await authenticate(bot_instance)
+
+    if database_instance is None:
+        database_instance = build_database()
+
+    bot_instance.command_prefix = GuildPrefixes(database_instance=database_instance, default=VALUES.COMMAND_PREFIX)
+
+    if backup_instance is None:
+        backup_instance = BackupManager(database_instance=database_instance,
+                                        backup_directory=VALUES.BACKUP_DIRECTORY,
+                                        keep=VALUES.BACKUP_KEEP,
+                                        interval_hours=VALUES.BACKUP_INTERVAL_HOURS)
+
+    if maintenance_instance is None:
+        maintenance_instance = MaintenanceScheduler(database_instance=database_instance,
+                                                    window=VALUES.MAINTENANCE_WINDOW)
+
+    if deletion_instance is None:
+        deletion_instance = DeletionScheduler(bot_instance=bot_instance, database_instance=database_instance)
+
+    if rate_limiter_instance is None:
+        rate_limiter_instance = RateLimiter(limits=VALUES.RATE_LIMITS)
+
+    command_sync = CommandSync(bot_instance=bot_instance, database_instance=database_instance)
+    permissions = PermissionResolver(database_instance=database_instance)
+
+    TIMELINE.begin("command registration")
+
     prefix_cmds = PrefixCommands(bot_instance=bot_instance,
                                  embed_instance=embeds_instance,
-                                 database_instance=database_instance)
+                                 database_instance=database_instance,
+                                 backup_instance=backup_instance,
+                                 maintenance_instance=maintenance_instance,
+                                 deletion_instance=deletion_instance,
+                                 rate_limiter_instance=rate_limiter_instance,
+                                 command_sync_instance=command_sync,
+                                 permission_instance=permissions,
+                                 cluster_instance=cluster_instance)
 
     slash_cmds = SlashCommands(bot_instance=bot_instance,
                                embed_instance=embeds_instance,
-                               database_instance=database_instance)
+                               database_instance=database_instance,
+                               rate_limiter_instance=rate_limiter_instance,
+                               permission_instance=permissions)
 
     events = Events(bot_instance=bot_instance,
                     embed_instance=embeds_instance,
-                    database_instance=database_instance)
+                    database_instance=database_instance,
+                    command_sync_instance=command_sync,
+                    permission_instance=permissions)
+
+    await bot_instance.add_cog(slash_cmds)
+
+    TIMELINE.end("command registration")
 
     try:
-        async with database_instance as db:
-            await db.create_db()
+        # The connection stays open until ``stop_bot()``.
+        with TIMELINE.phase("database connect"):
+            await database_instance.connect()
+
+        with TIMELINE.phase("create_db"):
+            await database_instance.create_db()
+
+        with TIMELINE.phase("repartition"):
+            await repartition(database_instance)
+
+        with TIMELINE.phase("load guild configs"):
+            await database_instance.load_guild_configs()
+
+        with TIMELINE.phase("load scheduled deletions"):
+            await deletion_instance.start()
+
+        if VALUES.WRITE_BEHIND:
+            database_instance.enable_write_behind(max_batch_size=VALUES.WRITE_BEHIND_BATCH_SIZE,
+                                                  max_delay=VALUES.WRITE_BEHIND_MAX_DELAY_MS / 1000)
 
     except DatabaseError as error:
         print(f"{EROR_LOG} {error}")
 
-    await bot_instance.add_cog(slash_cmds)
+    if metrics_server_instance is None:
+        metrics_server_instance = build_metrics_server(bot_instance=bot_instance,
+                                                       database_instance=database_instance,
+                                                       cluster_instance=cluster_instance)
+
+    if metrics_server_instance is not None:
+        try:
+            await metrics_server_instance.start()
+
+        except OSError as error:
+            print(f"{EROR_LOG} Could not serve metrics on {metrics_server_instance.host}:"
+                  f"{metrics_server_instance.port}: {error}")
+
+    if scheduled_tasks:
+        backup_instance.start()
+        maintenance_instance.start()
+
+    # Already logged in if the token was just validated.
+    if bot_instance.user is None:
+        with TIMELINE.phase("login"):
+            await bot_instance.login(VALUES.TOKEN)
+
+    # Ends in ``Events.on_ready()``, once every shard is ready.
+    TIMELINE.begin("gateway connect")
 
-    await bot_instance.start(VALUES.TOKEN)
+    await bot_instance.connect()
@@ -26,20 +26,41 @@ __all__ = (
     'stop_bot',
 )
 
-from sys import exit
+from typing import Optional
 from discord.ext import commands
 
 from .database import *
+from .deletions import *
+from .metrics import *
 from .prefixes import *
 
 
-async def stop_bot(bot_instance: commands.AutoShardedBot, database_instance: Database):
+async def stop_bot(bot_instance: commands.AutoShardedBot, database_instance: Database,
+                   deletion_instance: Optional[DeletionScheduler] = None,
+                   metrics_server_instance: Optional[MetricsServer] = None):
+    """Closes the bot and the database. It doesn't exit the process, whoever runs the bot (``main.py``) decides the
+    exit status once this returns.
+
+    Calling it again is safe, and closes whatever the previous call wasn't given (``?shutdown`` calls it before
+    ``main.py`` does).
+
+    :param bot_instance:
+    :param database_instance:
+    :param deletion_instance: Stopped before the database closes, if given.
+    :param metrics_server_instance: Stops serving, if given.
+    :return: ``None``
+    """
+    # Before the database closes under it. Pending deletions stay stored for the next start.
+    if deletion_instance is not None:
+        await deletion_instance.stop()
+
+    if metrics_server_instance is not None:
+        await metrics_server_instance.close()
+
     if bot_instance.is_closed():
         print(f"{INFO_LOG} Bot is already closed.")
-        return
-
-    await bot_instance.close()
 
-    await database_instance.__aexit__(None, None, None)
+    else:
+        await bot_instance.close()
 
-    exit(0)
+    await database_instance.close()
@@ -0,0 +1,147 @@
+"""
+The MIT License (MIT)
+
+Copyright (c) 2025 Ethan Kenneth Davies
+
+Permission is hereby granted, free of charge, to any person obtaining a
+copy of this software and associated documentation files (the "Software"),
+to deal in the Software without restriction, including without limitation
+the rights to use, copy, modify, merge, publish, distribute, sublicense,
+and/or sell copies of the Software, and to permit persons to whom the
+Software is furnished to do so, subject to the following conditions:
+
+The above copyright notice and this permission notice shall be included in
+all copies or substantial portions of the Software.
+
+THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS
+OR IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING
+FROM, OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER
+DEALINGS IN THE SOFTWARE.
+"""
+
+import json
+import os
+from contextlib import contextmanager
+from datetime import datetime, timezone
+from time import perf_counter
+from typing import Dict, List, Optional
+
+from .prefixes import *
+
+__all__ = (
+    'TIMELINE',
+    'StartupTimeline',
+)
+
+
+class StartupTimeline:
+    def __init__(self, origin: Optional[float] = None):
+        """Timestamps of every startup phase, relative to ``origin`` (a ``perf_counter()`` reading, ideally taken on
+        the first line of ``main.py``).
+
+        Phases are spans (``phase()`` or ``begin()``/``end()``, which can be in different callbacks) and marks are
+        single points in time, like a shard becoming ready.
+
+        :param origin: Defaults to now.
+        """
+        self.origin = perf_counter() if origin is None else origin
+
+        # name -> [started, finished], seconds since origin. Kept in the order phases begin.
+        self.phases: Dict[str, List[Optional[float]]] = {}
+        self.marks: Dict[str, float] = {}
+
+        self.finished = False
+
+    def now(self) -> float:
+        return perf_counter() - self.origin
+
+    def begin(self, name: str):
+        self.phases[name] = [self.now(), None]
+
+    def end(self, name: str):
+        """Ends a phase. Ending one that never began, or already ended, does nothing.
+
+        :return: ``None``
+        """
+        span = self.phases.get(name)
+
+        if span and span[1] is None:
+            span[1] = self.now()
+
+    @contextmanager
+    def phase(self, name: str):
+        self.begin(name)
+
+        try:
+            yield
+
+        finally:
+            self.end(name)
+
+    def record(self, name: str, started: float, finished: float):
+        """Adds a phase timed elsewhere, from two ``perf_counter()`` readings.
+
+        :return: ``None``
+        """
+        self.phases[name] = [started - self.origin, finished - self.origin]
+
+    def mark(self, name: str):
+        self.marks[name] = self.now()
+
+    def report(self) -> dict:
+        """:return: The timeline as a JSON-serializable ``dict``, times in seconds since ``origin``."""
+        from . import __version__
+
+        return {
+            "version": __version__,
+            "recorded_at": datetime.now(timezone.utc).isoformat(timespec="seconds"),
+            "total": round(self.now(), 3),
+            "phases": [
+                {"name": name, "start": round(started, 3),
+                 "seconds": None if finished is None else round(finished - started, 3)}
+                for name, (started, finished) in self.phases.items()
+            ],
+            "marks": [{"name": name, "at": round(at, 3)} for name, at in self.marks.items()],
+        }
+
+    def finish(self, file_path: str = "/opt/archon/var/cache/startup_timeline.jsonl"):
+        """Prints a compact report and appends it to ``file_path`` as one JSON line, so startups can be compared
+        across releases. Only the first call does anything, later ``on_ready`` events (after reconnecting) aren't
+        startups.
+
+        :param file_path:
+
+        :return: ``None``
+        """
+        if self.finished:
+            return
+
+        self.finished = True
+
+        report = self.report()
+
+        print(f"{INFO_LOG} Startup took {report['total']:.3f}s:")
+
+        for phase in report["phases"]:
+            seconds = "unfinished" if phase["seconds"] is None else f"{phase['seconds']:.3f}s"
+
+            print(f"{INFO_LOG}   {phase['name']:<24} {seconds:>10}  (at {phase['start']:.3f}s)")
+
+        for mark in report["marks"]:
+            print(f"{INFO_LOG}   {mark['name']:<24} {'':>10}  (at {mark['at']:.3f}s)")
+
+        try:
+            os.makedirs(os.path.dirname(file_path), exist_ok=True)
+
+            with open(file_path, "a") as timeline_file:
+                timeline_file.write(json.dumps(report) + "\n")
+
+        except OSError as error:
+            print(f"{WARN_LOG} Could not write the startup timeline to '{file_path}': {error}")
+
+
+# Shared by main.py, ``start_bot()`` and ``Events``. main.py moves the origin back to when it was launched.
+TIMELINE = StartupTimeline()
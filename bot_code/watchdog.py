@@ -0,0 +1,146 @@
+"""
+The MIT License (MIT)
+
+Copyright (c) 2025 Ethan Kenneth Davies
+
+Permission is hereby granted, free of charge, to any person obtaining a
+copy of this software and associated documentation files (the "Software"),
+to deal in the Software without restriction, including without limitation
+the rights to use, copy, modify, merge, publish, distribute, sublicense,
+and/or sell copies of the Software, and to permit persons to whom the
+Software is furnished to do so, subject to the following conditions:
+
+The above copyright notice and this permission notice shall be included in
+all copies or substantial portions of the Software.
+
+THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS
+OR IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING
+FROM, OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER
+DEALINGS IN THE SOFTWARE.
+"""
+
+import asyncio
+import sys
+import threading
+import traceback
+from time import monotonic, sleep
+from typing import Optional
+
+from .metrics import *
+from .prefixes import *
+
+__all__ = (
+    'LoopWatchdog',
+)
+
+
+class LoopWatchdog:
+    def __init__(self, threshold: float = 0.25, interval: float = 0.1, stack_limit: int = 15):
+        """Catches blocking calls on the event loop (file I/O, ``input()``, CPU-heavy work, ...), which freeze every
+        shard's heartbeat until Discord disconnects it.
+
+        A task on the loop wakes up every ``interval`` seconds and records how late it was woken in ``METRICS``. A
+        helper thread watches for that task going quiet: once the loop hasn't run it for ``threshold`` seconds beyond
+        ``interval``, the thread logs the loop thread's current stack (which is the blocking call), and when the loop
+        recovers, how long the stall lasted. Stalls are counted in ``METRICS``, as is the longest one.
+
+        :param threshold: Seconds the loop may be late before it counts as stalled.
+        :param interval: Seconds between the task's wakeups.
+        :param stack_limit: Most stack frames logged per stall, innermost last.
+        """
+        self.threshold = threshold
+        self.interval = interval
+        self.stack_limit = stack_limit
+
+        # Written by the loop task, read by the helper thread. A float assignment is atomic under the GIL.
+        self.last_beat = monotonic()
+
+        self.stalls = 0
+        self.longest_stall = 0.0
+
+        self.loop_thread_id: Optional[int] = None
+        self.task: Optional[asyncio.Task] = None
+        self.thread: Optional[threading.Thread] = None
+        self.stopping = threading.Event()
+
+    def start(self):
+        """Starts the watchdog on the running event loop.
+
+        :return: ``None``
+        """
+        if self.task is not None:
+            return
+
+        self.loop_thread_id = threading.get_ident()
+        self.last_beat = monotonic()
+
+        # Exported as 0 until the first stall.
+        METRICS.loop_stalls.labels()
+        METRICS.longest_loop_stall.labels()
+
+        self.task = asyncio.create_task(self.beat())
+        self.thread = threading.Thread(target=self.watch, name="event-loop-watchdog", daemon=True)
+        self.thread.start()
+
+    def stop(self):
+        """:return: ``None``"""
+        self.stopping.set()
+
+        if self.task is not None:
+            self.task.cancel()
+            self.task = None
+
+    async def beat(self):
+        lag = METRICS.loop_lag.labels()
+
+        while True:
+            scheduled = monotonic()
+            await asyncio.sleep(self.interval)
+
+            self.last_beat = monotonic()
+            lag.observe(max(0.0, self.last_beat - scheduled - self.interval))
+
+    def watch(self):
+        """Runs on the helper thread until ``stop()``.
+
+        :return: ``None``
+        """
+        stalled_since: Optional[float] = None
+
+        while not self.stopping.is_set():
+            sleep(self.interval / 2)
+
+            last_beat = self.last_beat
+            silence = monotonic() - last_beat
+
+            if stalled_since is None and silence > self.interval + self.threshold:
+                stalled_since = last_beat
+
+                print(f"{WARN_LOG} The event loop has been blocked for {silence * 1000:.0f}ms, it is running:\n"
+                      f"{self.loop_stack()}", flush=True)
+
+            elif stalled_since is not None and last_beat != stalled_since:
+                # The beat after a stall lands about one interval after the loop is free again.
+                stall = last_beat - stalled_since - self.interval
+
+                self.stalls += 1
+                self.longest_stall = max(self.longest_stall, stall)
+
+                METRICS.loop_stalls.labels().inc()
+                METRICS.longest_loop_stall.labels().set(self.longest_stall)
+
+                print(f"{WARN_LOG} The event loop was blocked for {stall * 1000:.0f}ms", flush=True)
+
+                stalled_since = None
+
+    def loop_stack(self) -> str:
+        """:return: The formatted stack of the event loop's thread, as it is right now."""
+        frame = sys._current_frames().get(self.loop_thread_id)
+
+        if frame is None:
+            return "    (the event loop's thread has exited)"
+
+        return "".join(traceback.format_stack(frame, limit=self.stack_limit)).rstrip()
@@ -0,0 +1,201 @@
+"""
+The MIT License (MIT)
+
+Copyright (c) 2025 Ethan Kenneth Davies
+
+Permission is hereby granted, free of charge, to any person obtaining a
+copy of this software and associated documentation files (the "Software"),
+to deal in the Software without restriction, including without limitation
+the rights to use, copy, modify, merge, publish, distribute, sublicense,
+and/or sell copies of the Software, and to permit persons to whom the
+Software is furnished to do so, subject to the following conditions:
+
+The above copyright notice and this permission notice shall be included in
+all copies or substantial portions of the Software.
+
+THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS
+OR IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING
+FROM, OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER
+DEALINGS IN THE SOFTWARE.
+"""
+
+import asyncio
+from typing import Any, Awaitable, Callable, List, Optional, Tuple
+
+from .exceptions import *
+from .prefixes import *
+
+__all__ = (
+    'WriteBehindQueue',
+)
+
+Mutation = Tuple[str, tuple]
+
+
+class WriteBehindQueue:
+    def __init__(self, apply_batch: Callable[[List[Mutation]], Awaitable[Any]], max_batch_size: int = 500,
+                 max_delay: float = 0.25, max_attempts: int = 5, retry_delay: float = 0.1):
+        """An in-process queue of pending database mutations that are applied in batches by a background flusher.
+
+        A batch is flushed as soon as ``max_batch_size`` mutations are waiting, or ``max_delay`` seconds after the first
+        mutation of the batch was queued, whichever comes first. Mutations are ``(operation, parameters)`` tuples and
+        are handed to ``apply_batch`` in the order they were queued.
+
+        A batch that fails (e.g. the database is busy) is retried with exponential backoff, and only dropped once
+        ``max_attempts`` tries have failed.
+
+        :param apply_batch: Coroutine function that applies a list of mutations in a single transaction.
+        :param max_batch_size: Maximum number of mutations per batch.
+        :param max_delay: Maximum number of seconds a mutation waits in the queue before being flushed.
+        :param max_attempts: Tries per batch before it is dropped.
+        :param retry_delay: Seconds before the first retry, doubled for each one after it.
+        """
+        self.apply_batch = apply_batch
+        self.max_batch_size = max_batch_size
+        self.max_delay = max_delay
+        self.max_attempts = max_attempts
+        self.retry_delay = retry_delay
+
+        self.pending: List[Mutation] = []
+        self.has_items = asyncio.Event()
+        self.is_full = asyncio.Event()
+
+        # Serializes flushes from the background flusher and ``stop()``.
+        self.flush_lock = asyncio.Lock()
+        self.flusher: Optional[asyncio.Task] = None
+        self.stopping = False
+
+        self.flushed_batches = 0
+        self.flushed_mutations = 0
+
+    def start(self):
+        """Starts the background flusher task. Must be called from a running event loop.
+
+        :return: ``None``
+        """
+        if self.flusher is None:
+            self.stopping = False
+            self.flusher = asyncio.create_task(self.run())
+
+    async def stop(self):
+        """Stops the background flusher, then flushes everything still in the queue.
+
+        The flusher isn't cancelled, it may be in the middle of writing a batch (or waiting for the writer lock to do
+        so). It is woken up and finishes its current flush before returning.
+
+        :return: ``None``
+        """
+        if self.flusher is not None:
+            self.stopping = True
+            self.has_items.set()
+            self.is_full.set()
+
+            await self.flusher
+
+            self.flusher = None
+
+        await self.flush()
+
+    def put(self, operation: str, parameters: tuple):
+        """Queues a mutation without waiting for it to be written.
+
+        :param operation: Name of the operation, understood by ``apply_batch``.
+        :param parameters: Statement parameters of the operation.
+
+        :return: ``None``
+        """
+        self.pending.append((operation, parameters))
+
+        self.has_items.set()
+
+        if len(self.pending) >= self.max_batch_size:
+            self.is_full.set()
+
+    async def run(self):
+        """Waits for the first queued mutation, gives the batch up to ``max_delay`` seconds to fill, then flushes it.
+        Repeats until ``stop()``.
+
+        :return: ``None``
+        """
+        while not self.stopping:
+            await self.has_items.wait()
+
+            if not self.is_full.is_set():
+                try:
+                    await asyncio.wait_for(self.is_full.wait(), timeout=self.max_delay)
+
+                except asyncio.TimeoutError:
+                    pass
+
+            await self.flush()
+
+    async def flush(self):
+        """Applies every queued mutation in batches of at most ``max_batch_size``.
+
+        A batch that fails, with a ``DatabaseError`` or anything else ``apply_batch`` raises, is retried after
+        ``retry_delay`` seconds, doubling each time. After ``max_attempts`` failures it is logged and dropped so one
+        bad row can't wedge the queue, and the background flusher keeps running. If the flush is cancelled, the batch
+        in hand goes back to the front of the queue.
+
+        :return: ``None``
+        """
+        async with self.flush_lock:
+            while self.pending:
+                batch = self.pending[:self.max_batch_size]
+                del self.pending[:len(batch)]
+
+                if len(self.pending) < self.max_batch_size:
+                    self.is_full.clear()
+
+                if not self.pending:
+                    self.has_items.clear()
+
+                try:
+                    written = await self.apply_with_retries(batch)
+
+                except asyncio.CancelledError:
+                    self.pending[:0] = batch
+                    self.has_items.set()
+
+                    if len(self.pending) >= self.max_batch_size:
+                        self.is_full.set()
+
+                    raise
+
+                if written:
+                    self.flushed_batches += 1
+                    self.flushed_mutations += len(batch)
+
+    async def apply_with_retries(self, batch: List[Mutation]) -> bool:
+        """Applies a batch, retrying with exponential backoff.
+
+        :param batch:
+
+        :return: Whether the batch was written, ``False`` if it was dropped after ``max_attempts`` failures.
+        """
+        for attempt in range(1, self.max_attempts + 1):
+            try:
+                await self.apply_batch(batch)
+
+                return True
+
+            except Exception as error:
+                message = error.message if isinstance(error, DatabaseError) else repr(error)
+
+                if attempt == self.max_attempts:
+                    print(f"{EROR_LOG} Dropped a batch of {len(batch)} queued writes after {attempt} attempts: "
+                          f"{message}")
+
+                    return False
+
+                delay = self.retry_delay * 2 ** (attempt - 1)
+
+                print(f"{WARN_LOG} Writing a batch of {len(batch)} queued writes failed, retrying in {delay:g}s "
+                      f"(attempt {attempt} of {self.max_attempts}): {message}")
+
+                await asyncio.sleep(delay)
+
+        return False
@@ -0,0 +1,305 @@
+"""
+The MIT License (MIT)
+
+Copyright (c) 2025 Ethan Kenneth Davies
+
+Permission is hereby granted, free of charge, to any person obtaining a
+copy of this software and associated documentation files (the "Software"),
+to deal in the Software without restriction, including without limitation
+the rights to use, copy, modify, merge, publish, distribute, sublicense,
+and/or sell copies of the Software, and to permit persons to whom the
+Software is furnished to do so, subject to the following conditions:
+
+The above copyright notice and this permission notice shall be included in
+all copies or substantial portions of the Software.
+
+THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS
+OR IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING
+FROM, OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER
+DEALINGS IN THE SOFTWARE.
+"""
+
+"""Cluster mode: runs the shards in several worker processes (each its own event loop on its own core) instead of one.
+
+The launcher splits the shards into contiguous ranges, one per worker, migrates the database once, and then starts the
+workers one at a time, waiting for each to be ready so their shards don't identify at the same time. It restarts
+workers that die, forwards SIGTERM/SIGINT to every worker for an orderly shutdown, and relays owner commands between
+workers over a Unix socket (see ``bot_code/ipc.py``).
+
+Run from the repository root::
+
+    python cluster.py --processes 4 [--shards 16] [--socket /opt/archon/var/run/cluster.sock]
+"""
+
+import argparse
+import asyncio
+import multiprocessing
+import signal
+import sys
+from typing import Dict, List, Optional
+
+import bot_code as bc
+from main import print_intro, run_worker
+
+# Worker exit code for an invalid configuration (see ``Values.load()``), restarting wouldn't help.
+EX_CONFIG = 78
+
+
+def shard_ranges(shard_count: int, processes: int) -> List[List[int]]:
+    """Splits ``range(shard_count)`` into ``processes`` contiguous ranges, differing in length by at most one.
+
+    :return: The shard IDs of every worker, in order.
+    """
+    size, remainder = divmod(shard_count, processes)
+    ranges, start = [], 0
+
+    for index in range(processes):
+        end = start + size + (1 if index < remainder else 0)
+        ranges.append(list(range(start, end)))
+        start = end
+
+    return ranges
+
+
+async def recommended_shard_count() -> int:
+    """Asks Discord how many shards the bot should run, like ``AutoShardedBot`` does on its own.
+
+    :return: The recommended number of shards.
+    """
+    import discord
+
+    client = discord.Client(intents=discord.Intents.none())
+
+    try:
+        await client.login(bc.VALUES.TOKEN)
+        shard_count, _, _ = await client.http.get_bot_gateway()
+
+    finally:
+        await client.close()
+
+    return shard_count
+
+
+class Launcher:
+    def __init__(self, shard_count: int, processes: int, socket_path: str, ready_timeout: float = 300.0,
+                 restart_delay: float = 5.0):
+        """Starts and supervises the worker processes.
+
+        :param shard_count: Total number of shards across every worker.
+        :param processes: Number of worker processes.
+        :param socket_path: Path of the IPC Unix socket.
+        :param ready_timeout: Seconds to wait for a worker's shards to be ready before starting the next one anyway.
+        :param restart_delay: Seconds to wait before restarting a worker that died.
+        """
+        self.shard_count = shard_count
+        self.ranges = shard_ranges(shard_count, processes)
+        self.socket_path = socket_path
+        self.ready_timeout = ready_timeout
+        self.restart_delay = restart_delay
+
+        # "spawn", forking the launcher's event loop and sockets into the workers is asking for trouble.
+        self.context = multiprocessing.get_context("spawn")
+        self.workers: Dict[int, multiprocessing.Process] = {}
+        self.ready: Dict[int, asyncio.Event] = {}
+
+        self.server = bc.ClusterServer(socket_path, self.on_message)
+        self.stopping = asyncio.Event()
+
+        # Held while a worker is starting up, so restarts don't identify at the same time as other workers.
+        self.startup_lock = asyncio.Lock()
+
+    async def on_message(self, cluster_id: int, message: dict):
+        op = message.get("op")
+
+        if op == "ready":
+            self.ready[cluster_id].set()
+
+            print(f"{bc.INFO_LOG} Cluster {cluster_id} is ready (shards {self.describe(cluster_id)})")
+
+        elif op == "shutdown":
+            print(f"{bc.WARN_LOG} Cluster {cluster_id} requested a shutdown "
+                  f"(by {message.get('requested_by', 'unknown')})")
+
+            self.stop()
+
+        elif op == "reload":
+            # The sender already reloaded, and checked the file is valid.
+            await self.server.broadcast({"op": "reload"}, exclude=cluster_id)
+
+    def describe(self, cluster_id: int) -> str:
+        shard_ids = self.ranges[cluster_id]
+
+        return f"{shard_ids[0]}-{shard_ids[-1]}" if shard_ids else "none"
+
+    async def start_worker(self, cluster_id: int):
+        async with self.startup_lock:
+            if self.stopping.is_set():
+                return
+
+            self.ready[cluster_id] = asyncio.Event()
+
+            worker = self.context.Process(target=run_worker, name=f"archon-cluster-{cluster_id}",
+                                          args=(cluster_id, self.ranges[cluster_id], self.shard_count,
+                                                self.socket_path))
+            worker.start()
+            self.workers[cluster_id] = worker
+
+            print(f"{bc.INFO_LOG} Started cluster {cluster_id} (PID {worker.pid}, shards {self.describe(cluster_id)})")
+
+            deadline = asyncio.get_running_loop().time() + self.ready_timeout
+
+            # A worker that dies while starting is left to supervise().
+            while not self.ready[cluster_id].is_set() and not self.stopping.is_set() and worker.is_alive():
+                if asyncio.get_running_loop().time() >= deadline:
+                    print(f"{bc.WARN_LOG} Cluster {cluster_id} not ready after {self.ready_timeout:g}s, moving on")
+
+                    break
+
+                await asyncio.sleep(0.5)
+
+    async def supervise(self):
+        """Restarts workers that exit on their own, until the launcher is stopping.
+
+        :return: ``None``
+        """
+        while not self.stopping.is_set():
+            for cluster_id, worker in list(self.workers.items()):
+                if worker.exitcode is None or self.stopping.is_set():
+                    continue
+
+                if worker.exitcode == EX_CONFIG:
+                    print(f"{bc.EROR_LOG} Cluster {cluster_id} has an invalid configuration, stopping every cluster")
+
+                    self.stop()
+
+                    return
+
+                print(f"{bc.WARN_LOG} Cluster {cluster_id} exited with code {worker.exitcode}, restarting in "
+                      f"{self.restart_delay:g}s")
+
+                del self.workers[cluster_id]
+
+                await asyncio.sleep(self.restart_delay)
+                await self.start_worker(cluster_id)
+
+            await asyncio.sleep(1)
+
+    def stop(self):
+        if not self.stopping.is_set():
+            print(f"{bc.WARN_LOG} Stopping every cluster...")
+
+            self.stopping.set()
+
+    async def terminate_workers(self, timeout: float = 30.0):
+        """Forwards SIGTERM to every worker (see ``main()`` in ``main.py``) and kills any still running after
+        ``timeout`` seconds.
+
+        :return: ``None``
+        """
+        for worker in self.workers.values():
+            if worker.is_alive():
+                worker.terminate()
+
+        loop = asyncio.get_running_loop()
+
+        for cluster_id, worker in self.workers.items():
+            await loop.run_in_executor(None, worker.join, timeout)
+
+            if worker.is_alive():
+                print(f"{bc.WARN_LOG} Cluster {cluster_id} did not stop within {timeout:g}s, killing it")
+
+                worker.kill()
+
+    async def run(self):
+        loop = asyncio.get_running_loop()
+
+        for sig in (signal.SIGINT, signal.SIGTERM):
+            loop.add_signal_handler(sig, self.stop)
+
+        loop.add_signal_handler(signal.SIGHUP,
+                                lambda: asyncio.ensure_future(self.server.broadcast({"op": "reload"})))
+
+        await self.server.start()
+
+        try:
+            for cluster_id in range(len(self.ranges)):
+                await self.start_worker(cluster_id)
+
+            supervisor = asyncio.create_task(self.supervise())
+
+            await self.stopping.wait()
+
+            supervisor.cancel()
+
+        finally:
+            await self.terminate_workers()
+            await self.server.close()
+
+        print(f"{bc.INFO_LOG} Every cluster stopped.")
+
+
+async def migrate():
+    """Brings the database up to date once, before the workers start, instead of every worker racing to do it.
+
+    :return: ``None``
+    """
+    database = bc.build_database()
+
+    try:
+        await database.connect()
+        await database.create_db()
+
+    except bc.DatabaseError as error:
+        print(f"{bc.EROR_LOG} {error}")
+
+        sys.exit(1)
+
+    finally:
+        await database.close()
+
+
+async def launch(processes: int, shard_count: Optional[int], socket_path: str):
+    bc.VALUES.load()
+
+    await print_intro(bc.VALUES.PRINT_INTRO)
+
+    if shard_count is None:
+        shard_count = await recommended_shard_count()
+
+    processes = min(processes, shard_count)
+
+    print(f"{bc.INFO_LOG} Running {shard_count} shard(s) in {processes} process(es)")
+
+    await migrate()
+
+    await Launcher(shard_count=shard_count, processes=processes, socket_path=socket_path).run()
+
+
+def parse_arguments() -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description="Runs Archon's shards across several worker processes.")
+
+    parser.add_argument("--processes", type=int, default=multiprocessing.cpu_count(),
+                        help="number of worker processes (default: one per CPU core)")
+    parser.add_argument("--shards", type=int, default=None,
+                        help="total number of shards (default: Discord's recommendation)")
+    parser.add_argument("--socket", default="/opt/archon/var/run/cluster.sock",
+                        help="path of the IPC Unix socket (default: %(default)s)")
+
+    arguments = parser.parse_args()
+
+    if arguments.processes < 1 or (arguments.shards is not None and arguments.shards < 1):
+        parser.error("--processes and --shards must be at least 1")
+
+    return arguments
+
+
+if __name__ == "__main__":
+    arguments = parse_arguments()
+
+    try:
+        asyncio.run(launch(arguments.processes, arguments.shards, arguments.socket))
+    except KeyboardInterrupt:
+        pass
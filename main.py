@@ -22,13 +22,22 @@ FROM, OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER
 DEALINGS IN THE SOFTWARE.
 """
 
+from time import perf_counter
+
+# Taken before anything else is imported, so the startup timeline includes imports.
+LAUNCHED = perf_counter()
+
 import asyncio
 import signal
+from importlib import import_module
+from typing import List, Optional
 
 import bot_code as bc
 
+IMPORTED = perf_counter()
 
-async def print_intro(run_print_intro: bool = bc.VALUES.PRINT_INTRO):
+
+async def print_intro(run_print_intro: bool):
     """Prints the program intro ASCII and metadata if enabled in config."""
     if not run_print_intro:
         return
@@ -44,8 +53,31 @@ async def print_intro(run_print_intro: bool = bc.VALUES.PRINT_INTRO):
     print(bc.__copyright__)
 
 
-async def main():
-    await print_intro()
+async def main(cluster_id: Optional[int] = None, shard_ids: Optional[List[int]] = None,
+               shard_count: Optional[int] = None, socket_path: Optional[str] = None):
+    """Runs the bot until it's shut down, either on its own or as one worker process of a cluster (see
+    ``cluster.py``), which runs ``shard_ids`` out of ``shard_count`` shards and takes orders from the launcher over
+    the Unix socket at ``socket_path``.
+    """
+    bc.TIMELINE.origin = LAUNCHED
+    bc.TIMELINE.record("import bot_code", LAUNCHED, IMPORTED)
+
+    # Nothing is read from the configuration file until here.
+    with bc.TIMELINE.phase("config load"):
+        bc.VALUES.load()
+
+    # The ASCII intro sleeps between lines, so it's timed on its own. The cluster launcher prints it for its workers.
+    with bc.TIMELINE.phase("intro"):
+        await print_intro(bc.VALUES.PRINT_INTRO and cluster_id is None)
+
+    # bot_code imports its submodules lazily (see bot_code/__init__.py), this is where discord.py gets imported.
+    with bc.TIMELINE.phase("import discord.py"):
+        import_module("bot_code.start")
+
+    database = bc.build_database()
+
+    # Built here rather than in ``start_bot()`` so ``stop_bot()`` can stop it before the database closes.
+    deletions = bc.DeletionScheduler(bot_instance=bc.default_bot, database_instance=database)
 
     loop = asyncio.get_running_loop()
 
@@ -55,18 +87,90 @@ async def main():
         print(f"{bc.WARN_LOG} Received shutdown signal...")
         stop_event.set()
 
+    def reload():
+        print(f"{bc.INFO_LOG} Received reload signal...")
+
+        try:
+            bc.reload_config(bc.default_bot)
+
+        except bc.ConfigError as error:
+            print(f"{bc.EROR_LOG} Configuration not reloaded: {error.faulty_key}: {error.message}")
+
     for sig in (signal.SIGINT, signal.SIGTERM):
         loop.add_signal_handler(sig, shutdown)
 
+    loop.add_signal_handler(signal.SIGHUP, reload)
+
+    cluster = None
+
+    if socket_path:
+        async def reload_requested(message: dict):
+            reload()
+
+        async def launcher_gone(message: dict):
+            # Nothing would supervise or stop this worker anymore.
+            shutdown()
+
+        cluster = bc.ClusterClient(socket_path, cluster_id,
+                                   handlers={"reload": reload_requested, "disconnected": launcher_gone})
+        await cluster.connect()
+
+        async def announce_ready():
+            await cluster.send("ready")
+
+        # The launcher waits for this before starting the next worker, so shards don't identify concurrently.
+        bc.default_bot.add_listener(announce_ready, "on_ready")
+
+    # Like ``deletions``, built here so ``stop_bot()`` can stop it. It serves on the cluster worker's own port.
+    metrics_server = bc.build_metrics_server(bot_instance=bc.default_bot, database_instance=database,
+                                             cluster_instance=cluster)
+
+    async def run_bot() -> Optional[SystemExit]:
+        try:
+            await bc.start_bot(database_instance=database, deletion_instance=deletions,
+                               metrics_server_instance=metrics_server, shard_ids=shard_ids, shard_count=shard_count,
+                               cluster_instance=cluster, scheduled_tasks=cluster_id in (None, 0))
+
+        except SystemExit as error:
+            # Raised out of a task, it would stop the event loop on the spot and skip the cleanup below.
+            return error
+
+    bot_task = asyncio.create_task(run_bot())
+    stop_task = asyncio.create_task(stop_event.wait())
+
+    exit_status = None
+
     try:
-        await bc.start_bot()
-        await stop_event.wait()
+        await asyncio.wait((bot_task, stop_task), return_when=asyncio.FIRST_COMPLETED)
+
+        # Raises whatever stopped the bot, if it wasn't a signal.
+        if bot_task.done():
+            exit_status = bot_task.result()
     except KeyboardInterrupt:
         print(f"{bc.WARN_LOG} Received KeyboardInterrupt")
     finally:
-        await bc.stop_bot(bot_instance=bc.default_bot, database_instance=bc.default_database)
+        stop_task.cancel()
+
+        if cluster:
+            await cluster.close()
+
+        await bc.stop_bot(bot_instance=bc.default_bot, database_instance=database, deletion_instance=deletions,
+                          metrics_server_instance=metrics_server)
         print(f"{bc.INFO_LOG} Shutdown complete.")
 
+    # E.g. 78 (EX_CONFIG) for a rejected token, which tells the cluster launcher not to restart this worker.
+    if exit_status is not None:
+        raise exit_status
+
+
+def run_worker(cluster_id: int, shard_ids: List[int], shard_count: int, socket_path: str):
+    """Entry point of a cluster worker process (see ``cluster.py``)."""
+    try:
+        asyncio.run(main(cluster_id=cluster_id, shard_ids=shard_ids, shard_count=shard_count,
+                         socket_path=socket_path))
+    except KeyboardInterrupt:
+        pass
+
 
 if __name__ == "__main__":
     try:
@@ -1,12 +1,31 @@
-CREATE TABLE IF NOT EXISTS "Statistics" (
+-- Reference copy of the current schema (version 7). It is not executed; the database is created and upgraded by the
+-- migrations in bot_code/migrations.py, keyed on PRAGMA user_version.
+
+CREATE TABLE "Statistics" (
+    "Server ID" INTEGER PRIMARY KEY,
     "Server Name" TEXT,
-    "Server ID" INTEGER NOT NULL UNIQUE,
-    "Join Date" TEXT,
-    PRIMARY KEY("Server ID")
-);
+    "Join Date" TEXT
+) STRICT;
 
-CREATE TABLE IF NOT EXISTS "General Configuration" (
-    "Server ID" INTEGER NOT NULL UNIQUE,
+CREATE TABLE "General Configuration" (
+    "Server ID" INTEGER PRIMARY KEY,
     "Admin Role ID" INTEGER,
-    PRIMARY KEY("Server ID")
-);
+    "Command Prefix" TEXT
+) STRICT;
+
+CREATE TABLE "Scheduled Deletions" (
+    "Message ID" INTEGER PRIMARY KEY,
+    "Channel ID" INTEGER NOT NULL,
+    "Server ID" INTEGER,
+    "Due At" REAL NOT NULL
+) STRICT;
+
+CREATE TABLE "Command Sync" (
+    "Scope" INTEGER PRIMARY KEY,
+    "Payload Hash" TEXT NOT NULL
+) STRICT;
+
+CREATE TABLE "Partitioning" (
+    "ID" INTEGER PRIMARY KEY CHECK ("ID" = 0),
+    "Partition Count" INTEGER NOT NULL
+) STRICT;